@@ -68,6 +68,7 @@ OUTPUT_DIR = config("OUTPUT_DIR")
 OS_TYPE = config("OS_TYPE")
 PUBLISH_DIR = config("PUBLISH_DIR")
 USER = config("USER")
+PIPELINE_IN_PROCESS = config("PIPELINE_IN_PROCESS")
 
 ## Helpers for handling Jupyter Notebook tasks
 # fmt: off
@@ -88,6 +89,20 @@ def jupyter_clear_output(notebook):
 # fmt: on
 
 
+def stage_action(stage):
+    """Action running a pipeline stage, see src/run_pipeline.py.
+
+    With PIPELINE_IN_PROCESS, the stage is a Python action run inside the doit
+    process, so stages share imports and the in-memory frame cache. Otherwise
+    the stage's script runs in its own interpreter.
+    """
+    if PIPELINE_IN_PROCESS:
+        from run_pipeline import run_stage
+
+        return (run_stage, [stage])
+    return f"ipython ./src/{stage}.py"
+
+
 def copy_file(origin_path, destination_path, mkdir=True):
     """Create a Python action for copying a file."""
 
@@ -127,7 +142,7 @@ def task_pull_fed_yield_curve():
 
     return {
         "actions": [
-            "ipython ./src/pull_fed_yield_curve.py",
+            stage_action("pull_fed_yield_curve"),
         ],
         "targets": targets,
         "file_dep": file_dep,
@@ -145,7 +160,26 @@ def task_pull_fed_tips_yield_curve():
 
     return {
         "actions": [
-            "ipython ./src/pull_fed_tips_yield_curve.py",
+            stage_action("pull_fed_tips_yield_curve"),
+        ],
+        "targets": targets,
+        "file_dep": file_dep,
+        "clean": [],
+    }
+
+def task_pull_reference_spreads():
+    """Mirror the reference Stata datasets locally as parquet"""
+    file_dep = [
+        "./src/pull_reference_spreads.py",
+    ]
+    targets = [
+        DATA_DIR / "reference" / "arbitrage_spread_wide.parquet",
+        DATA_DIR / "reference" / "arbitrage_spread_panel.parquet",
+    ]
+
+    return {
+        "actions": [
+            stage_action("pull_reference_spreads"),
         ],
         "targets": targets,
         "file_dep": file_dep,
@@ -181,11 +215,36 @@ def task_compute_tips_treasury():
     ]
     targets = [
         DATA_DIR / "tips_treasury_implied_rf.parquet",
+        OUTPUT_DIR / "tips_treasury_coverage.csv",
     ]
 
     return {
         "actions": [
-            "ipython ./src/compute_tips_treasury.py",
+            stage_action("compute_tips_treasury"),
+        ],
+        "targets": targets,
+        "file_dep": file_dep,
+        "clean": [],
+    }
+
+def task_compute_spreads():
+    """Evaluate all declared arbitrage spreads into one wide and one long panel"""
+    file_dep = [
+        "./src/spread_engine.py",
+        "./src/compute_tips_treasury.py",
+        # Inputs of the TIPS-Treasury spec (spread_engine.INPUT_LOADERS)
+        DATA_DIR / "fed_tips_yield_curve.parquet",
+        DATA_DIR / "fed_yield_curve.parquet",
+        OUTPUT_DIR / "treasury_inflation_swaps.csv",
+    ]
+    targets = [
+        DATA_DIR / "arbitrage_spreads_wide.parquet",
+        DATA_DIR / "arbitrage_spreads_long.parquet",
+    ]
+
+    return {
+        "actions": [
+            stage_action("spread_engine"),
         ],
         "targets": targets,
         "file_dep": file_dep,
@@ -198,17 +257,62 @@ def task_generate_figures():
         "./src/generate_figures.py",
         "./src/generate_latex_table.py",
     ]
+    from generate_latex_table import default_table_specs
+
     file_output = [
         "tips_treasury_spreads.png",
         "tips_treasury_summary.csv",
         'tips_treasury_summary_table.tex'
     ]
+    file_output += [f"{spec['name']}.tex" for spec in default_table_specs()]
     targets = [OUTPUT_DIR / file for file in file_output]
 
     return {
         "actions": [
-            "ipython ./src/generate_figures.py",
-            "ipython ./src/generate_latex_table.py",
+            stage_action("generate_figures"),
+            stage_action("generate_latex_table"),
+        ],
+        "targets": targets,
+        "file_dep": file_dep,
+        "clean": [],
+    }
+
+
+def task_generate_chartbook_figures():
+    """Render the per-tenor and per-window chartbook figures"""
+    from generate_chartbook_figures import default_chart_specs
+
+    file_dep = [
+        "./src/generate_chartbook_figures.py",
+        "./src/generate_figures.py",
+        DATA_DIR / "tips_treasury_implied_rf.parquet",
+    ]
+    targets = [OUTPUT_DIR / f"{spec['name']}.png" for spec in default_chart_specs()]
+
+    return {
+        "actions": [
+            stage_action("generate_chartbook_figures"),
+        ],
+        "targets": targets,
+        "file_dep": file_dep,
+        "clean": [],
+    }
+
+
+def task_generate_html_chart():
+    """Export multi-resolution tiles and the interactive HTML spreads chart"""
+    file_dep = [
+        "./src/generate_html_chart.py",
+        DATA_DIR / "tips_treasury_implied_rf.parquet",
+    ]
+    targets = [
+        OUTPUT_DIR / "tips_treasury_spreads.html",
+        OUTPUT_DIR / "tips_treasury_spreads_tiles" / "index.json",
+    ]
+
+    return {
+        "actions": [
+            stage_action("generate_html_chart"),
         ],
         "targets": targets,
         "file_dep": file_dep,
@@ -0,0 +1,156 @@
+"""
+Array-backed container of the TIPS-Treasury arbitrage panel.
+
+The panel of compute_tips_treasury.py is a frame whose column names encode a
+measure and a tenor (`real_cc2`, `nom_zc5`, `tips_treas_10_rf`, `arb_20`).
+`ArbPanel` holds the same data as one contiguous float64 array of shape
+(measures, tenors, days), with the int32 day numbers of day_index.py:
+
+- `panel.series("arb", 10)` and `panel.measure("arb")` are views found by
+  dict lookup, without scanning column names;
+- `panel.slice_dates(start, end)` is a view of a date range;
+- `panel.to_pandas("arb")` is a frame indexed by date with the usual column
+  names that shares memory with the panel (no copy);
+- `panel.save(path)` / `ArbPanel.load(path)` go through an Arrow IPC file
+  with the columns of the parquet panel.
+
+    panel = ArbPanel.from_frame(pd.read_parquet(".../tips_treasury_implied_rf.parquet"))
+    arb = panel.slice_dates("2010-01-01", "2020-02-28").to_pandas("arb")
+"""
+
+import numpy as np
+import pandas as pd
+
+from compact_storage import column_float64
+from day_index import DAY_COLUMN, to_days, to_timestamps
+
+TENORS = (2, 5, 10, 20)
+
+# Measure -> column name of one tenor in the frame panel
+MEASURE_COLUMNS = {
+    "real": "real_cc{tenor}",
+    "nom": "nom_zc{tenor}",
+    "tips": "tips_treas_{tenor}_rf",
+    "arb": "arb_{tenor}",
+}
+
+
+class ArbPanel:
+    """Measures x tenors x days of the arbitrage panel, in one float64 array."""
+
+    __slots__ = ("days", "tenors", "measures", "values", "_tenor_pos", "_measure_pos")
+
+    def __init__(self, days, tenors, measures, values):
+        self.days = np.asarray(days, dtype=np.int32)
+        self.tenors = tuple(tenors)
+        self.measures = tuple(measures)
+        self.values = np.asarray(values, dtype=np.float64)
+        expected = (len(self.measures), len(self.tenors), len(self.days))
+        if self.values.shape != expected:
+            raise ValueError(f"values have shape {self.values.shape}, expected {expected}")
+        self._tenor_pos = {t: i for i, t in enumerate(self.tenors)}
+        self._measure_pos = {m: i for i, m in enumerate(self.measures)}
+
+    @classmethod
+    def from_frame(cls, df, measures=None, tenors=TENORS):
+        """
+        Panel of a frame with a "date" (or "day") column and the columns of
+        `MEASURE_COLUMNS`; by default every measure with all its tenors.
+        """
+        if measures is None:
+            measures = [
+                m for m, name in MEASURE_COLUMNS.items()
+                if all(name.format(tenor=t) in df.columns for t in tenors)
+            ]
+        days = df[DAY_COLUMN] if DAY_COLUMN in df.columns else to_days(df["date"])
+        order = np.argsort(np.asarray(days), kind="stable")
+        values = np.empty((len(measures), len(tenors), len(df)))
+        for i, measure in enumerate(measures):
+            for j, tenor in enumerate(tenors):
+                column = column_float64(df, MEASURE_COLUMNS[measure].format(tenor=tenor))
+                values[i, j] = column.to_numpy(dtype=np.float64)[order]
+        return cls(np.asarray(days)[order], tenors, measures, values)
+
+    def __len__(self):
+        return len(self.days)
+
+    def __repr__(self):
+        dates = to_timestamps(self.days[[0, -1]]) if len(self) else []
+        span = f"{dates[0]:%Y-%m-%d} to {dates[-1]:%Y-%m-%d}" if len(self) else "empty"
+        return (f"ArbPanel({len(self)} days, {span}, measures={list(self.measures)}, "
+                f"tenors={list(self.tenors)})")
+
+    @property
+    def dates(self):
+        """DatetimeIndex of the days, for presentation."""
+        return to_timestamps(self.days)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.days.nbytes
+
+    def columns(self, measure):
+        """Frame column names of the tenors of `measure`."""
+        return [MEASURE_COLUMNS[measure].format(tenor=t) for t in self.tenors]
+
+    def measure(self, measure):
+        """View of one measure, tenors x days."""
+        return self.values[self._measure_pos[measure]]
+
+    def series(self, measure, tenor):
+        """View of one measure and tenor, by day."""
+        return self.values[self._measure_pos[measure], self._tenor_pos[tenor]]
+
+    def slice_dates(self, start=None, end=None):
+        """Panel of the days from `start` to `end` inclusive, as a view."""
+        lo = 0 if start is None else np.searchsorted(self.days, to_days(start), side="left")
+        hi = len(self) if end is None else np.searchsorted(self.days, to_days(end), side="right")
+        return ArbPanel(self.days[lo:hi], self.tenors, self.measures, self.values[:, :, lo:hi])
+
+    def to_pandas(self, measure="arb"):
+        """Frame of one measure indexed by date, sharing memory with the panel."""
+        return pd.DataFrame(
+            self.measure(measure).T, index=self.dates, columns=self.columns(measure), copy=False
+        )
+
+    def to_frame(self):
+        """Frame with "date", "day" and the columns of every measure (a copy)."""
+        columns = {"date": self.dates, DAY_COLUMN: self.days}
+        for measure in self.measures:
+            columns.update(zip(self.columns(measure), self.measure(measure)))
+        return pd.DataFrame(columns)
+
+    def save(self, path):
+        """Write the panel to an Arrow IPC (feather) file."""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        arrays = {DAY_COLUMN: pa.array(self.days)}
+        for measure in self.measures:
+            for name, values in zip(self.columns(measure), self.measure(measure)):
+                arrays[name] = pa.array(values)
+        table = pa.table(arrays).replace_schema_metadata({
+            b"arb_panel.measures": ",".join(self.measures),
+            b"arb_panel.tenors": ",".join(map(str, self.tenors)),
+        })
+        feather.write_feather(table, path, compression="uncompressed")
+
+    @classmethod
+    def load(cls, path):
+        """
+        Panel written by `save`. The columns are copied into one new
+        (measures, tenors, days) array, so the panel does not share memory
+        with the file.
+        """
+        import pyarrow.feather as feather
+
+        table = feather.read_table(path, memory_map=True)
+        metadata = table.schema.metadata
+        measures = metadata[b"arb_panel.measures"].decode().split(",")
+        tenors = [int(t) for t in metadata[b"arb_panel.tenors"].decode().split(",")]
+        values = np.empty((len(measures), len(tenors), table.num_rows))
+        for i, measure in enumerate(measures):
+            for j, tenor in enumerate(tenors):
+                column = table.column(MEASURE_COLUMNS[measure].format(tenor=tenor))
+                values[i, j] = column.to_numpy()
+        return cls(table.column(DAY_COLUMN).to_numpy(), tenors, measures, values)
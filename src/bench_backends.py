@@ -0,0 +1,90 @@
+"""
+Benchmark of the pandas and polars paths of the misc_tools frame helpers.
+
+Every helper is timed on the same random panel, once as a pandas DataFrame
+and once as a polars DataFrame, so both engines run natively without a
+conversion in the timed region. Run from the project root or from src:
+
+    python ./src/bench_backends.py                   # 10M rows, 100k groups
+    python ./src/bench_backends.py 1000000 10000     # rows, groups
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from misc_tools import (
+    dataframe_set_difference,
+    freq_counts,
+    groupby_weighted_average,
+    groupby_weighted_std,
+    leave_one_out_aggregates,
+    weighted_average,
+)
+
+
+def make_panel(n_rows, n_groups, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "group": rng.integers(0, n_groups, size=n_rows),
+        "bucket": rng.integers(0, 50, size=n_rows),
+        "value": rng.normal(size=n_rows),
+        "weight": rng.uniform(0, 1, size=n_rows),
+    })
+
+
+def _time(func, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+HELPERS = {
+    "weighted_average": lambda df: weighted_average("value", "weight", data=df),
+    "groupby_weighted_average": lambda df: groupby_weighted_average(
+        "value", "weight", by_col="group", data=df
+    ),
+    "groupby_weighted_average (transform)": lambda df: groupby_weighted_average(
+        "value", "weight", by_col="group", data=df, transform=True
+    ),
+    "groupby_weighted_std": lambda df: groupby_weighted_std(
+        "value", "weight", by_col="group", data=df
+    ),
+    "freq_counts": lambda df: freq_counts(df, col="bucket"),
+    "leave_one_out_aggregates": lambda df: leave_one_out_aggregates(
+        df, groupby=["group"], columns=["value", "weight"]
+    ),
+}
+
+
+def run_benchmark(n_rows=10_000_000, n_groups=100_000):
+    import polars as pl
+
+    df = make_panel(n_rows, n_groups)
+    df_pl = pl.from_pandas(df)
+    timings = {
+        name: {"pandas": _time(lambda: func(df)), "polars": _time(lambda: func(df_pl))}
+        for name, func in HELPERS.items()
+    }
+
+    # Set difference of the panel with itself minus its first 1% of rows
+    n_drop = n_rows // 100
+    timings["dataframe_set_difference"] = {
+        "pandas": _time(lambda: dataframe_set_difference(df, df.iloc[n_drop:]), repeat=1),
+        "polars": _time(lambda: dataframe_set_difference(df_pl, df_pl[n_drop:]), repeat=1),
+    }
+    out = pd.DataFrame(timings).T
+    out["pandas/polars"] = out["pandas"] / out["polars"]
+    return out
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    n_rows, n_groups = args + [10_000_000, 100_000][len(args):]
+    print(f"{n_rows:,} rows, {n_groups:,} groups")
+    print(run_benchmark(n_rows, n_groups).round(3).to_string())
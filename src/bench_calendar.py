@@ -0,0 +1,67 @@
+"""
+Benchmark of the vectorized calendar helpers in misc_tools.py.
+
+Compares each `*_array` helper with `Series.apply` of the scalar version it
+replaces. Run from the project root or from src:
+
+    python ./src/bench_calendar.py            # 10M dates
+    python ./src/bench_calendar.py 1000000
+
+`.apply` is timed on the first `APPLY_ROWS` dates and scaled up linearly,
+since running it over 10M dates takes minutes.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import misc_tools
+
+APPLY_ROWS = 100_000
+
+HELPERS = [
+    "get_most_recent_quarter_end",
+    "get_next_quarter_start",
+    "get_end_of_current_month",
+    "get_end_of_current_quarter",
+]
+
+
+def make_dates(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("1990-01-01").value
+    end = pd.Timestamp("2030-01-01").value
+    return pd.Series(pd.to_datetime(rng.integers(start, end, size=n)))
+
+
+def run_benchmark(n=10_000_000):
+    dates = make_dates(n)
+    sample = dates.iloc[:APPLY_ROWS]
+    rows = {}
+    for name in HELPERS:
+        scalar = getattr(misc_tools, name)
+        vectorized = getattr(misc_tools, f"{name}_array")
+
+        start = time.perf_counter()
+        expected = sample.apply(scalar)
+        apply_seconds = (time.perf_counter() - start) * n / len(sample)
+
+        start = time.perf_counter()
+        result = vectorized(dates)
+        array_seconds = time.perf_counter() - start
+
+        assert (result.iloc[:APPLY_ROWS] == pd.to_datetime(expected)).all()
+        rows[name] = {
+            "apply_s (est.)": apply_seconds,
+            "array_s": array_seconds,
+            "speedup": apply_seconds / array_seconds,
+        }
+    return pd.DataFrame(rows).T
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    print(f"{n:,} dates")
+    print(run_benchmark(n).round(2).to_string())
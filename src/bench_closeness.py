@@ -0,0 +1,69 @@
+"""
+Benchmark of the column-by-column closeness report in closeness.py.
+
+Compares `closeness_report` with the previous check of
+`TestDataCloseness.test_data_closeness` (align, `apply(pd.to_numeric)` on the
+whole frames, one `np.allclose`) on two random panels. Run from the project
+root or from src:
+
+    python ./src/bench_closeness.py               # 1M dates, 32 series
+    python ./src/bench_closeness.py 10000 32      # dates, series
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from closeness import closeness_report
+
+
+def make_panels(n_dates, n_cols, seed=0):
+    """Two panels built column by column, like panels read from parquet."""
+    rng = np.random.default_rng(seed)
+    index = pd.RangeIndex(n_dates, name="date")
+    expected, computed = {}, {}
+    for i in range(n_cols):
+        values = rng.normal(50, 10, size=n_dates)
+        expected[f"S{i:02}"] = values
+        computed[f"S{i:02}"] = values * (1 + rng.uniform(-1e-5, 1e-5, size=n_dates))
+    return pd.DataFrame(computed, index=index), pd.DataFrame(expected, index=index)
+
+
+def _allclose_check(computed, expected):
+    """Previous check of TestDataCloseness.test_data_closeness."""
+    common_dates = computed.index.intersection(expected.index)
+    a = computed.loc[common_dates].apply(pd.to_numeric, errors="coerce")
+    b = expected.loc[common_dates].apply(pd.to_numeric, errors="coerce")
+    a = a.select_dtypes(include=[np.number])
+    b = b.select_dtypes(include=[np.number])
+    common_cols = a.columns.intersection(b.columns)
+    return np.allclose(a[common_cols].values, b[common_cols].values, rtol=0.001, equal_nan=True)
+
+
+def _time(func, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(n_dates=1_000_000, n_cols=32):
+    computed, expected = make_panels(n_dates, n_cols)
+    return pd.Series({
+        "np.allclose (pass/fail only)": _time(lambda: _allclose_check(computed, expected)),
+        "closeness_report (1 thread)": _time(
+            lambda: closeness_report(computed, expected, max_workers=1)
+        ),
+        "closeness_report (all cores)": _time(lambda: closeness_report(computed, expected)),
+    }, name="seconds")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    n_dates, n_cols = args + [1_000_000, 32][len(args):]
+    print(f"{n_dates:,} dates, {n_cols} series")
+    print(run_benchmark(n_dates, n_cols).round(3).to_string())
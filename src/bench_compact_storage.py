@@ -0,0 +1,55 @@
+"""
+Benchmark of the compact storage modes of compact_storage.py.
+
+Writes a dense full-tenor panel (rates in percent with 4 decimals, as the
+Fed publishes them, one column per tenor) as float64, float32 and scaled
+int32, and reports memory, parquet size, the time of the write-time check
+and the largest round-trip error. Run from the project root or from src:
+
+    python ./src/bench_compact_storage.py            # 200,000 rows, 30 tenors
+    python ./src/bench_compact_storage.py 10000 30   # rows, tenors
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from compact_storage import compact_frame, rate_units
+from parquet_layout import write_parquet
+
+
+def make_panel(n_rows, n_tenors, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"date": pd.date_range("2000-01-01", periods=n_rows, freq="min")})
+    level = 3 + np.cumsum(rng.normal(0, 0.001, n_rows))
+    for t in range(1, n_tenors + 1):
+        df[f"SVENY{t:02}"] = np.round(level + 0.05 * t + rng.normal(0, 0.002, n_rows), 4)
+    return df
+
+
+def main(n_rows=200_000, n_tenors=30):
+    df = make_panel(n_rows, n_tenors)
+    units = rate_units(df, ("SVENY",))
+    print(f"{n_rows:,} rows x {n_tenors} tenors")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ["", "float32", "scaled_int32"]:
+            start = time.perf_counter()
+            compact = compact_frame(df, units, mode=mode)
+            t_check = time.perf_counter() - start
+            path = Path(tmp) / f"{mode or 'float64'}.parquet"
+            write_parquet(compact, path)
+            error = max((s["max_error_bps"] for s in compact.attrs.get("compact", {}).values()),
+                        default=0.0)
+            print(
+                f"{mode or 'float64':13} memory {compact.memory_usage(deep=True).sum() / 2**20:7.1f} MB"
+                f"   parquet {path.stat().st_size / 2**20:6.1f} MB"
+                f"   encode+check {t_check:6.3f}s   max error {error:.2g} bps"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
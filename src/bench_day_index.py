@@ -0,0 +1,67 @@
+"""
+Benchmark of the int32 day numbers of day_index.py.
+
+Compares joins and date-range slices keyed on datetime64 dates with the
+same operations keyed on day numbers, on two random daily panels. Run from
+the project root or from src:
+
+    python ./src/bench_day_index.py           # 75,000 days, 8 columns
+    python ./src/bench_day_index.py 10000 8   # days, columns
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from day_index import slice_days, with_day_column
+
+
+def make_panel(n_days, n_cols, prefix, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1800-01-01", periods=n_days)
+    df = pd.DataFrame({"date": dates[rng.random(n_days) > 0.02]})
+    for i in range(n_cols):
+        df[f"{prefix}{i}"] = rng.normal(size=len(df))
+    return with_day_column(df)
+
+
+def _best(f, repeat=5):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n_days=75_000, n_cols=8):
+    left = make_panel(n_days, n_cols, "x", 0)
+    right = make_panel(n_days, n_cols, "y", 1)
+    by_date = [df.drop(columns="day").set_index("date") for df in (left, right)]
+    by_day = [df.drop(columns="date").set_index("day") for df in (left, right)]
+    start, end = "1900-01-01", "1910-12-31"
+
+    rows = {
+        "merge": (
+            _best(lambda: pd.merge(left.drop(columns="day"), right.drop(columns="day"), on="date")),
+            _best(lambda: pd.merge(left.drop(columns="date"), right.drop(columns="date"), on="day")),
+        ),
+        "index join": (
+            _best(lambda: by_date[0].join(by_date[1], how="inner")),
+            _best(lambda: by_day[0].join(by_day[1], how="inner")),
+        ),
+        "range slice": (
+            _best(lambda: by_date[0].loc[start:end]),
+            _best(lambda: slice_days(left, start, end)),
+        ),
+    }
+    print(f"{n_days:,} days, {n_cols} columns per panel")
+    print(f"key memory: date {left['date'].nbytes:,} B, day {left['day'].nbytes:,} B")
+    for name, (t_date, t_day) in rows.items():
+        print(f"{name:12} datetime64 {t_date * 1e3:7.2f} ms   day {t_day * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
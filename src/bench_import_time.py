@@ -0,0 +1,106 @@
+"""
+Import-time benchmark for the src modules.
+
+Every module is imported in a fresh interpreter with `python -X importtime`,
+the way each doit task starts, and its cumulative import time is compared
+with a per-module budget. Budgets are expressed as milliseconds on top of the
+baseline cost of importing numpy and pandas, which every module needs, so
+they stay meaningful across machines.
+
+Run from the project root or from src:
+
+    python ./src/bench_import_time.py
+
+The script prints a report and exits with status 1 if any module is over
+budget.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+SRC_DIR = Path(__file__).absolute().parent
+
+# Milliseconds allowed on top of `import numpy, pandas`
+IMPORT_BUDGETS_MS = {
+    "settings": 100,
+    "misc_tools": 50,
+    "compute_tips_treasury": 100,
+    "generate_figures": 100,
+    "generate_latex_table": 100,
+    "generate_chartbook_figures": 150,
+    "generate_html_chart": 100,
+    "pipeline_cache": 100,
+    "pull_fed_yield_curve": 300,
+    "pull_fed_tips_yield_curve": 300,
+    "pull_reference_spreads": 100,
+    "spread_engine": 100,
+}
+
+BASELINE_STATEMENT = "import numpy, pandas"
+
+
+def _cumulative_import_us(output, module):
+    """Cumulative microseconds of `module` from `-X importtime` output."""
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise ValueError(f"{module} not found in -X importtime output")
+
+
+def measure_import_ms(module, repeat=5):
+    """Best-of-`repeat` cumulative import time of `module` in milliseconds."""
+    statement = BASELINE_STATEMENT if module is None else f"import {module}"
+    name = "pandas" if module is None else module
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=SRC_DIR,
+            env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        us = _cumulative_import_us(result.stderr, name)
+        if module is None:
+            us += _cumulative_import_us(result.stderr, "numpy")
+        times.append(us / 1000)
+    return min(times)
+
+
+def import_time_report(budgets=IMPORT_BUDGETS_MS, repeat=5):
+    """
+    Measure every module in `budgets` against its budget.
+
+    Returns:
+        pd.DataFrame: import_ms, overhead_ms over the numpy/pandas baseline,
+        budget_ms and within_budget per module
+    """
+    baseline = measure_import_ms(None, repeat=repeat)
+    rows = {}
+    for module, budget in budgets.items():
+        ms = measure_import_ms(module, repeat=repeat)
+        rows[module] = {
+            "import_ms": round(ms, 1),
+            "overhead_ms": round(ms - baseline, 1),
+            "budget_ms": budget,
+            "within_budget": ms - baseline <= budget,
+        }
+    report = pd.DataFrame(rows).T
+    report.attrs["baseline_ms"] = baseline
+    return report
+
+
+if __name__ == "__main__":
+    report = import_time_report()
+    print(f"Baseline ({BASELINE_STATEMENT}): {report.attrs['baseline_ms']:.1f} ms")
+    print(report.to_string())
+    if not report["within_budget"].all():
+        sys.exit(1)
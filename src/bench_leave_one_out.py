@@ -0,0 +1,72 @@
+"""
+Benchmark of the leave-one-out aggregates in misc_tools.py.
+
+Compares `leave_one_out_aggregates` (pandas), `pl_leave_one_out_aggregates`
+(polars) and the previous `groupby().transform(lambda x: x.sum() - x)`
+implementation of `leave_one_out_sums`, which runs once per column. Run from
+the project root or from src:
+
+    python ./src/bench_leave_one_out.py                  # 10M rows, 100k groups
+    python ./src/bench_leave_one_out.py 1000000 10000    # rows, groups
+
+The transform baseline calls Python once per group and is only run for up
+to 10k groups.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from misc_tools import leave_one_out_aggregates, pl_leave_one_out_aggregates
+
+COLUMNS = ["x1", "x2", "x3", "x4"]
+TRANSFORM_MAX_GROUPS = 10_000
+
+
+def make_panel(n_rows, n_groups, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"group": rng.integers(0, n_groups, size=n_rows)})
+    for col in COLUMNS:
+        df[col] = rng.normal(size=n_rows)
+    return df
+
+
+def _time(func, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(n_rows=10_000_000, n_groups=100_000):
+    import polars as pl
+
+    df = make_panel(n_rows, n_groups)
+    df_pl = pl.from_pandas(df)
+    timings = {
+        "leave_one_out_aggregates (pandas)": _time(
+            lambda: leave_one_out_aggregates(df, groupby=["group"], columns=COLUMNS)
+        ),
+        "leave_one_out_aggregates (polars)": _time(
+            lambda: pl_leave_one_out_aggregates(df_pl, groupby=["group"], columns=COLUMNS)
+        ),
+    }
+    if n_groups <= TRANSFORM_MAX_GROUPS:
+        timings["groupby().transform sums"] = _time(
+            lambda: [
+                df.groupby("group")[col].transform(lambda x: x.sum() - x) for col in COLUMNS
+            ],
+            repeat=1,
+        )
+    return pd.Series(timings, name="seconds")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    n_rows, n_groups = args + [10_000_000, 100_000][len(args):]
+    print(f"{n_rows:,} rows, {n_groups:,} groups, {len(COLUMNS)} columns")
+    print(run_benchmark(n_rows, n_groups).round(3).to_string())
@@ -0,0 +1,75 @@
+"""
+Benchmark of the parquet layout in parquet_layout.py.
+
+Writes a random panel shaped like tips_treasury_implied_rf.parquet (business
+days, yields and spreads per tenor as random walks) with the previous
+`to_parquet(compression="snappy")` layout, the pinned layout and codecs
+benchmarked on the panel (`codecs="auto"`), and reports file size and read
+latency for the common query patterns. The codecs `choose_codecs` picks are
+the ones to pin in `parquet_layout.PINNED_CODECS`. Run from the project
+root or from src:
+
+    python ./src/bench_parquet_layout.py          # 200 years of business days
+    python ./src/bench_parquet_layout.py 20       # years
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from parquet_layout import choose_codecs, layout_report
+
+TENORS = [2, 5, 10, 20]
+
+
+def make_panel(n_years, seed=0):
+    """Wide panel like compute_tips_treasury_panel, in bps with 4 decimals."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("1800-01-01", periods=261 * n_years)
+    df = pd.DataFrame({"date": dates})
+    for t in TENORS:
+        nominal = 300 + np.cumsum(rng.normal(0, 3, len(dates)))
+        spread = np.cumsum(rng.normal(0, 1, len(dates)))
+        df[f"tips_treas_{t}_rf"] = np.round(nominal + spread, 4)
+        df[f"nom_zc{t}"] = np.round(nominal, 4)
+        df[f"arb_{t}"] = np.round(spread, 4)
+    return df
+
+
+def main(n_years=200):
+    df = make_panel(n_years)
+    last_year = df["date"].iloc[-1] - pd.DateOffset(years=1)
+    queries = {
+        "full": {},
+        "one_column": {"columns": ["date", "arb_10"]},
+        "last_year": {"filters": [("date", ">=", last_year)]},
+        "tenor_last_year": {
+            "columns": ["date", "arb_10"],
+            "filters": [("date", ">=", last_year)],
+        },
+    }
+    layouts = {
+        "to_parquet_snappy": {"sort_by": None, "codecs": None},
+        "yearly_row_groups": {"min_row_group_rows": 0, "codecs": None},
+        "merged_row_groups": {"codecs": None},
+        "pinned": {},
+        "auto": {"codecs": "auto"},
+    }
+    print(f"{len(df):,} rows x {df.shape[1]} columns")
+    with tempfile.TemporaryDirectory() as tmp:
+        report = layout_report(df, layouts, queries, Path(tmp))
+    pd.set_option("display.width", 120)
+    print(report.round(4).to_string())
+
+    plan = choose_codecs(df)
+    chosen = pd.DataFrame(plan).T[
+        ["encoding", "compression", "compression_level", "use_dictionary", "size"]
+    ]
+    print(chosen.to_string())
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,98 @@
+"""
+Benchmark of the grouped weighted statistics kernels in weighted_stats.py.
+
+Compares, on a random panel, the bincount kernel (pandas entry point), the
+polars entry point and the previous `groupby().apply` implementation of
+`misc_tools.groupby_weighted_std`, and the grouped weighted quantile kernel
+with `groupby().apply` over `misc_tools.weighted_quantile`. Run from the
+project root or from src:
+
+    python ./src/bench_weighted_stats.py                 # 10M rows, 100k groups
+    python ./src/bench_weighted_stats.py 1000000 10000   # rows, groups
+
+The `groupby().apply` baseline calls Python once per group and is only run
+for up to 10k groups.
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from misc_tools import weighted_quantile
+from weighted_stats import (
+    groupby_weighted_quantile,
+    groupby_weighted_stats,
+    pl_groupby_weighted_stats,
+)
+
+APPLY_MAX_GROUPS = 10_000
+
+
+def make_panel(n_rows, n_groups, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "group": rng.integers(0, n_groups, size=n_rows),
+        "value": rng.normal(size=n_rows),
+        "weight": rng.uniform(0, 1, size=n_rows),
+    })
+
+
+def _apply_weighted_std(data, ddof=1):
+    """Previous implementation of misc_tools.groupby_weighted_std."""
+
+    def weighted_sd(input_df):
+        weights = input_df["weight"]
+        vals = input_df["value"]
+        weighted_avg = np.average(vals, weights=weights)
+        numer = np.sum(weights * (vals - weighted_avg) ** 2)
+        denom = ((vals.count() - ddof) / vals.count()) * np.sum(weights)
+        return np.sqrt(numer / denom)
+
+    return data.groupby("group").apply(weighted_sd, include_groups=False)
+
+
+def _time(func, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(n_rows=10_000_000, n_groups=100_000):
+    import polars as pl
+
+    df = make_panel(n_rows, n_groups)
+    df_pl = pl.from_pandas(df)
+    timings = {
+        "weighted_stats (pandas)": _time(
+            lambda: groupby_weighted_stats(df, "value", "weight", by_col="group")
+        ),
+        "weighted_stats (polars)": _time(
+            lambda: pl_groupby_weighted_stats(df_pl, "value", "weight", by_col="group")
+        ),
+    }
+    quantiles = [0.25, 0.5, 0.75]
+    timings["weighted quantiles (kernel)"] = _time(
+        lambda: groupby_weighted_quantile(df, "value", quantiles, weight_col="weight", by_col="group")
+    )
+    if n_groups <= APPLY_MAX_GROUPS:
+        timings["groupby().apply std"] = _time(lambda: _apply_weighted_std(df), repeat=1)
+        timings["groupby().apply quantiles"] = _time(
+            lambda: df.groupby("group").apply(
+                lambda x: weighted_quantile(x["value"], quantiles, sample_weight=x["weight"]),
+                include_groups=False,
+            ),
+            repeat=1,
+        )
+    return pd.Series(timings, name="seconds")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    n_rows, n_groups = args + [10_000_000, 100_000][len(args):]
+    print(f"{n_rows:,} rows, {n_groups:,} groups")
+    print(run_benchmark(n_rows, n_groups).round(3).to_string())
@@ -0,0 +1,132 @@
+"""
+Alignment of daily sources on a shared business-day calendar.
+
+Inner merges on date drop every day on which any one source did not print
+(a Fed holiday on which Bloomberg still has a swap quote, or the reverse),
+and each merge hashes and copies all frames. `align_sources` instead places
+every source on one calendar with an as-of join on sorted dates:
+
+- for every calendar day, the last observation of the source on or before it
+  is found with `np.searchsorted` on the sorted int32 day numbers of
+  day_index.py (no hashing, one gather per column). Rows whose columns are
+  all missing (a holiday stored as a NaN row) are not observations, so
+  the last real print is carried forward over them;
+- the observation is used if it is at most `max_staleness[name]` business
+  days old (0, the default, uses same-day prints only), otherwise the
+  source's columns are missing on that day;
+- the output keeps every calendar day on which at least one source printed,
+  with its "date" and "day" columns.
+
+`align_sources` also returns coverage statistics per source: how many output
+days have a same-day print, a stale one within the limit, or none.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from day_index import DAY_COLUMN, business_days, to_days, to_timestamps, with_day_column
+
+
+@lru_cache(maxsize=16)
+def business_day_calendar(start, end):
+    """Day numbers of the weekdays from day `start` to day `end` (cached)."""
+    calendar = business_days(start, end)
+    calendar.flags.writeable = False
+    return calendar
+
+
+def _sorted_days(df):
+    df = with_day_column(df)
+    values = df.drop(columns=["date", DAY_COLUMN])
+    if values.shape[1]:
+        # Rows without any value are not prints
+        df = df.loc[values.notna().any(axis=1).to_numpy()]
+    if not df[DAY_COLUMN].is_monotonic_increasing:
+        df = df.sort_values(DAY_COLUMN, kind="stable")
+    return df, df[DAY_COLUMN].to_numpy()
+
+
+def asof_positions(source_dates, calendar_dates):
+    """
+    As-of join of sorted integer dates (day numbers).
+
+    Returns:
+        tuple: For every calendar date, the position of the last source date
+        on or before it (-1 if none), and the age of that source date in
+        calendar steps (0 if it falls on the calendar date itself)
+    """
+    if not len(source_dates):
+        missing = np.full(len(calendar_dates), -1)
+        return missing, missing.copy()
+    positions = np.searchsorted(source_dates, calendar_dates, side="right") - 1
+    # Calendar step of every source date (the last calendar date on or before it)
+    source_steps = np.searchsorted(calendar_dates, source_dates, side="right") - 1
+    age = np.arange(len(calendar_dates)) - source_steps[positions]
+    exact = source_dates[positions] == calendar_dates
+    age[~exact] = np.maximum(age[~exact], 1)
+    age[positions < 0] = -1
+    return positions, age
+
+
+def align_sources(sources, max_staleness=None, calendar=None):
+    """
+    Align daily sources on a business-day calendar with as-of joins.
+
+    Parameters:
+        sources (dict): name -> frame with a "date" column; the other
+            columns of all sources must have distinct names. Rows whose
+            other columns are all missing are ignored
+        max_staleness (dict): name -> largest age, in business days, of an
+            observation carried forward (default 0 for every source)
+        calendar: Dates or day numbers to align on (default: the business
+            days spanned by the sources)
+
+    Returns:
+        tuple: The aligned frame ("date" and "day" columns, then the columns
+        of each source in order) and the coverage statistics, one row per
+        source
+    """
+    max_staleness = {name: 0 for name in sources} | dict(max_staleness or {})
+    sorted_sources = {name: _sorted_days(df) for name, df in sources.items()}
+    if calendar is None:
+        start = min(days[0] for _, days in sorted_sources.values() if len(days))
+        end = max(days[-1] for _, days in sorted_sources.values() if len(days))
+        calendar_dates = business_day_calendar(int(start), int(end))
+    elif pd.api.types.is_integer_dtype(getattr(calendar, "dtype", None)):
+        calendar_dates = np.asarray(calendar, dtype=np.int32)
+    else:
+        calendar_dates = to_days(calendar)
+
+    matches = {}
+    printed = np.zeros(len(calendar_dates), dtype=bool)
+    for name, (df, dates) in sorted_sources.items():
+        positions, age = asof_positions(dates, calendar_dates)
+        valid = (age >= 0) & (age <= max_staleness[name])
+        matches[name] = (np.where(valid, positions, -1), age)
+        printed |= age == 0
+
+    keep = np.flatnonzero(printed)
+    columns = {
+        "date": to_timestamps(calendar_dates[keep]),
+        DAY_COLUMN: calendar_dates[keep],
+    }
+    coverage = {}
+    for name, (df, _) in sorted_sources.items():
+        take, age = matches[name][0][keep], matches[name][1][keep]
+        for col in df.columns.drop(["date", DAY_COLUMN]):
+            columns[col] = pd.api.extensions.take(
+                df[col].to_numpy(), take, allow_fill=True
+            )
+        filled = take >= 0
+        coverage[name] = {
+            "observations": len(df),
+            "same_day": int((age == 0).sum()),
+            "stale": int((filled & (age > 0)).sum()),
+            "missing": int((~filled).sum()),
+            "coverage": filled.mean() if len(keep) else np.nan,
+            "max_staleness": max_staleness[name],
+        }
+    aligned = pd.DataFrame(columns)
+    return aligned, pd.DataFrame.from_dict(coverage, orient="index")
@@ -0,0 +1,121 @@
+"""
+Compact storage of rate columns.
+
+The Fed curves and the TIPS-Treasury panel are published with a few decimals
+but held as float64. With the COMPACT_STORAGE setting ("float32" or
+"scaled_int32"; empty, the default, keeps float64), the pipeline writes rate
+columns as
+
+- float32, or
+- nullable int32 of the rate in basis points times 1e4
+  (`round(value * SCALES[unit])`),
+
+halving their size on disk and in memory. `compact_frame` checks that every
+value reads back within `max_error_bps` of the float64 value and raises
+otherwise, and records the encoding of each column in `df.attrs["compact"]`,
+which parquet keeps. Readers upcast to float64 only the columns they compute
+with (`column_float64`, `expand_frame`), so the rest of a frame stays compact.
+
+    compact = compact_frame(df, {"SVENY02": "percent"}, mode="scaled_int32")
+    compact["SVENY02"]                   # Int32, 1e4 x bps
+    column_float64(compact, "SVENY02")   # float64, percent
+"""
+
+import numpy as np
+import pandas as pd
+
+from settings import config
+
+COMPACT_STORAGE = config("COMPACT_STORAGE")
+MODES = ("float32", "scaled_int32")
+
+# Integer steps per unit of each rate unit: 1e4 steps per basis point
+SCALES = {"bps": 1e4, "percent": 1e6, "decimal": 1e8}
+# Largest round-trip error accepted at write time
+MAX_ERROR_BPS = 1e-3
+_BPS_PER_UNIT = {"bps": 1.0, "percent": 100.0, "decimal": 1e4}
+
+
+def _decode(values, spec):
+    if spec["mode"] == "float32":
+        return np.asarray(values, dtype=np.float64)
+    return values.to_numpy(dtype=np.float64, na_value=np.nan) / spec["scale"]
+
+
+def rate_units(df, prefixes, unit="percent"):
+    """`unit` for every float column of `df` named with one of `prefixes`."""
+    return {
+        col: unit for col in df.columns
+        if str(col).startswith(tuple(prefixes)) and pd.api.types.is_float_dtype(df[col])
+    }
+
+
+def compact_frame(df, units, mode=None, max_error_bps=MAX_ERROR_BPS):
+    """
+    `df` with the rate columns of `units` stored in `mode`.
+
+    Parameters:
+        df (pd.DataFrame): Frame with float columns
+        units (dict): column -> "bps", "percent" or "decimal"
+        mode (str): "float32" or "scaled_int32" (default: COMPACT_STORAGE);
+            an empty mode returns `df` unchanged
+        max_error_bps (float): Bound on the round-trip error, in basis points
+
+    Raises:
+        ValueError: If a column would read back off by more than the bound
+    """
+    mode = COMPACT_STORAGE if mode is None else mode
+    if not mode:
+        return df
+    if mode not in MODES:
+        raise ValueError(f"Unknown compact storage mode {mode!r}; expected one of {MODES}")
+
+    compact = df.copy()
+    specs = dict(df.attrs.get("compact", {}))
+    for col, unit in units.items():
+        values = df[col].to_numpy(dtype=np.float64)
+        spec = {"mode": mode, "unit": unit}
+        if mode == "float32":
+            encoded = values.astype(np.float32)
+        else:
+            spec["scale"] = SCALES[unit]
+            scaled = np.round(values * spec["scale"])
+            finite = scaled[np.isfinite(scaled)]
+            if len(finite) and np.abs(finite).max() > np.iinfo(np.int32).max:
+                raise ValueError(f"{col} does not fit in int32 at {spec['scale']:g} per {unit}")
+            missing = np.isnan(scaled)
+            encoded = pd.arrays.IntegerArray(
+                np.where(missing, 0, scaled).astype(np.int32), missing
+            )
+        error = np.nanmax(np.abs(_decode(encoded, spec) - values), initial=0.0)
+        spec["max_error_bps"] = float(error * _BPS_PER_UNIT[unit])
+        if spec["max_error_bps"] > max_error_bps:
+            raise ValueError(
+                f"{col} stored as {mode} reads back off by {spec['max_error_bps']:.3g} bps, "
+                f"more than {max_error_bps:g} bps"
+            )
+        compact[col] = encoded
+        specs[col] = spec
+    compact.attrs["compact"] = specs
+    return compact
+
+
+def column_float64(df, col):
+    """Column `col` of `df` as float64, decoding it if it is stored compact."""
+    spec = df.attrs.get("compact", {}).get(col)
+    if spec is None:
+        return df[col]
+    return pd.Series(_decode(df[col], spec), index=df.index, name=col)
+
+
+def expand_frame(df, columns=None):
+    """`df` with its compact columns (or those of `columns`) back as float64."""
+    specs = df.attrs.get("compact", {})
+    columns = [
+        c for c in (specs if columns is None else columns) if c in specs and c in df.columns
+    ]
+    if not columns:
+        return df
+    df = df.assign(**{col: column_float64(df, col) for col in columns})
+    df.attrs["compact"] = {c: s for c, s in specs.items() if c not in columns}
+    return df
@@ -1,11 +1,29 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-from decouple import config
+from decouple import Csv, config
+
+import parquet_layout
+from calendar_alignment import align_sources
+from compact_storage import column_float64, compact_frame
+from day_index import with_day_column
+import pipeline_cache
 
 DATA_DIR = config('DATA_DIR')
 OUTPUT_DIR = config("OUTPUT_DIR")
 
+# Formats the TIPS-Treasury panel is written to, e.g. "parquet,stata"
+TIPS_TREASURY_SINKS = config("TIPS_TREASURY_SINKS", default="parquet", cast=Csv())
+
+# Business days an observation of each source may be carried forward when
+# the source did not print on a day another source printed: the Fed curves
+# skip single Fed holidays (Columbus Day, Veterans Day) on which Bloomberg
+# still quotes swaps, and the swaps skip up to two days around Christmas
+MAX_STALENESS = {"tips_yields": 1, "treasury_yields": 1, "inflation_swaps": 2}
+
 
 # ------------------------------------------------------------------------------
 # Import inflation swap data
@@ -15,7 +33,7 @@ def import_inflation_swap_data():
 	swaps_path = os.path.join(OUTPUT_DIR, "treasury_inflation_swaps.csv")
 
 	# Read CSV; explicitly parse the "Dates" column as datetime
-	swaps = pd.read_csv(swaps_path, parse_dates=["Dates"])
+	swaps = pipeline_cache.read_csv(swaps_path, parse_dates=["Dates"])
 
 	# Create a column mapping based on the schema you provided
 	column_map = {
@@ -48,7 +66,7 @@ def import_inflation_swap_data():
 	# Select only the date and inflation swap columns, in a clean order
 	swaps = swaps[["date"] + inf_cols]
 
-	return swaps
+	return with_day_column(swaps)
 
 
 # ------------------------------------------------------------------------------
@@ -59,7 +77,7 @@ def import_treasury_yields():
     nom_path = os.path.join(DATA_DIR, "fed_yield_curve.parquet")
 
     # Read the parquet file; date is assumed to be in the index
-    nom = pd.read_parquet(nom_path)
+    nom = pipeline_cache.read_parquet(nom_path)
 
     if not pd.api.types.is_datetime64_any_dtype(nom.index):
         nom.index = pd.to_datetime(nom.index, format="%m/%d/%Y")
@@ -71,7 +89,7 @@ def import_treasury_yields():
     # For each tenor (2, 5, 10, 20), compute the nominal zero-coupon yield (in basis points)
     for t in [2, 5, 10, 20]:
         col = f"SVENY{'0' + str(t) if t < 10 else str(t)}"
-        nom[f"nom_zc{t}"] = 1e4 * (np.exp(nom[col] / 100) - 1)
+        nom[f"nom_zc{t}"] = 1e4 * (np.exp(column_float64(nom, col) / 100) - 1)
 
     # Convert the date index to a column and rename it to "date" if necessary
     nom = nom.reset_index()
@@ -80,12 +98,12 @@ def import_treasury_yields():
     # Subset the DataFrame to include the date column plus the computed 'nom' columns
     nom = nom[["date"] + [col for col in nom.columns if col.startswith("nom")]]
 
-    return nom
+    return with_day_column(nom)
 
 
 def import_tips_yields():
 	real_path = os.path.join(DATA_DIR, "fed_tips_yield_curve.parquet")
-	real = pd.read_parquet(real_path)
+	real = pipeline_cache.read_parquet(real_path)
 
 	if not pd.api.types.is_datetime64_any_dtype(real['Date']):
 		real.rename(columns={'Date': 'date'}, inplace=True)
@@ -93,17 +111,17 @@ def import_tips_yields():
 
 	for t in [2, 5, 10, 20]:
 		col = f"TIPSY{'0' + str(t) if t < 10 else str(t)}"
-		real[f"real_cc{t}"] = real[col] / 100
+		real[f"real_cc{t}"] = column_float64(real, col) / 100
 
 	real = real[["date"] + [col for col in real.columns if col.startswith("real")]]
 
-	return real
+	return with_day_column(real)
 
 
 # ------------------------------------------------------------------------------
 # Merge all data, compute implied riskless rate from TIPS
 # ------------------------------------------------------------------------------
-def compute_tips_treasury():
+def compute_tips_treasury(sinks=None):
 	"""
 	Create Constant-Maturity TIPS-Treasury Arbitrage Series and Compute Implied Risk-Free Rates
 
@@ -124,6 +142,7 @@ def compute_tips_treasury():
 
 	The final merged DataFrame, saved as a parquet file, includes:
 		- date: Observation date.
+		- day: The date as an int32 day number (see day_index.py), the key for joins and slices.
 		- Columns starting with "real_": TIPS real yields for each tenor (e.g., real_cc2, real_cc5, real_cc10, real_cc20)
 		expressed in decimal form (e.g., 0.02 for 2%).
 		- Columns starting with "nom_": Computed nominal zero-coupon Treasury yields for each tenor
@@ -134,14 +153,58 @@ def compute_tips_treasury():
 		difference between the TIPS-implied risk-free rate and the corresponding nominal yield (tips_treas_{t}_rf - nom_zc{t}).
 
 	Data quality is maintained by generating missing value indicators and filtering out observations with too many missing values.
-	The resulting dataset is saved as a parquet file with Snappy compression, making it ready for further analysis.
+	The resulting dataset is saved with parquet_layout.write_parquet: sorted by date, with row groups starting
+	on calendar-year boundaries (so date-range filters skip whole row groups) and each column's encoding and
+	codec pinned by its dtype (parquet_layout.PINNED_CODECS), so the same panel is written to the same bytes. With the COMPACT_STORAGE setting, the rate columns are stored
+	as float32 or scaled int32 (see compact_storage.py).
+
+	`sinks` selects the output formats (see `SINKS`), as a list of names or a
+	dict of name -> path; by default the TIPS_TREASURY_SINKS setting. The panel
+	is computed once and all sinks are written concurrently.
+	"""
+	merged, coverage = compute_tips_treasury_panel(return_coverage=True)
+	# Days each source printed, was carried forward or was missing
+	coverage_path = Path(OUTPUT_DIR) / "tips_treasury_coverage.csv"
+	coverage_path.parent.mkdir(parents=True, exist_ok=True)
+	coverage.to_csv(coverage_path, index_label="source")
+	print(f"Source coverage saved to {coverage_path}")
+
+	for output_path in write_sinks(merged, sinks):
+		print(f"Data saved to {output_path}")
+	return merged
+
+
+def compute_tips_treasury_panel(max_staleness=None, return_coverage=False):
 	"""
-	real = import_tips_yields()
-	nom = import_treasury_yields()
-	swaps = import_inflation_swap_data()
+	The TIPS-Treasury panel of `compute_tips_treasury`, without saving it.
 
-	merged = pd.merge(real, nom, on="date", how="inner")
-	merged = pd.merge(merged, swaps, on="date", how="inner")
+	Used by the replication check (replicate_tips_treasury.py), which needs
+	the panel but not the parquet file.
+
+	The sources are aligned on the business-day calendar with
+	`calendar_alignment.align_sources` rather than inner-merged: a day on
+	which one source did not print is kept, with that source's columns
+	carried forward up to `max_staleness` business days (default
+	`MAX_STALENESS`) or missing. With `return_coverage`, the coverage
+	statistics of the sources are returned as well.
+	"""
+	sources = {
+		"tips_yields": import_tips_yields(),
+		"treasury_yields": import_treasury_yields(),
+		"inflation_swaps": import_inflation_swap_data(),
+	}
+	panel, coverage = tips_treasury_panel(sources, max_staleness)
+	return (panel, coverage) if return_coverage else panel
+
+
+def tips_treasury_panel(sources, max_staleness=None):
+	"""
+	The TIPS-Treasury panel and the coverage statistics of already loaded
+	sources: a dict with the frames of "tips_yields", "treasury_yields" and
+	"inflation_swaps". The TIPS_Treasury spreads of spread_engine.py are the
+	"arb_" columns of this panel.
+	"""
+	merged, coverage = align_sources(sources, MAX_STALENESS | dict(max_staleness or {}))
 
 	# Compute implied riskless rates from TIPS and arbitrage measures for each tenor
 	missing_indicators = []
@@ -161,18 +224,77 @@ def compute_tips_treasury():
 
 	
 
-	cols_to_keep = (["date"] +
+	cols_to_keep = (["date", "day"] +
 					[col for col in merged.columns if col.startswith("real_")] +
 					[col for col in merged.columns if col.startswith("nom_")] +
 					[col for col in merged.columns if col.startswith("tips_")] +
 					[col for col in merged.columns if col.startswith("arb_")])
-	merged = merged[cols_to_keep]
+	return merged[cols_to_keep].reset_index(drop=True), coverage
+
+
+# ------------------------------------------------------------------------------
+# Output sinks
+# ------------------------------------------------------------------------------
+def _write_parquet(df, path):
+	# Rates as float32/scaled int32 with the COMPACT_STORAGE setting; sorted
+	# by date, row groups on year boundaries, codecs pinned per dtype
+	units = {
+		col: "decimal" if col.startswith("real_") else "bps"
+		for col in df.columns if col.startswith(("real_", "nom_", "tips_", "arb_"))
+	}
+	pipeline_cache.to_parquet(
+		compact_frame(df, units), path, writer=parquet_layout.write_parquet, codecs="pinned"
+	)
+
+
+def _write_stata(df, path):
+	# Stata names of compute_tips_treasury.do: arb2, arb5, ...
+	df = df.rename(columns=lambda col: col.replace("arb_", "arb"))
+	df.to_stata(path, write_index=False)
+
+
+def _write_excel(df, path):
+	df.to_excel(path, sheet_name="Data", index=False)
 
-	output_path = os.path.join(DATA_DIR, "tips_treasury_implied_rf.parquet")
-	merged.to_parquet(output_path, compression="snappy")
 
-	print(f"Data saved to {output_path}")
-	return merged 
+def _write_arrow(df, path):
+	import pyarrow as pa
+	import pyarrow.feather as feather
+
+	feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+# Sink name -> (writer, file extension)
+SINKS = {
+	"parquet": (_write_parquet, "parquet"),
+	"stata": (_write_stata, "dta"),
+	"excel": (_write_excel, "xlsx"),
+	"arrow": (_write_arrow, "arrow"),
+}
+
+
+def write_sinks(df, sinks=None, data_dir=DATA_DIR, stem="tips_treasury_implied_rf"):
+	"""
+	Write `df` to every sink concurrently.
+
+	`sinks` is a list of sink names, written to `data_dir / f"{stem}.{ext}"`,
+	or a dict of sink name -> path. Returns the paths written.
+	"""
+	sinks = TIPS_TREASURY_SINKS if sinks is None else sinks
+	unknown = set(sinks) - set(SINKS)
+	if unknown:
+		raise ValueError(f"Unknown sinks: {sorted(unknown)}")
+	if not isinstance(sinks, dict):
+		sinks = {name: Path(data_dir) / f"{stem}.{SINKS[name][1]}" for name in sinks}
+
+	paths = [Path(path) for path in sinks.values()]
+	for path in paths:
+		path.parent.mkdir(parents=True, exist_ok=True)
+	with ThreadPoolExecutor(max_workers=max(len(sinks), 1)) as pool:
+		futures = [pool.submit(SINKS[name][0], df, path) for name, path in zip(sinks, paths)]
+		for future in futures:
+			future.result()
+	return paths
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""
+Integer day numbers shared by all datasets of the pipeline.
+
+Every dataset carries, next to its "date" column, a "day" column: the int32
+number of days since 1970-01-01, computed once when the data is loaded
+(`with_day_column`). Joins, slices and calendar lookups run on that key
+(`slice_days`, `business_days`, calendar_alignment.py) rather than on
+datetime64 values; "date" is only needed for presentation, and
+`to_timestamps` converts day numbers back.
+
+A day number is 4 bytes instead of 8, and equal days are equal integers
+whatever the resolution or time of day of the source timestamps.
+
+The loaders of the datasets with a date column (compute_tips_treasury.py's
+importers, `pull_fed_tips_yield_curve.load_tips_yield_curve`) add "day".
+The date-indexed wide panels (the Fed nominal curves of
+pull_fed_yield_curve.py, the reference spreads of test_load_bases_data.py)
+keep their DatetimeIndex and no "day" column, since every column of them is
+read as a series; `to_days(df.index)` gives their day numbers.
+"""
+
+import numpy as np
+import pandas as pd
+
+DAY_COLUMN = "day"
+
+
+def to_days(dates, format=None):
+    """
+    Day numbers (int32, days since 1970-01-01) of dates.
+
+    Parameters:
+        dates: Datetime-like or string array, Series, Index or scalar
+        format (str): `pd.to_datetime` format of string dates
+
+    Raises:
+        ValueError: If a date is missing
+    """
+    if np.isscalar(dates) or isinstance(dates, (pd.Timestamp, np.datetime64)):
+        if format is not None:
+            return to_days([dates], format=format)[0]
+        date = pd.Timestamp(dates)
+        if date is pd.NaT:
+            raise ValueError("Missing dates have no day number")
+        return np.int32(date.to_datetime64().astype("datetime64[D]").astype(np.int64))
+    if not pd.api.types.is_datetime64_any_dtype(getattr(dates, "dtype", None)):
+        dates = pd.to_datetime(dates, format=format)
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if np.isnat(days).any():
+        raise ValueError("Missing dates have no day number")
+    return days.astype(np.int64).astype(np.int32)
+
+
+def to_timestamps(days, name="date"):
+    """DatetimeIndex (ns) of day numbers, for presentation."""
+    days = np.asarray(days, dtype=np.int64).astype("datetime64[D]")
+    return pd.DatetimeIndex(days, name=name).as_unit("ns")
+
+
+def with_day_column(df, date_col="date", format=None):
+    """
+    `df` with "day" inserted after `date_col`, and `date_col` normalized to
+    datetime64[ns] midnights; unchanged if it already has a "day" column.
+    """
+    if DAY_COLUMN in df.columns:
+        return df
+    days = to_days(df[date_col], format=format)
+    df = df.copy()
+    df[date_col] = to_timestamps(days)
+    df.insert(df.columns.get_loc(date_col) + 1, DAY_COLUMN, days)
+    return df
+
+
+def business_days(start, end):
+    """Day numbers of the weekdays from day `start` to day `end`, inclusive."""
+    days = np.arange(start, end + 1, dtype=np.int32)
+    # 1970-01-01 (day 0) was a Thursday
+    return days[(days + 3) % 7 < 5]
+
+
+def slice_days(df, start=None, end=None):
+    """
+    Rows of `df` (sorted by "day") from `start` to `end` inclusive, like
+    `.loc[start:end]` on a date index; bounds are anything `to_days` takes.
+    """
+    days = df[DAY_COLUMN].to_numpy()
+    lo = 0 if start is None else np.searchsorted(days, to_days(start), side="left")
+    hi = len(days) if end is None else np.searchsorted(days, to_days(end), side="right")
+    return df.iloc[lo:hi]
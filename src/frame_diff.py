@@ -0,0 +1,199 @@
+"""
+Row-level set difference of large DataFrames using 64-bit row fingerprints.
+
+Every row is hashed to a 64-bit fingerprint with `pd.util.hash_pandas_object`
+and the set difference is taken on the fingerprints, so neither frame is
+copied or merged column by column. A second 64-bit hash confirms every
+match. `hash_key` only changes the hash of object and string columns, so the
+second hash is not a rehash with another key: it mixes each column's hash
+with its own seed (`SECONDARY_SEED`) and combines the columns differently.
+The per-column hashes of numeric columns are bijective, so two distinct rows
+whose first hashes collide get independent second hashes, and a collision of
+the first hash hides a difference only if the second one collides too
+(about 2**-64).
+
+Inputs can be DataFrames, paths to parquet files (read in record batches with
+pyarrow, so only one batch is in memory at a time) or iterables of DataFrame
+chunks. Row numbers are positions (0, 1, ...) in the concatenated input.
+Returning the differing rows reads the input a second time, so iterables
+must then be re-iterable (e.g. a list rather than a generator).
+
+Rows are compared by value and dtype: hash fingerprints of an int column and
+a float column holding the same numbers differ, so compare outputs with the
+same schema (e.g. the same pipeline stage across two releases).
+
+    diff = frame_diff("old/tips_treasury_implied_rf.parquet",
+                      "new/tips_treasury_implied_rf.parquet")
+    diff["n_only_in_left"], diff["n_only_in_right"]
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BATCH_SIZE = 1_000_000
+
+# Keys of the two row hashes; must be 16 characters
+PRIMARY_HASH_KEY = "0123456789123456"  # pandas' default
+SECONDARY_HASH_KEY = "frame_diff_check"
+# Seed of the second hash; column i is mixed with SECONDARY_SEED + i * _GOLDEN
+SECONDARY_SEED = np.uint64(0x5BD1E9955BD1E995)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _iter_chunks(source, columns=None, batch_size=BATCH_SIZE):
+    """Yield pandas DataFrame chunks of a DataFrame, parquet file or iterable."""
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        for start in range(0, max(len(frame), 1), batch_size):
+            yield frame.iloc[start:start + batch_size]
+    elif isinstance(source, (str, Path)):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for chunk in source:
+            yield chunk if columns is None else chunk[columns]
+
+
+def _mix64(x):
+    # splitmix64 finalizer: a bijection of uint64 that spreads every bit
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _primary_hash(chunk):
+    return pd.util.hash_pandas_object(chunk, index=False, hash_key=PRIMARY_HASH_KEY).to_numpy()
+
+
+def _secondary_hash(chunk):
+    """Row hash independent of `_primary_hash`, for numeric columns too."""
+    with np.errstate(over="ignore"):
+        row_hash = np.full(len(chunk), SECONDARY_SEED, dtype=np.uint64)
+        for i in range(chunk.shape[1]):
+            col_hash = pd.util.hash_pandas_object(
+                chunk.iloc[:, i], index=False, hash_key=SECONDARY_HASH_KEY
+            ).to_numpy()
+            seed = SECONDARY_SEED + np.uint64(i + 1) * _GOLDEN
+            row_hash = _mix64(row_hash ^ _mix64(col_hash ^ seed))
+    return row_hash
+
+
+def row_fingerprints(source, columns=None, batch_size=BATCH_SIZE, check_collisions=True):
+    """
+    64-bit fingerprint of every row.
+
+    Returns:
+        tuple: (primary, secondary) np.uint64 arrays; secondary is None when
+        `check_collisions` is False
+    """
+    primary, secondary = [], []
+    for chunk in _iter_chunks(source, columns=columns, batch_size=batch_size):
+        primary.append(_primary_hash(chunk))
+        if check_collisions:
+            secondary.append(_secondary_hash(chunk))
+    primary = np.concatenate(primary) if primary else np.empty(0, dtype=np.uint64)
+    if not check_collisions:
+        return primary, None
+    secondary = np.concatenate(secondary) if secondary else np.empty(0, dtype=np.uint64)
+    return primary, secondary
+
+
+def _is_member(primary, secondary, other_primary, other_secondary):
+    """Whether each row's fingerprint occurs among the other frame's rows."""
+    if len(other_primary) == 0:
+        return np.zeros(len(primary), dtype=bool)
+
+    # Searching sorted queries in a sorted array is several times faster
+    # than searching random queries
+    other_order = np.argsort(other_primary)
+    other_sorted = other_primary[other_order]
+    order = np.argsort(primary)
+    queries = primary[order]
+
+    lo = np.searchsorted(other_sorted, queries, side="left")
+    hi = np.searchsorted(other_sorted, queries, side="right")
+    found = hi > lo
+    if secondary is None:
+        member_sorted = found
+    else:
+        other_secondary = other_secondary[other_order]
+        query_secondary = secondary[order]
+        first = np.minimum(lo, len(other_sorted) - 1)
+        member_sorted = found & (other_secondary[first] == query_secondary)
+        # Several distinct rows share this primary hash: check all of them
+        for i in np.flatnonzero(found & ~member_sorted & (hi - lo > 1)):
+            member_sorted[i] = (other_secondary[lo[i]:hi[i]] == query_secondary[i]).any()
+
+    member = np.empty(len(primary), dtype=bool)
+    member[order] = member_sorted
+    return member
+
+
+def take_rows(source, row_numbers, columns=None, batch_size=BATCH_SIZE):
+    """Rows at positions `row_numbers` of a DataFrame, parquet file or iterable."""
+    row_numbers = np.sort(np.asarray(row_numbers, dtype=np.int64))
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        return frame.iloc[row_numbers]
+
+    parts = []
+    offset = 0
+    for chunk in _iter_chunks(source, columns=columns, batch_size=batch_size):
+        lo, hi = np.searchsorted(row_numbers, [offset, offset + len(chunk)])
+        if hi > lo or not parts:
+            # Keep an empty first chunk so the result has the right columns
+            parts.append(chunk.iloc[row_numbers[lo:hi] - offset])
+        offset += len(chunk)
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(parts, ignore_index=True)
+
+
+def set_difference(left, right, columns=None, batch_size=BATCH_SIZE, check_collisions=True):
+    """Row numbers of the rows of `left` that do not occur in `right`."""
+    left_fp = row_fingerprints(left, columns, batch_size, check_collisions)
+    right_fp = row_fingerprints(right, columns, batch_size, check_collisions)
+    return np.flatnonzero(~_is_member(*left_fp, *right_fp))
+
+
+def frame_diff(left, right, columns=None, batch_size=BATCH_SIZE, check_collisions=True,
+               return_rows=True):
+    """
+    Rows of `left` not in `right` and rows of `right` not in `left`.
+
+    Parameters:
+        left, right: DataFrame, parquet path or iterable of DataFrame chunks
+        columns (list): Columns to compare (default: all)
+        batch_size (int): Rows per chunk when hashing and reading parquet
+        check_collisions (bool): Confirm matches with a second hash
+        return_rows (bool): Also return the differing rows
+
+    Returns:
+        dict: "only_in_left" and "only_in_right" (row numbers),
+        "n_only_in_left", "n_only_in_right", "n_symmetric_difference" and,
+        if `return_rows`, "rows_only_in_left" and "rows_only_in_right"
+    """
+    left_fp = row_fingerprints(left, columns, batch_size, check_collisions)
+    right_fp = row_fingerprints(right, columns, batch_size, check_collisions)
+
+    only_in_left = np.flatnonzero(~_is_member(*left_fp, *right_fp))
+    only_in_right = np.flatnonzero(~_is_member(*right_fp, *left_fp))
+
+    diff = {
+        "only_in_left": only_in_left,
+        "only_in_right": only_in_right,
+        "n_only_in_left": len(only_in_left),
+        "n_only_in_right": len(only_in_right),
+        "n_symmetric_difference": len(only_in_left) + len(only_in_right),
+    }
+    if return_rows:
+        diff["rows_only_in_left"] = take_rows(left, only_in_left, columns, batch_size)
+        diff["rows_only_in_right"] = take_rows(right, only_in_right, columns, batch_size)
+    return diff
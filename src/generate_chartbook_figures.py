@@ -0,0 +1,242 @@
+"""
+Render the chartbook figure set (per tenor, per regime window, correlation
+heatmaps) across a process pool.
+
+Each chart is described by a spec dictionary:
+
+    {
+        "name": "tips_treasury_spreads_10y_post_crisis",  # output file stem
+        "kind": "spreads",          # "spreads" or "heatmap"
+        "columns": ["arb_10"],      # arbitrage columns to draw
+        "start_date": "2010-01-01", # optional
+        "end_date": "2020-02-28",   # optional
+        "decimate": "minmax",       # optional, spreads only
+    }
+
+The arbitrage panel is copied once into shared memory. Every worker attaches
+to it when the pool starts, so the panel is neither re-read from parquet nor
+pickled per chart. A chart is skipped when the hash of its spec and of the
+input panel matches the one recorded in the output directory's manifest and
+the image still exists.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from settings import config
+
+DATA_DIR = config("DATA_DIR")
+OUTPUT_DIR = config("OUTPUT_DIR")
+
+MANIFEST_NAME = ".figure_manifest.json"
+
+REGIME_WINDOWS = {
+    "full": (None, None),
+    "pre_crisis": (None, "2007-06-30"),
+    "crisis": ("2007-07-01", "2009-12-31"),
+    "post_crisis": ("2010-01-01", "2020-02-28"),
+    "covid": ("2020-03-01", None),
+}
+
+TENORS = [2, 5, 10, 20]
+
+# Set in each worker by _attach_panel
+_PANEL = None
+_SHM = None
+
+
+def default_chart_specs(tenors=TENORS, windows=REGIME_WINDOWS):
+    """
+    Chart specs for the chartbook: each tenor and all tenors together for
+    every regime window, plus one correlation heatmap per window.
+    """
+    specs = []
+    all_columns = [f"arb_{t}" for t in tenors]
+    for window, (start_date, end_date) in windows.items():
+        for t in tenors:
+            specs.append({
+                "name": f"tips_treasury_spreads_{t}y_{window}",
+                "kind": "spreads",
+                "columns": [f"arb_{t}"],
+                "start_date": start_date,
+                "end_date": end_date,
+                "decimate": "minmax",
+            })
+        specs.append({
+            "name": f"tips_treasury_spreads_{window}",
+            "kind": "spreads",
+            "columns": all_columns,
+            "start_date": start_date,
+            "end_date": end_date,
+            "decimate": "minmax",
+        })
+        specs.append({
+            "name": f"tips_treasury_correlation_{window}",
+            "kind": "heatmap",
+            "columns": all_columns,
+            "start_date": start_date,
+            "end_date": end_date,
+        })
+    return specs
+
+
+def hash_panel(data_df):
+    """Hash the values, index and column names of the arbitrage panel."""
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in data_df.columns]).encode())
+    h.update(np.ascontiguousarray(data_df.index.asi8).tobytes())
+    h.update(np.ascontiguousarray(data_df.to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def hash_spec(spec, panel_hash):
+    """Hash of a chart spec combined with the hash of its input panel."""
+    payload = json.dumps(spec, sort_keys=True, default=str) + panel_hash
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _load_manifest(output_dir):
+    path = Path(output_dir) / MANIFEST_NAME
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def _save_manifest(output_dir, manifest):
+    path = Path(output_dir) / MANIFEST_NAME
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _attach_panel(values_name, dates_name, shape, columns):
+    """Pool initializer: build a DataFrame view over the shared panel."""
+    global _PANEL, _SHM
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    values_shm = shared_memory.SharedMemory(name=values_name)
+    dates_shm = shared_memory.SharedMemory(name=dates_name)
+
+    values = np.ndarray(shape, dtype=np.float64, buffer=values_shm.buf)
+    dates = np.ndarray(shape[0], dtype=np.int64, buffer=dates_shm.buf)
+    _PANEL = pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(dates.view("datetime64[ns]"), name="date"),
+        columns=columns,
+        copy=False,
+    )
+    # Keep the blocks mapped for the lifetime of the worker
+    _SHM = (values_shm, dates_shm)
+
+
+def _render_chart(spec, save_path):
+    """Render one chart spec from the worker's shared panel."""
+    from matplotlib import pyplot as plt
+
+    import generate_figures
+
+    data = _PANEL[spec["columns"]]
+    kind = spec.get("kind", "spreads")
+    if kind == "spreads":
+        fig = generate_figures.plot_tips_treasury_spreads(
+            data,
+            start_date=spec.get("start_date"),
+            end_date=spec.get("end_date"),
+            save_path=save_path,
+            decimate=spec.get("decimate"),
+        )
+    elif kind == "heatmap":
+        fig = generate_figures.plot_correlation_heatmap(
+            data,
+            start_date=spec.get("start_date"),
+            end_date=spec.get("end_date"),
+            save_path=save_path,
+        )
+    else:
+        raise ValueError(f"Unknown chart kind: {kind}")
+    plt.close(fig)
+    return spec["name"]
+
+
+def render_figures(data_df, specs, output_dir=OUTPUT_DIR, max_workers=None, force=False):
+    """
+    Render a list of chart specs to PNG files across a process pool.
+
+    Parameters:
+        data_df (pd.DataFrame): Arbitrage panel indexed by date
+        specs (list of dict): Chart specs, see the module docstring
+        output_dir (str or Path): Directory for the PNG files and manifest
+        max_workers (int): Size of the process pool (default: CPU count)
+        force (bool): Render every chart even if its hash is unchanged
+
+    Returns:
+        dict: Chart name -> "rendered" or "skipped"
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    data_df = data_df.sort_index()
+    panel_hash = hash_panel(data_df)
+    manifest = _load_manifest(output_dir)
+
+    status = {}
+    todo = []
+    for spec in specs:
+        spec_hash = hash_spec(spec, panel_hash)
+        save_path = output_dir / f"{spec['name']}.png"
+        if not force and manifest.get(spec["name"]) == spec_hash and save_path.exists():
+            status[spec["name"]] = "skipped"
+        else:
+            todo.append((spec, spec_hash, save_path))
+
+    if todo:
+        values = np.ascontiguousarray(data_df.to_numpy(dtype=np.float64))
+        dates = np.ascontiguousarray(data_df.index.asi8)
+        values_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        dates_shm = shared_memory.SharedMemory(create=True, size=max(dates.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=values_shm.buf)[:] = values
+            np.ndarray(dates.shape, dtype=dates.dtype, buffer=dates_shm.buf)[:] = dates
+
+            initargs = (values_shm.name, dates_shm.name, values.shape, list(data_df.columns))
+            with ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_attach_panel, initargs=initargs
+            ) as pool:
+                futures = {
+                    pool.submit(_render_chart, spec, str(save_path)): (spec, spec_hash)
+                    for spec, spec_hash, save_path in todo
+                }
+                for future, (spec, spec_hash) in futures.items():
+                    future.result()
+                    manifest[spec["name"]] = spec_hash
+                    status[spec["name"]] = "rendered"
+        finally:
+            _save_manifest(output_dir, manifest)
+            values_shm.close()
+            values_shm.unlink()
+            dates_shm.close()
+            dates_shm.unlink()
+
+    n_rendered = sum(v == "rendered" for v in status.values())
+    print(f"Rendered {n_rendered} figures, skipped {len(status) - n_rendered} unchanged")
+    return status
+
+
+def main():
+    import generate_figures
+
+    data_path = f"{DATA_DIR}/tips_treasury_implied_rf.parquet"
+    arb_data = generate_figures.load_tips_treasury_data(file_path=data_path)
+    render_figures(arb_data, default_chart_specs(), output_dir=OUTPUT_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+"""
+Summary statistics and figures for the TIPS-Treasury arbitrage spreads.
+
+matplotlib, seaborn and statsmodels are imported inside the functions that
+use them, so loading the data or the helpers does not pay for them.
+"""
+
+import time
+
 import pandas as pd
 import numpy as np
-from statsmodels.regression.linear_model import OLS
-from statsmodels.tools.tools import add_constant
 from decouple import config
 
+import pipeline_cache
+from arb_panel import ArbPanel
+from compact_storage import expand_frame
+
 DATA_DIR = config('DATA_DIR')
 OUTPUT_DIR = config("OUTPUT_DIR")
 
@@ -23,27 +32,35 @@ def load_tips_treasury_data(file_path="/tips_treasury_implied_rf.parquet",
         pd.DataFrame: DataFrame with the requested data
     """
     try:
+        if filter_columns:
+            # Arbitrage columns as a view of the array-backed panel
+            return load_arb_panel(file_path).to_pandas("arb")
+
         # Read the parquet file
-        df = pd.read_parquet(file_path)
+        df = pipeline_cache.read_parquet(file_path)
 
         # Set the date as index
         if 'date' in df.columns:
             df.index = df['date']
 
-        # Extract only arbitrage columns if requested
-        if filter_columns:
-            arb_cols = [col for col in df.columns if col.startswith('arb_')]
-            df = df[arb_cols]
-
-        return df
+        # float64 for the statistics if the panel is stored compact
+        return expand_frame(df)
 
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
+
+def load_arb_panel(file_path="/tips_treasury_implied_rf.parquet"):
+    """Load the TIPS-Treasury panel as an `ArbPanel` (see arb_panel.py)."""
+    return ArbPanel.from_frame(pipeline_cache.read_parquet(file_path))
+
 # Function to calculate AR(1) coefficient for an entire series
 def ar1_coefficient(series):
     # Drop NaN values
+    from statsmodels.regression.linear_model import OLS
+    from statsmodels.tools.tools import add_constant
+
     series = series.dropna()
 
     if len(series) <= 1:
@@ -63,7 +80,8 @@ def generate_summary_statistics(test_df, start_date=None, end_date=None, save_pa
     Generate summary statistics for the TIPS-Treasury arbitrage data.
 
     Parameters:
-        test_df (pd.DataFrame): DataFrame containing arbitrage data
+        test_df (pd.DataFrame or ArbPanel): DataFrame containing arbitrage
+            data, or the panel (its "arb" measure is used)
         start_date (str): Start date in format 'YYYY-MM-DD' (optional)
         end_date (str): End date in format 'YYYY-MM-DD' (optional)
         save_path (str): Path to save the summary statistics as a CSV file
@@ -71,7 +89,9 @@ def generate_summary_statistics(test_df, start_date=None, end_date=None, save_pa
     Returns:
         pd.DataFrame: Summary statistics with renamed indices and formatted values
     """
-    if start_date and end_date:
+    if isinstance(test_df, ArbPanel):
+        df = test_df.slice_dates(start_date, end_date).to_pandas("arb")
+    elif start_date and end_date:
         df = test_df.loc[start_date:end_date].copy()
     elif start_date:
         df = test_df.loc[start_date:].copy()
@@ -80,7 +100,10 @@ def generate_summary_statistics(test_df, start_date=None, end_date=None, save_pa
     else:
         df = test_df.copy()
 
-    arb_cols = [col for col in df.columns if col.startswith('arb_') and not col.endswith('_AR1')]
+    if isinstance(test_df, ArbPanel):
+        arb_cols = list(df.columns)
+    else:
+        arb_cols = [col for col in df.columns if col.startswith('arb_') and not col.endswith('_AR1')]
 
     summary = pd.DataFrame()
 
@@ -120,8 +143,148 @@ def generate_summary_statistics(test_df, start_date=None, end_date=None, save_pa
     return summary.T
 
 
+def _bucket_ids(x, n_buckets):
+    """Assign each x position to one of `n_buckets` equal-width buckets."""
+    x = np.asarray(x, dtype=float)
+    span = x[-1] - x[0]
+    if span <= 0:
+        return np.zeros(len(x), dtype=np.int64)
+    bucket = np.floor((x - x[0]) / span * n_buckets).astype(np.int64)
+    return np.minimum(bucket, n_buckets - 1)
+
+
+def minmax_indices(x, y, n_buckets):
+    """
+    Row positions that preserve the visual envelope of a line.
+
+    The x range is split into `n_buckets` equal-width buckets (one per pixel
+    column) and, within each bucket, the positions of the minimum and the
+    maximum are kept, along with the first and last valid observations. The
+    first missing value of each bucket is also kept so that gaps in the
+    series still break the drawn line.
+
+    Parameters:
+        x (array-like): Sorted x positions (e.g. int64 nanoseconds)
+        y (array-like): Values, NaN marks a missing observation
+        n_buckets (int): Number of buckets, usually the pixel width
+
+    Returns:
+        np.ndarray: Sorted row positions to keep
+    """
+    y = np.asarray(y, dtype=float)
+    if len(y) == 0:
+        return np.array([], dtype=np.int64)
+    bucket = _bucket_ids(x, n_buckets)
+
+    valid = ~np.isnan(y)
+    idx = np.flatnonzero(valid)
+    keep = [idx[:1], idx[-1:]]
+    if len(idx):
+        b = bucket[idx]
+        order = np.lexsort((y[idx], b))
+        sb = b[order]
+        change = sb[1:] != sb[:-1]
+        first = np.r_[True, change]
+        last = np.r_[change, True]
+        keep.append(idx[order[first | last]])
+
+    nan_idx = np.flatnonzero(~valid)
+    if len(nan_idx):
+        nb = bucket[nan_idx]
+        keep.append(nan_idx[np.r_[True, nb[1:] != nb[:-1]]])
+
+    return np.unique(np.concatenate(keep))
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Row positions selected by Largest-Triangle-Three-Buckets downsampling.
+
+    Missing values are skipped when choosing points; the first missing value
+    after each valid run is kept so that gaps still break the drawn line.
+
+    Parameters:
+        x (array-like): Sorted x positions (e.g. int64 nanoseconds)
+        y (array-like): Values, NaN marks a missing observation
+        n_out (int): Target number of points
+
+    Returns:
+        np.ndarray: Sorted row positions to keep
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    idx = np.flatnonzero(valid)
+    gap_starts = np.flatnonzero(~valid & np.r_[False, valid[:-1]])
+
+    n = len(idx)
+    if n <= n_out or n_out < 3:
+        return np.union1d(idx, gap_starts)
+
+    xv = x[idx] - x[idx[0]]
+    yv = y[idx]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = xv[next_lo:next_hi].mean()
+        avg_y = yv[next_lo:next_hi].mean()
+        area = np.abs(
+            (xv[a] - avg_x) * (yv[lo:hi] - yv[a])
+            - (xv[a] - xv[lo:hi]) * (avg_y - yv[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return np.union1d(idx[selected], gap_starts)
+
+
+def decimate_for_plot(data_df, n_buckets, method="minmax"):
+    """
+    Downsample a time-indexed DataFrame to roughly `n_buckets` points per line.
+
+    The rows kept are the union of the rows each column needs, so the result
+    can still be handed to `DataFrame.plot`. Frames that are already small
+    enough are returned unchanged.
+
+    Parameters:
+        data_df (pd.DataFrame): Data to plot, sorted by its index
+        n_buckets (int): Number of pixel columns of the target raster
+        method (str): "minmax" (min/max per pixel bucket) or "lttb"
+
+    Returns:
+        pd.DataFrame: The subset of rows to draw
+    """
+    if len(data_df) <= 2 * n_buckets:
+        return data_df
+
+    if isinstance(data_df.index, pd.DatetimeIndex):
+        x = data_df.index.asi8
+    else:
+        x = np.arange(len(data_df))
+
+    if method == "minmax":
+        keep = [minmax_indices(x, data_df[col].to_numpy(dtype=float), n_buckets)
+                for col in data_df.columns]
+    elif method == "lttb":
+        keep = [lttb_indices(x, data_df[col].to_numpy(dtype=float), 2 * n_buckets)
+                for col in data_df.columns]
+    else:
+        raise ValueError(f"Unknown decimation method: {method}")
+
+    rows = np.unique(np.concatenate(keep)) if keep else np.array([], dtype=np.int64)
+    return data_df.iloc[rows]
+
+
 def plot_tips_treasury_spreads(data_df, start_date=None, end_date=None, figsize=(12, 6),
-                              style="dark", save_path=None):
+                              style="dark", save_path=None, decimate=None, dpi=300):
     """
     Plot TIPS-Treasury spreads over time.
 
@@ -132,10 +295,21 @@ def plot_tips_treasury_spreads(data_df, start_date=None, end_date=None, figsize=
         figsize (tuple): Figure size as (width, height)
         style (str): Seaborn style theme
         save_path (str): If provided, save figure to this path
+        decimate (str): If "minmax" or "lttb", downsample each line to the
+            pixel width of the saved figure (figsize[0] * dpi) before plotting
+            and render on a non-interactive Agg canvas. The render time is
+            printed. Default None plots every observation.
+        dpi (int): Resolution used when saving the figure
 
     Returns:
         matplotlib.figure.Figure: The figure object
     """
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
+    start_time = time.perf_counter()
     sns.set_theme(style=style)
 
     date_filter = slice(start_date, end_date)
@@ -147,8 +321,16 @@ def plot_tips_treasury_spreads(data_df, start_date=None, end_date=None, figsize=
         "arb_20": "20Y"
     }
 
-    fig, ax = plt.subplots(figsize=figsize)
-    data_df.loc[date_filter].plot(ax=ax)
+    plot_df = data_df.loc[date_filter]
+    if decimate:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
+        n_rows = len(plot_df)
+        plot_df = decimate_for_plot(plot_df, n_buckets=int(figsize[0] * dpi), method=decimate)
+    else:
+        fig, ax = plt.subplots(figsize=figsize)
+    plot_df.plot(ax=ax)
 
     title_dates = f"({start_date[:4] if start_date else ''}-{end_date[:4] if end_date else ''})"
     ax.set_title(f'TIPS Treasury Rates {title_dates}', fontsize=16)
@@ -159,20 +341,65 @@ def plot_tips_treasury_spreads(data_df, start_date=None, end_date=None, figsize=
     ax.legend([legend_name_map.get(col, col) for col in data_df.columns],
               fontsize=12, loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=4)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Save if a path is provided
     if save_path:
-        plt.savefig(save_path, bbox_inches='tight', dpi=300)
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
+
+    if decimate:
+        elapsed = time.perf_counter() - start_time
+        print(f"Rendered {n_rows} -> {len(plot_df)} rows ({decimate}) in {elapsed:.2f}s")
 
     return fig
 
-if __name__ == '__main__':
+def plot_correlation_heatmap(data_df, start_date=None, end_date=None, figsize=(10, 8),
+                             save_path=None, dpi=300):
+    """
+    Plot the correlation matrix of the arbitrage spreads as a heatmap.
+
+    Parameters:
+        data_df (pd.DataFrame): DataFrame containing arbitrage data
+        start_date (str): Start date in format 'YYYY-MM-DD' (optional)
+        end_date (str): End date in format 'YYYY-MM-DD' (optional)
+        figsize (tuple): Figure size as (width, height)
+        save_path (str): If provided, save figure to this path
+        dpi (int): Resolution used when saving the figure
+
+    Returns:
+        matplotlib.figure.Figure: The figure object
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
+    corr_matrix = data_df.loc[slice(start_date, end_date)].corr()
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    sns.heatmap(corr_matrix, annot=True, fmt=".2f", cmap="coolwarm", square=True,
+                linewidths=.5, ax=ax)
+
+    title_dates = f"({start_date[:4] if start_date else ''}-{end_date[:4] if end_date else ''})"
+    ax.set_title(f"Correlation Heatmap for Arbitrage Spreads {title_dates}")
+    fig.tight_layout()
+
+    if save_path:
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
+
+    return fig
+
+
+def main():
     data_path = f"{DATA_DIR}/tips_treasury_implied_rf.parquet"
     fig_path = f"{OUTPUT_DIR}/tips_treasury_spreads.png"
     summary_stats_path = f"{OUTPUT_DIR}/tips_treasury_summary.csv"
 
-    arb_data = load_tips_treasury_data(file_path=data_path)
-    summary_stats = generate_summary_statistics(arb_data, '2010-01-01', '2020-02-28', save_path=summary_stats_path)
-    fig = plot_tips_treasury_spreads(arb_data, save_path=fig_path)
+    panel = load_arb_panel(file_path=data_path)
+    summary_stats = generate_summary_statistics(panel, '2010-01-01', '2020-02-28', save_path=summary_stats_path)
+    fig = plot_tips_treasury_spreads(panel.to_pandas("arb"), save_path=fig_path, decimate="minmax")
 
+
+if __name__ == '__main__':
+    main()
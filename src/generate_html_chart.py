@@ -0,0 +1,269 @@
+"""
+Export the arbitrage panel as pre-aggregated, multi-resolution tiles and write
+an interactive HTML chart that loads only the tiles matching the current zoom.
+
+Tile layout (under OUTPUT_DIR / "tips_treasury_spreads_tiles"):
+
+    index.json                  levels, series and the chunk files per level
+    daily/2019.json             daily min/mean/max, one chunk per year
+    weekly/all.json             weekly min/mean/max
+    monthly/all.json            monthly min/mean/max
+
+Each chunk is also written as an Arrow IPC (.arrow) file for non-browser
+consumers. The HTML chart starts at the coarsest level and, on every zoom or
+pan, switches to the finest level that keeps the visible window under
+`MAX_POINTS` points per series, fetching only the chunks overlapping the
+window. The page fetches its tiles over HTTP, so it has to be served (e.g.
+by chartbook or `python -m http.server`) rather than opened as a local file.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from settings import config
+
+DATA_DIR = config("DATA_DIR")
+OUTPUT_DIR = config("OUTPUT_DIR")
+
+# Finest level first. "chunk" splits a level into one file per period.
+TILE_LEVELS = {
+    "daily": {"freq": "D", "step_days": 1, "chunk": "Y"},
+    "weekly": {"freq": "W-FRI", "step_days": 7, "chunk": None},
+    "monthly": {"freq": "ME", "step_days": 30.4, "chunk": None},
+}
+
+MAX_POINTS = 1500
+
+SERIES_NAMES = {
+    "arb_2": "2Y",
+    "arb_5": "5Y",
+    "arb_10": "10Y",
+    "arb_20": "20Y",
+}
+
+
+def aggregate_level(data_df, freq):
+    """
+    Resample each column to `freq`, keeping min, mean and max.
+
+    Returns a DataFrame indexed by period label with columns
+    "{col}_min", "{col}_mean" and "{col}_max". Periods without any
+    observation are dropped.
+    """
+    resampled = data_df.resample(freq).agg(["min", "mean", "max"])
+    resampled.columns = [f"{col}_{stat}" for col, stat in resampled.columns]
+    return resampled.dropna(how="all")
+
+
+def _chunks(level_df, chunk):
+    if chunk is None:
+        yield "all", level_df
+    else:
+        for label, part in level_df.groupby(level_df.index.to_period(chunk)):
+            yield str(label), part
+
+
+def _tile_payload(part, series):
+    def values(col):
+        arr = part[col].to_numpy(dtype=float)
+        return [None if np.isnan(v) else round(float(v), 4) for v in arr]
+
+    return {
+        "dates": part.index.strftime("%Y-%m-%d").tolist(),
+        "series": {
+            s: {stat: values(f"{s}_{stat}") for stat in ("min", "mean", "max")}
+            for s in series
+        },
+    }
+
+
+def export_tiles(data_df, tile_dir, levels=TILE_LEVELS, formats=("json", "arrow")):
+    """
+    Write the multi-resolution tiles for a date-indexed panel.
+
+    Parameters:
+        data_df (pd.DataFrame): Panel indexed by date, one column per series
+        tile_dir (str or Path): Directory for the tiles and index.json
+        levels (dict): Level name -> {"freq", "step_days", "chunk"}, finest first
+        formats (tuple): Any of "json" and "arrow"
+
+    Returns:
+        dict: The contents of index.json
+    """
+    tile_dir = Path(tile_dir)
+    series = [str(c) for c in data_df.columns]
+    data_df = data_df.sort_index()
+
+    index = {"series": series, "names": {s: SERIES_NAMES.get(s, s) for s in series}, "levels": []}
+    for name, spec in levels.items():
+        level_dir = tile_dir / name
+        level_dir.mkdir(parents=True, exist_ok=True)
+        level_df = aggregate_level(data_df, spec["freq"])
+
+        chunks = []
+        for label, part in _chunks(level_df, spec["chunk"]):
+            path = f"{name}/{label}.json"
+            if "json" in formats:
+                with open(tile_dir / path, "w") as f:
+                    json.dump(_tile_payload(part, series), f, separators=(",", ":"))
+            if "arrow" in formats:
+                part.rename_axis("date").reset_index().to_feather(level_dir / f"{label}.arrow")
+            chunks.append({
+                "path": path,
+                "start": part.index[0].strftime("%Y-%m-%d"),
+                "end": part.index[-1].strftime("%Y-%m-%d"),
+                "n": len(part),
+            })
+        index["levels"].append({"name": name, "step_days": spec["step_days"], "chunks": chunks})
+
+    with open(tile_dir / "index.json", "w") as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+<style>body {font-family: sans-serif; margin: 0;} #chart {width: 100%; height: 90vh;}
+#level {padding: 4px 12px; color: #555;}</style>
+</head>
+<body>
+<div id="chart"></div>
+<div id="level"></div>
+<script>
+const TILE_DIR = "__TILE_DIR__";
+const MAX_POINTS = __MAX_POINTS__;
+const DAY_MS = 86400000;
+const cache = {};
+let index = null;
+
+function getTile(path) {
+  if (!(path in cache)) {
+    cache[path] = fetch(TILE_DIR + "/" + path).then(r => r.json());
+  }
+  return cache[path];
+}
+
+function parseDate(s) {
+  return Date.parse(String(s).replace(" ", "T"));
+}
+
+function pickLevel(x0, x1) {
+  const spanDays = (x1 - x0) / DAY_MS;
+  for (const level of index.levels) {
+    if (spanDays / level.step_days <= MAX_POINTS) return level;
+  }
+  return index.levels[index.levels.length - 1];
+}
+
+async function draw(x0, x1) {
+  const level = pickLevel(x0, x1);
+  const pad = (x1 - x0) * 0.5;
+  const chunks = level.chunks.filter(
+    c => parseDate(c.end) >= x0 - pad && parseDate(c.start) <= x1 + pad);
+  const tiles = await Promise.all(chunks.map(c => getTile(c.path)));
+
+  const dates = [].concat(...tiles.map(t => t.dates));
+  const traces = [];
+  index.series.forEach(s => {
+    const pick = stat => [].concat(...tiles.map(t => t.series[s][stat]));
+    traces.push({x: dates, y: pick("min"), mode: "lines", line: {width: 0},
+                 legendgroup: s, showlegend: false, hoverinfo: "skip"});
+    traces.push({x: dates, y: pick("max"), mode: "lines", line: {width: 0},
+                 fill: "tonexty", legendgroup: s, showlegend: false,
+                 hoverinfo: "skip"});
+    traces.push({x: dates, y: pick("mean"), mode: "lines", name: index.names[s],
+                 legendgroup: s});
+  });
+  // Match band colours to their mean line
+  const palette = ["#4c72b0", "#dd8452", "#55a868", "#c44e52", "#8172b3", "#937860"];
+  traces.forEach((t, i) => {
+    const c = palette[Math.floor(i / 3) % palette.length];
+    t.line = Object.assign({}, t.line, {color: c});
+    if (t.fill) t.fillcolor = c + "33";
+  });
+
+  const layout = {
+    title: "__TITLE__",
+    xaxis: {type: "date", range: [new Date(x0), new Date(x1)]},
+    yaxis: {title: "Spread (bps)"},
+    uirevision: "keep",
+    legend: {orientation: "h"},
+  };
+  await Plotly.react("chart", traces, layout);
+  document.getElementById("level").textContent =
+    "Resolution: " + level.name + " (" + dates.length + " points per series loaded)";
+}
+
+function fullRange() {
+  const coarse = index.levels[index.levels.length - 1].chunks;
+  return [parseDate(coarse[0].start), parseDate(coarse[coarse.length - 1].end)];
+}
+
+fetch(TILE_DIR + "/index.json").then(r => r.json()).then(async idx => {
+  index = idx;
+  const [x0, x1] = fullRange();
+  await draw(x0, x1);
+  document.getElementById("chart").on("plotly_relayout", ev => {
+    if ("xaxis.range[0]" in ev) {
+      draw(parseDate(ev["xaxis.range[0]"]), parseDate(ev["xaxis.range[1]"]));
+    } else if ("xaxis.range" in ev) {
+      draw(parseDate(ev["xaxis.range"][0]), parseDate(ev["xaxis.range"][1]));
+    } else if (ev["xaxis.autorange"]) {
+      const [a, b] = fullRange();
+      draw(a, b);
+    }
+  });
+});
+</script>
+</body>
+</html>
+"""
+
+
+def write_html_chart(html_path, tile_dir, title="TIPS-Treasury Arbitrage Spreads (bps)",
+                     max_points=MAX_POINTS):
+    """
+    Write the HTML chart that reads the tiles in `tile_dir`.
+
+    The tile directory is referenced relative to the HTML file, so both
+    should be published together.
+    """
+    html_path = Path(html_path)
+    tile_dir = Path(tile_dir)
+    try:
+        tile_ref = tile_dir.relative_to(html_path.parent).as_posix()
+    except ValueError:
+        tile_ref = tile_dir.as_posix()
+
+    html = (
+        _HTML_TEMPLATE.replace("__TITLE__", title)
+        .replace("__TILE_DIR__", tile_ref)
+        .replace("__MAX_POINTS__", str(int(max_points)))
+    )
+    with open(html_path, "w") as f:
+        f.write(html)
+    return html_path
+
+
+def main():
+    import generate_figures
+
+    data_path = f"{DATA_DIR}/tips_treasury_implied_rf.parquet"
+    tile_dir = Path(OUTPUT_DIR) / "tips_treasury_spreads_tiles"
+    html_path = Path(OUTPUT_DIR) / "tips_treasury_spreads.html"
+
+    arb_data = generate_figures.load_tips_treasury_data(file_path=data_path)
+    export_tiles(arb_data, tile_dir)
+    write_html_chart(html_path, tile_dir)
+    print(f"HTML chart saved to {html_path}")
+
+
+if __name__ == "__main__":
+    main()
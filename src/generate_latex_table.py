@@ -1,5 +1,8 @@
 r"""
-This module loads summary data from a CSV file and converts it into a LaTeX table.
+This module converts TIPS-Treasury summary statistics into LaTeX tables.
+
+Importing the module has no side effects. Run as a script, it loads summary
+data from a CSV file and converts it into a LaTeX table.
 
 The summary CSV file is expected to be located at:
     OUTPUT_DATA / 'tips_treasury_summary.csv'
@@ -7,6 +10,11 @@ The summary CSV file is expected to be located at:
 The generated LaTeX table is saved as:
     OUTPUT_DATA / 'tips_treasury_summary_table.tex'
 
+It also renders the batch of tables from `default_table_specs()` (per window,
+per tenor set and bootstrapped confidence intervals) from the arbitrage panel,
+loaded once. A .tex file is only rewritten when its content hash changes, so
+`latexmk` is not retriggered by identical output.
+
 You can include the resulting .tex file in your LaTeX documents. For example:
 
 \documentclass{article}
@@ -19,32 +27,203 @@ You can include the resulting .tex file in your LaTeX documents. For example:
 \end{document}
 """
 
-import pandas as pd
+import hashlib
 from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
 from settings import config
 
 # Set up the directory where the summary CSV file is stored
 OUTPUT_DATA = Path(config("OUTPUT_DIR"))
+DATA_DIR = Path(config("DATA_DIR"))
+
+TENOR_SETS = {
+    "all": ["arb_2", "arb_5", "arb_10", "arb_20"],
+    "short": ["arb_2", "arb_5"],
+    "long": ["arb_10", "arb_20"],
+}
+
+WINDOWS = {
+    "full": (None, None),
+    "pre_crisis": (None, "2007-06-30"),
+    "crisis": ("2007-07-01", "2009-12-31"),
+    "post_crisis": ("2010-01-01", "2020-02-28"),
+}
+
+
+def float_format_func(x):
+    """Format floats with two decimals in the LaTeX output."""
+    return "{:.2f}".format(x)
+
+
+def summary_to_latex(df_summary, float_format=float_format_func):
+    """Convert a summary DataFrame to a LaTeX table string."""
+    return df_summary.to_latex(float_format=float_format, escape=False)
+
+
+def placeholder_latex(spec):
+    """
+    One-cell LaTeX table standing in for a spec whose window holds no data,
+    so that every table in `default_table_specs()` exists for dodo and LaTeX.
+    """
+    window = f"{spec.get('start_date') or 'start'} to {spec.get('end_date') or 'end'}"
+    return (
+        "\\begin{tabular}{l}\n\\toprule\n"
+        f"No data from {window}\\\\\n"
+        "\\bottomrule\n\\end{tabular}\n"
+    )
+
+
+def write_tex_if_changed(path, text):
+    """
+    Write `text` to `path` unless the file already holds identical content.
+
+    Returns:
+        bool: True if the file was (re)written
+    """
+    path = Path(path)
+    new_hash = hashlib.sha256(text.encode()).hexdigest()
+    if path.exists():
+        old_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+        if old_hash == new_hash:
+            return False
+    path.write_text(text)
+    return True
+
+
+def bootstrap_mean_ci(arb_data, start_date=None, end_date=None, n_boot=1000,
+                      ci=0.95, block_size=20, seed=0):
+    """
+    Moving-block bootstrap confidence interval for the mean of each spread.
+
+    Blocks of `block_size` consecutive observations are resampled with
+    replacement, which keeps the strong day-to-day persistence of the spreads
+    in each bootstrap sample.
+
+    Parameters:
+        arb_data (pd.DataFrame): Arbitrage spreads indexed by date
+        start_date (str): Start date in format 'YYYY-MM-DD' (optional)
+        end_date (str): End date in format 'YYYY-MM-DD' (optional)
+        n_boot (int): Number of bootstrap samples
+        ci (float): Confidence level
+        block_size (int): Length of the resampled blocks
+        seed (int): Seed of the random generator
+
+    Returns:
+        pd.DataFrame: Mean, lower and upper CI bound per spread
+    """
+    rng = np.random.default_rng(seed)
+    df = arb_data.loc[slice(start_date, end_date)]
+    alpha = (1 - ci) / 2
+    rows = {}
+    for col in df.columns:
+        x = df[col].dropna().to_numpy()
+        n = len(x)
+        if n == 0:
+            rows[col] = {"Mean": np.nan, "CI Low": np.nan, "CI High": np.nan}
+            continue
+        b = min(block_size, n)
+        n_blocks = -(-n // b)
+        starts = rng.integers(0, n - b + 1, size=(n_boot, n_blocks))
+        idx = (starts[:, :, None] + np.arange(b)).reshape(n_boot, -1)[:, :n]
+        boot_means = x[idx].mean(axis=1)
+        rows[col] = {
+            "Mean": x.mean(),
+            "CI Low": np.quantile(boot_means, alpha),
+            "CI High": np.quantile(boot_means, 1 - alpha),
+        }
+    return pd.DataFrame(rows).T
+
+
+def default_table_specs(windows=WINDOWS, tenor_sets=TENOR_SETS):
+    """
+    Table specs for every window and tenor set, plus a bootstrapped CI table
+    per window.
+
+    Each spec is a dictionary with keys "name", "columns", "start_date",
+    "end_date" and "kind" ("summary" or "bootstrap").
+    """
+    specs = []
+    for window, (start_date, end_date) in windows.items():
+        for tenor_set, columns in tenor_sets.items():
+            specs.append({
+                "name": f"tips_treasury_summary_table_{window}_{tenor_set}",
+                "kind": "summary",
+                "columns": columns,
+                "start_date": start_date,
+                "end_date": end_date,
+            })
+        specs.append({
+            "name": f"tips_treasury_bootstrap_ci_table_{window}",
+            "kind": "bootstrap",
+            "columns": tenor_sets["all"],
+            "start_date": start_date,
+            "end_date": end_date,
+        })
+    return specs
+
+
+def render_latex_tables(arb_data, specs, output_dir=OUTPUT_DATA):
+    """
+    Render many LaTeX tables from one in-memory arbitrage panel.
+
+    Parameters:
+        arb_data (pd.DataFrame): Arbitrage spreads indexed by date
+        specs (list of dict): Table specs, see `default_table_specs`
+        output_dir (str or Path): Directory for the .tex files
+
+    Returns:
+        dict: Table name -> True if the .tex file was rewritten. Specs whose
+        window holds no data get a placeholder table (`placeholder_latex`).
+    """
+    from generate_figures import generate_summary_statistics
+
+    output_dir = Path(output_dir)
+    written = {}
+    for spec in specs:
+        data = arb_data[spec["columns"]]
+        if data.loc[slice(spec.get("start_date"), spec.get("end_date"))].dropna(how="all").empty:
+            print(f"No data for {spec['name']}; writing a placeholder table")
+            text = placeholder_latex(spec)
+        elif spec.get("kind", "summary") == "bootstrap":
+            text = summary_to_latex(
+                bootstrap_mean_ci(data, spec.get("start_date"), spec.get("end_date"))
+            )
+        else:
+            # Stats as rows and spreads as columns, like tips_treasury_summary.csv
+            text = summary_to_latex(generate_summary_statistics(
+                data, spec.get("start_date"), spec.get("end_date")
+            ).T)
+        written[spec["name"]] = write_tex_if_changed(output_dir / f"{spec['name']}.tex", text)
+    return written
+
+
+def main():
+    # Define the path to the summary CSV file
+    csv_file = OUTPUT_DATA / 'tips_treasury_summary.csv'
+
+    # Read the CSV file into a DataFrame, using the first column as the index
+    df_summary = pd.read_csv(csv_file, index_col=0)
 
-# Optional: Suppress scientific notation and set float formatting for LaTeX output
-pd.set_option('display.float_format', lambda x: '%.2f' % x)
-float_format_func = lambda x: '{:.2f}'.format(x)
+    # Convert the DataFrame to a LaTeX table string
+    latex_table_string = summary_to_latex(df_summary)
 
-# Define the path to the summary CSV file
-csv_file = OUTPUT_DATA / 'tips_treasury_summary.csv'
+    # Optionally, print the LaTeX table string to the console for verification
+    print(latex_table_string)
 
-# Read the CSV file into a DataFrame, using the first column as the index
-df_summary = pd.read_csv(csv_file, index_col=0)
+    # Write the LaTeX table only if its content changed
+    output_tex_file = OUTPUT_DATA / 'tips_treasury_summary_table.tex'
+    write_tex_if_changed(output_tex_file, latex_table_string)
 
-# Convert the DataFrame to a LaTeX table string
-latex_table_string = df_summary.to_latex(float_format=float_format_func, escape=False)
+    # Render the batch of per-window, per-tenor-set and bootstrap tables
+    from generate_figures import load_tips_treasury_data
 
-# Optionally, print the LaTeX table string to the console for verification
-print(latex_table_string)
+    arb_data = load_tips_treasury_data(file_path=DATA_DIR / "tips_treasury_implied_rf.parquet")
+    written = render_latex_tables(arb_data, default_table_specs(), output_dir=OUTPUT_DATA)
+    print(f"Rewrote {sum(written.values())} of {len(written)} LaTeX tables")
 
-# Define the output file path for the LaTeX table
-output_tex_file = OUTPUT_DATA / 'tips_treasury_summary_table.tex'
 
-# Write the LaTeX table string to the .tex file
-with open(output_tex_file, "w") as f:
-    f.write(latex_table_string)
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
 """Collection of miscelaneous tools useful in a variety of situations
 (not specific to the current project)
+
+Polars and matplotlib are imported inside the functions that use them, so
+importing this module only costs numpy and pandas.
+
+The frame helpers (`dataframe_set_difference`, `freq_counts`, the weighted
+averages and `leave_one_out_aggregates`) accept either a pandas DataFrame or
+a polars DataFrame/LazyFrame and run in that frame's own engine, without
+converting. Polars inputs give polars results (collected, never lazy): where
+the pandas version returns a Series indexed by the groups, the polars
+version returns a DataFrame with the group columns and one value column.
 """
 
+import datetime
+
 import numpy as np
 import pandas as pd
-import polars as pl
-from matplotlib import pyplot as plt
-import matplotlib.dates as mdates
 
-from dateutil.relativedelta import relativedelta
-import datetime
+import weighted_stats
 
 
 ########################################################################################
@@ -17,6 +25,15 @@ import datetime
 ########################################################################################
 
 
+def _is_polars(df):
+    """Whether `df` is a polars DataFrame or LazyFrame (without importing polars)"""
+    return type(df).__module__.startswith("polars")
+
+
+def _as_list(cols):
+    return [cols] if isinstance(cols, str) else list(cols)
+
+
 def df_to_literal(df, missing_value="None"):
     """Convert a pandas dataframe to a literal string representing the code to recreate it.
 
@@ -133,68 +150,64 @@ def merge_stats(df_left, df_right, on=[]):
     return df_stats
 
 
-def dataframe_set_difference(dff, df, library="pandas", show="rows_and_numbers"):
+def dataframe_set_difference(dff, df, library=None, show="rows_and_numbers"):
     """
     Gives the rows that appear in dff but not in df
 
+    The library ("pandas" or "polars") is inferred from `dff` unless given.
+    With pandas, rows are compared by 64-bit hash fingerprints (see
+    frame_diff.py) instead of a merge on all columns; with polars, by an anti
+    join on all columns. Row numbers are positions in dff. For parquet files
+    or chunked inputs, use `frame_diff.frame_diff` directly.
+
     Example
     -------
     ```
     rows = data_frame_set_difference(dff, df)
     ```
     """
-    if library == "pandas":
-        # Reset index to ensure the row numbers are captured as a column
-        # This is important for tracking the original row numbers after operations
-        dff_reset = dff.reset_index().rename(columns={"index": "original_row_number"})
-        df_reset = df.reset_index(drop=True)
-
-        # Perform an outer merge with an indicator to identify rows present only in dff
-        merged = dff_reset.merge(
-            df_reset, how="left", indicator=True, on=dff.columns.tolist()
-        )
+    if library is None:
+        library = "polars" if _is_polars(dff) else "pandas"
 
-        # Filter to rows only in dff (left_only)
-        only_in_dff = merged[merged["_merge"] == "left_only"]
+    if library == "pandas":
+        import frame_diff
 
-        # Extract the original row numbers of these rows
-        row_numbers = only_in_dff["original_row_number"].tolist()
+        row_numbers = frame_diff.set_difference(dff, df[dff.columns]).tolist()
         ret = row_numbers
 
     elif library == "polars":
+        columns = dff.lazy().collect_schema().names()
         # Assuming dff and df have the same schema (column names and types)
-        assert dff.columns == df.columns
-
-        # First, add a temporary column to each DataFrame with row numbers
-        dff_with_index = dff.with_columns(pl.arange(0, dff.height).alias("row_number"))
-        df_with_index = df.with_columns(
-            pl.arange(0, df.height).alias("dummy_row_number")
-        )
-
-        # Perform an anti join to find rows in dff not present in df
-        # Note: This requires the DataFrames to have columns to join on that define row uniqueness
-
-        diff = dff_with_index.join(
-            df_with_index, on=list(dff.columns), how="anti", join_nulls=True
+        assert columns == df.lazy().collect_schema().names()
+
+        # Perform an anti join on all columns to find rows in dff not present in df
+        diff = (
+            dff.lazy()
+            .with_row_index("row_number")
+            .join(df.lazy(), on=columns, how="anti", join_nulls=True)
+            .collect()
         )
-
-        # Extract the row numbers of the differing rows
-        row_numbers = diff.select("row_number").to_series(0).to_list()
+        row_numbers = diff["row_number"].to_list()
         ret = row_numbers
 
     else:
         raise ValueError("Unknown library")
     if show == "rows_and_numbers":
-        rows = dff[row_numbers]
+        if library == "pandas":
+            rows = dff.iloc[row_numbers]
+        else:
+            rows = diff.drop("row_number")
         ret = row_numbers, rows
 
     return ret
 
 
 def freq_counts(df, col=None, with_count=True, with_cum_freq=True):
-    """Like value_counts, but normalizes to give frequency
-    Polars function
-    df is a polars dataframe
+    """Like value_counts, but normalizes to give frequency (in percent)
+
+    Works on pandas and polars frames. Missing values are counted as a value.
+    The result has columns `col`, count, freq and cum_freq, sorted by
+    decreasing count.
 
     Example
     -------
@@ -205,19 +218,31 @@ def freq_counts(df, col=None, with_count=True, with_cum_freq=True):
     ).pipe(freq_counts, col="bus_tenor_bin")
     ```
     """
-    s = df[col]
-    ret = (
-        s.value_counts(sort=True)
-        .with_columns(
-            freq=pl.col("count") / s.shape[0] * 100,
+    if _is_polars(df):
+        import polars as pl
+
+        s = df.lazy().select(col).collect().to_series()
+        ret = (
+            s.value_counts(sort=True)
+            .with_columns(
+                freq=pl.col("count") / s.shape[0] * 100,
+            )
+            .with_columns(cum_freq=pl.col("freq").cum_sum())
         )
-        .with_columns(cum_freq=pl.col("freq").cum_sum())
-    )
+        if not with_count:
+            ret = ret.drop("count")
+        if not with_cum_freq:
+            ret = ret.drop("cum_freq")
+        return ret
+
+    s = df[col]
+    ret = s.value_counts(sort=True, dropna=False).rename("count").reset_index()
+    ret["freq"] = ret["count"] / len(s) * 100
+    ret["cum_freq"] = ret["freq"].cumsum()
     if not with_count:
-        ret = ret.drop("count")
+        ret = ret.drop(columns="count")
     if not with_cum_freq:
-        ret = ret.drop("cum_freq")
-
+        ret = ret.drop(columns="cum_freq")
     return ret
 
 
@@ -252,15 +277,11 @@ def weighted_average(data_col=None, weight_col=None, data=None):
 
     ```
     """
-
-    def weights_function(row):
-        return data.loc[row.index, weight_col]
-
-    def wm(row):
-        return np.average(row, weights=weights_function(row))
-
-    result = wm(data[data_col])
-    return result
+    if _is_polars(data):
+        stats = weighted_stats.pl_groupby_weighted_stats(data, data_col, weight_col)
+        return stats["mean"].item()
+    stats = weighted_stats.groupby_weighted_stats(data, data_col, weight_col)
+    return stats["mean"].iloc[0]
 
 
 def groupby_weighted_average(
@@ -294,21 +315,49 @@ def groupby_weighted_average(
 
     ```
 
+    With a polars frame, returns a DataFrame of the groups and their "mean"
+    or, with `transform=True`, a Series aligned with the rows.
     """
-    data["_data_times_weight"] = data[data_col] * data[weight_col]
-    data["_weight_where_notnull"] = data[weight_col] * pd.notnull(data[data_col])
-    g = data.groupby(by_col)
-    result = g["_data_times_weight"].sum() / g["_weight_where_notnull"].sum()
-    del data["_data_times_weight"], data["_weight_where_notnull"]
+    if _is_polars(data):
+        import polars as pl
+
+        by_col = _as_list(by_col)
+        x = pl.col(data_col).cast(pl.Float64)
+        w = pl.col(weight_col).cast(pl.Float64)
+        # Only the mean: the full weighted_stats aggregation also takes a
+        # variance pass over every group
+        means = (
+            data.lazy()
+            .filter(x.is_not_null() & x.is_not_nan() & w.is_not_null() & w.is_not_nan())
+            .group_by(by_col)
+            .agg(((w * x).sum() / w.sum()).alias("mean"))
+        )
+        if transform:
+            return (
+                data.lazy()
+                .select(by_col)
+                .join(means, on=by_col, how="left")
+                .collect()
+                .get_column("mean")
+                .alias(new_column_name)
+            )
+        return means.drop_nulls(by_col).sort(by_col).collect()
+
+    codes, index = weighted_stats.group_codes(data, by_col)
+    stats = weighted_stats.weighted_stats_from_codes(
+        codes,
+        len(index),
+        data[data_col].to_numpy(dtype=np.float64, na_value=np.nan),
+        data[weight_col].to_numpy(dtype=np.float64, na_value=np.nan),
+    )
+    mean = stats["mean"]
 
     if transform:
-        result.name = f"__{data_col}"
-        result = data.merge(result.reset_index(), how="left", on=by_col)[
-            f"__{data_col}"
-        ]
-        result.name = new_column_name
+        # Broadcast the group means back to the rows (NaN for missing keys)
+        values = np.where(codes >= 0, mean[codes], np.nan)
+        return pd.Series(values, index=data.index, name=new_column_name)
 
-    return result
+    return pd.Series(mean, index=index)
 
 
 def groupby_weighted_std(
@@ -351,20 +400,18 @@ def groupby_weighted_std(
 
     ```
 
+    With a polars frame, returns a DataFrame of the groups and their "std".
     """
+    if _is_polars(data):
+        stats = weighted_stats.pl_groupby_weighted_stats(
+            data, data_col, weight_col, by_col=by_col, ddof=ddof
+        )
+        return stats.select(*_as_list(by_col), "std")
 
-    def weighted_sd(input_df):
-        weights = input_df[weight_col]
-        vals = input_df[data_col]
-
-        weighted_avg = np.average(vals, weights=weights)
-
-        numer = np.sum(weights * (vals - weighted_avg) ** 2)
-        denom = ((vals.count() - ddof) / vals.count()) * np.sum(weights)
-
-        return np.sqrt(numer / denom)
-
-    return data.groupby(by_col).apply(weighted_sd)
+    stats = weighted_stats.groupby_weighted_stats(
+        data, data_col, weight_col, by_col=by_col, ddof=ddof
+    )
+    return stats["std"].rename(None)
 
 
 def weighted_quantile(
@@ -396,10 +443,11 @@ def weighted_quantile(
 
     FROM: https://stackoverflow.com/a/29677616
 
-    NOTE: that a groupby weighted quantile can look like this:
+    NOTE: for a groupby weighted quantile, use the vectorized kernel rather
+    than `groupby().apply` with this function:
     ```
-    median_SD_spread = data.groupby('date').apply(
-        lambda x: weighted_quantile(x['rate_SD_spread'], 0.5, sample_weight=x['Volume']))
+    median_SD_spread = weighted_stats.groupby_weighted_quantile(
+        data, 'rate_SD_spread', 0.5, weight_col='Volume', by_col='date')
     ```
     """
     values = np.array(values)
@@ -412,7 +460,8 @@ def weighted_quantile(
     ), "quantiles should be in [0, 1]"
 
     if not values_sorted:
-        sorter = np.argsort(values)
+        # Stable, so tied values with unequal weights are taken in input order
+        sorter = np.argsort(values, kind="stable")
         values = values[sorter]
         sample_weight = sample_weight[sorter]
 
@@ -429,17 +478,64 @@ def weighted_quantile(
 _alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ*@#"
 
 
-@np.vectorize
+def _check_digit_lut():
+    """Digit sum contributed by each byte at each of the 8 CUSIP positions.
+
+    Characters at odd positions are doubled before their decimal digits are
+    summed. Padding (NUL) bytes contribute 0; invalid characters are -1.
+    """
+    lut = np.full((8, 256), -1, dtype=np.int16)
+    lut[:, 0] = 0
+    for pos in range(8):
+        for value, char in enumerate(_alphabet):
+            v = (1, 2)[pos % 2] * value
+            lut[pos, ord(char)] = v // 10 + v % 10
+    return lut
+
+
+_CHECK_DIGIT_LUT = _check_digit_lut()
+
+
 def calc_check_digit(number):
     """Calculate the check digits for the 8-digit cusip.
-    This function is taken from
+
+    Vectorized: `number` can be a string or an array-like (e.g. a Series) of
+    strings. The CUSIPs are packed into a fixed-width byte array and each
+    position's digit sum is read from a lookup table, so there is no Python
+    code per CUSIP.
+
+    The algorithm is taken from
     https://github.com/arthurdejong/python-stdnum/blob/master/stdnum/cusip.py
+
+    Returns
+    -------
+    numpy.array
+        of 1-character strings with the same shape as `number`
+
+    Raises
+    ------
+    ValueError
+        If a CUSIP is not 8 characters long or has an invalid character
+
+    Examples
+    --------
+    ```
+    >>> calc_check_digit(['03783310', '17275R10'])
+    array(['0', '2'], dtype='<U1')
+
+    ```
     """
-    # convert to numeric first, then sum individual digits
-    number = "".join(
-        str((1, 2)[i % 2] * _alphabet.index(n)) for i, n in enumerate(number)
-    )
-    return str((10 - sum(int(n) for n in number)) % 10)
+    cusips = np.asarray(number, dtype=str)
+    if (np.char.str_len(cusips) != 8).any():
+        raise ValueError("CUSIPs must have 8 characters to compute a check digit")
+    cusips = cusips.astype("S8")
+    codes = cusips.reshape(-1).view(np.uint8).reshape(-1, 8)
+    values = _CHECK_DIGIT_LUT[np.arange(8), codes]
+    if (values < 0).any():
+        raise ValueError("CUSIPs may only contain 0-9, A-Z, '*', '@' and '#'")
+    digits = (10 - values.sum(axis=1) % 10) % 10
+    out = (digits.astype(np.uint8) + ord("0")).view("S1").astype("U1")
+    return out.reshape(cusips.shape)
 
 
 def convert_cusips_from_8_to_9_digit(cusip_8dig_series):
@@ -448,12 +544,35 @@ def convert_cusips_from_8_to_9_digit(cusip_8dig_series):
     return new9
 
 
+def pl_calc_check_digit(expr):
+    """Polars expression for the CUSIP check digit of a string expression.
+
+    Examples
+    --------
+    ```
+    df.with_columns(cusip9=pl.col("cusip8") + pl_calc_check_digit(pl.col("cusip8")))
+    ```
+    """
+    import polars as pl
+
+    if isinstance(expr, str):
+        expr = pl.col(expr)
+    total = pl.sum_horizontal(
+        expr.str.slice(pos, 1).replace_strict(
+            {"": 0, **{char: int(_CHECK_DIGIT_LUT[pos, ord(char)]) for char in _alphabet}},
+            return_dtype=pl.Int32,
+        )
+        for pos in range(8)
+    )
+    return ((10 - total % 10) % 10).cast(pl.String)
+
+
 def _with_lagged_column_no_resample(
     df=None,
     columns_to_lag=None,
     id_columns=None,
     lags=1,
-    # date_col="date",
+    date_col="date",
     prefix="L",
 ):
     """This can be easily accomplished with the shift method. For example,
@@ -481,14 +600,98 @@ def _with_lagged_column_no_resample(
     # lag_sub_df = lag_sub_df.rename(columns={'_lagged_date':date_col})
 
     ## New Method
-    subsub_df = df.groupby(id_columns)[columns_to_lag].shift(lags)
     lag_sub_df = df.copy()
-    for col in columns_to_lag:
-        lag_sub_df[f"{prefix}{lags}_{col}"] = subsub_df[col]
+    grouped = df.groupby(id_columns)[columns_to_lag]
+    for lag in np.atleast_1d(lags):
+        subsub_df = grouped.shift(lag)
+        for col in columns_to_lag:
+            lag_sub_df[f"{prefix}{lag}_{col}"] = subsub_df[col]
 
     return lag_sub_df
 
 
+def _period_positions(dates, freq):
+    """Resampling bins of `freq` covering `dates` and the bin of each date.
+
+    The bins are those of `resample(freq)` over the dates, so a date maps to
+    the same bin (and label) as in `df.resample(freq)`, including empty bins
+    in between.
+
+    Returns
+    -------
+    tuple
+        (DatetimeIndex of bin labels, numpy array with the bin position of
+        each date)
+    """
+    unique_dates, date_codes = np.unique(dates, return_inverse=True)
+    counts = (
+        pd.Series(np.ones(len(unique_dates)), index=pd.DatetimeIndex(unique_dates))
+        .resample(freq)
+        .count()
+    )
+    bin_of_date = np.repeat(np.arange(len(counts)), counts.to_numpy())
+    return counts.index, bin_of_date[date_codes]
+
+
+def _with_lagged_columns_resample(
+    df, columns_to_lag, id_column, lags, date_col, prefix, freq
+):
+    """Lag on the `freq` grid without building the dates x ids wide frame.
+
+    Every (bin, id) cell gets the integer key `bin * n_ids + id_code`. The
+    value of a cell is the last non-missing value in its bin, and lagging by
+    `lag` periods moves it to key `+ lag * n_ids`, so the lag is a sorted join
+    on integer keys. Only cells that hold data or a lagged value are
+    materialized, so memory is proportional to the input. The keys are also
+    the row labels the pivot/resample/stack/merge implementation produced.
+    """
+    dates = df[date_col].to_numpy()
+    labels, pos = _period_positions(dates, freq)
+    id_codes, ids = pd.factorize(df[id_column], sort=True)
+    n_bins, n_ids = len(labels), len(ids)
+    valid = id_codes >= 0
+    keys = pos.astype(np.int64) * n_ids + id_codes
+
+    # Rows dated on their bin label are the ones that match a grid cell
+    on_grid = valid & (labels.to_numpy()[pos] == dates)
+    left = df[on_grid].set_axis(pd.Index(keys[on_grid]), axis=0)
+
+    lagged = {}
+    for col in columns_to_lag:
+        has_value = valid & df[col].notna().to_numpy()
+        src_keys = keys[has_value]
+        order = np.lexsort((dates[has_value], src_keys))
+        src_keys = src_keys[order]
+        src_values = df[col].to_numpy()[has_value][order]
+        if src_values.dtype.kind in "iu":
+            src_values = src_values.astype(np.float64)
+        # Last observation in each (bin, id) cell, like resample().last()
+        last = np.append(src_keys[1:] != src_keys[:-1], True)
+        src_keys, src_values = src_keys[last], src_values[last]
+        src_pos, src_ids = np.divmod(src_keys, n_ids)
+        for lag in lags:
+            in_range = (src_pos + lag >= 0) & (src_pos + lag < n_bins)
+            target = (src_pos[in_range] + lag) * n_ids + src_ids[in_range]
+            lagged[f"{prefix}{lag}_{col}"] = pd.Series(src_values[in_range], index=target)
+
+    key_arrays = [left.index.to_numpy()] + [s.index.to_numpy() for s in lagged.values()]
+    all_keys = pd.Index(np.unique(np.concatenate(key_arrays)))
+    if len(left) < n_bins * n_ids:
+        # Upcast like a merge onto the full grid, which has unmatched cells
+        out = left.reindex(all_keys.append(pd.Index([-1]))).iloc[:-1]
+    else:
+        out = left.reindex(all_keys)
+    out_pos, out_ids = np.divmod(all_keys.to_numpy(), n_ids)
+    out[date_col] = labels[out_pos]
+    out[id_column] = ids[out_ids]
+    for new_col, values in lagged.items():
+        out[new_col] = values.reindex(all_keys).to_numpy()
+
+    out = out.dropna(subset=[*columns_to_lag, *lagged], how="all")
+    out_pos, out_ids = np.divmod(out.index.to_numpy(), n_ids)
+    return out.iloc[np.lexsort((out_pos, out_ids))]
+
+
 def with_lagged_columns(
     df=None,
     column_to_lag=None,
@@ -502,6 +705,11 @@ def with_lagged_columns(
     """
     Add lagged columns to a dataframe, respecting frequency of the data.
 
+    `column_to_lag` and `lags` can be lists, in which case a
+    `{prefix}{lag}_{column}` column is added for every column and lag. With
+    `resample=True`, dates are mapped to `freq` periods and values are lagged
+    by periods rather than by rows, without building a dates x ids frame.
+
     Examples
     --------
 
@@ -596,19 +804,22 @@ def with_lagged_columns(
     as seen here: https://business-science.github.io/pytimetk/guides/03_pandas_frequency.html
 
     """
+    columns_to_lag = [column_to_lag] if isinstance(column_to_lag, str) else list(column_to_lag)
+    lags = [int(lag) for lag in np.atleast_1d(lags)]
     if resample:
-        df_wide = df.pivot(index=date_col, columns=id_column, values=column_to_lag)
-        new_col = f"{prefix}{lags}_{column_to_lag}"
-        df_resampled = df_wide.resample(freq).last()
-        df_lagged = df_resampled.shift(lags)
-        df_lagged = df_lagged.stack(dropna=False).reset_index(name=new_col)
-        df_lagged = df.merge(df_lagged, on=[date_col, id_column], how="right")
-        df_lagged = df_lagged.dropna(subset=[column_to_lag, new_col], how="all")
-        df_lagged = df_lagged.sort_values(by=[id_column, date_col])
+        df_lagged = _with_lagged_columns_resample(
+            df,
+            columns_to_lag=columns_to_lag,
+            id_column=id_column,
+            lags=lags,
+            date_col=date_col,
+            prefix=prefix,
+            freq=freq,
+        )
     else:
         df_lagged = _with_lagged_column_no_resample(
             df=df,
-            columns_to_lag=[column_to_lag],
+            columns_to_lag=columns_to_lag,
             id_columns=[id_column],
             lags=lags,
             date_col=date_col,
@@ -653,10 +864,209 @@ def leave_one_out_sums(df, groupby=[], summed_col=""):
     ```
 
     """
-    s = df.groupby(groupby)[summed_col].transform(lambda x: x.sum() - x)
+    s = leave_one_out_aggregates(df, groupby=groupby, columns=[summed_col], stats=["sum"])
+    s = s.iloc[:, 0].rename(summed_col)
+    # A row whose own value is missing gets NaN, like `x.sum() - x`
+    s = s.mask(df[summed_col].isna())
+    # Integer sums stay integer, like `transform`, unless a missing group
+    # key leaves a NaN (float64 then, as `transform` gives)
+    if df[summed_col].dtype.kind in "iu" and not s.isna().any():
+        s = s.astype(df[summed_col].dtype)
     return s
 
 
+def leave_one_out_aggregates(df, groupby=[], columns=[], stats=["sum", "mean", "count"]):
+    """
+    Compute leave-one-out sums, means and counts of many columns at once.
+
+    For every row, the statistic is taken over the other rows of its group:
+    the group total (one bincount per column) minus the row's own value.
+    Missing values are skipped, both in the group totals and as the row's
+    own value, so the leave-one-out count is the number of other non-missing
+    values and the mean is NaN when there are none. Rows with a missing
+    group key get NaN.
+
+    Returns
+    -------
+    pd.DataFrame
+        aligned with `df`, with a `LOO_{Stat}_{col}` column (e.g.
+        `LOO_Sum_C`) for every column and statistic
+
+    Examples
+    --------
+
+    ```
+    >>> df = pd.DataFrame({
+    ...     'B' : ['one', 'one', 'one', 'two', 'two', 'two'],
+    ...     'C' : [1, 5, 5, 2, 5, 3],
+    ...     'D' : [2.0, 5., np.nan, 1., 2., 9.],
+    ...                })
+    >>> leave_one_out_aggregates(df, groupby=['B'], columns=['C', 'D'], stats=['sum', 'count'])
+       LOO_Sum_C  LOO_Count_C  LOO_Sum_D  LOO_Count_D
+    0       10.0          2.0        5.0          1.0
+    1        6.0          2.0        2.0          1.0
+    2        6.0          2.0        7.0          2.0
+    3        8.0          2.0       11.0          2.0
+    4        5.0          2.0       10.0          2.0
+    5        7.0          2.0        3.0          2.0
+
+    ```
+
+    With a polars frame, dispatches to `pl_leave_one_out_aggregates` and
+    returns only the `LOO_` columns, in the order of `df`.
+    """
+    if _is_polars(df):
+        out = pl_leave_one_out_aggregates(df, groupby=groupby, columns=columns, stats=stats)
+        names = [f"LOO_{stat.capitalize()}_{col}" for col in columns for stat in stats]
+        return out.lazy().select(names).collect()
+
+    codes, index = weighted_stats.group_codes(df, groupby)
+    n_groups = len(index)
+    valid_key = codes >= 0
+    safe_codes = np.where(valid_key, codes, 0)
+
+    out = {}
+    for col in columns:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = valid_key & ~np.isnan(values)
+        own = np.where(present, values, 0.0)
+        total = np.bincount(codes[present], weights=own[present], minlength=n_groups)
+        n = np.bincount(codes[present], minlength=n_groups)
+
+        loo_sum = np.where(valid_key, total[safe_codes] - own, np.nan)
+        loo_count = np.where(valid_key, n[safe_codes] - present, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            loo_mean = np.where(loo_count > 0, loo_sum / loo_count, np.nan)
+
+        results = {"sum": loo_sum, "mean": loo_mean, "count": loo_count}
+        for stat in stats:
+            out[f"LOO_{stat.capitalize()}_{col}"] = results[stat]
+    return pd.DataFrame(out, index=df.index)
+
+
+def pl_leave_one_out_aggregates(df, groupby=[], columns=[], stats=["sum", "mean", "count"]):
+    """
+    Polars version of `leave_one_out_aggregates`.
+
+    The group totals are computed in one `group_by` and joined back, which is
+    much faster than one `over()` window per column and statistic.
+
+    Returns `df` with the `LOO_{Stat}_{col}` columns added.
+    """
+    import polars as pl
+
+    values = {col: pl.col(col).cast(pl.Float64).fill_nan(None) for col in columns}
+    totals = df.group_by(groupby).agg(
+        [x.sum().alias(f"_sum_{col}") for col, x in values.items()]
+        + [x.count().alias(f"_count_{col}") for col, x in values.items()]
+    )
+
+    exprs = []
+    for col, x in values.items():
+        loo_sum = pl.col(f"_sum_{col}") - x.fill_null(0)
+        loo_count = pl.col(f"_count_{col}") - x.is_not_null().cast(pl.UInt32)
+        results = {
+            "sum": loo_sum,
+            "mean": pl.when(loo_count > 0).then(loo_sum / loo_count),
+            "count": loo_count.cast(pl.Float64),
+        }
+        for stat in stats:
+            exprs.append(results[stat].alias(f"LOO_{stat.capitalize()}_{col}"))
+
+    # A left join keeps the row order of df; rows with a null key get nulls
+    return (
+        df.join(totals, on=groupby, how="left")
+        .with_columns(exprs)
+        .drop([f"_{agg}_{col}" for agg in ["sum", "count"] for col in columns])
+    )
+
+
+def _shift_calendar_array(dates, period_months, months_ahead, days_ahead):
+    """Floor dates to the start of their month (1) or quarter (3), then shift.
+
+    Dates are turned into integer months since 1970-01 (a quarter start), so
+    the period start is `months - months % period_months`. The result is
+    `months_ahead` months and `days_ahead` days after that start, at
+    midnight. NaT stays NaT. Returns the same container type as `dates`
+    (Series, DatetimeIndex or numpy datetime64 array).
+    """
+    index = pd.DatetimeIndex(dates)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    values = index.to_numpy(dtype="datetime64[ns]")
+
+    months = values.astype("datetime64[M]").astype(np.int64)
+    start = months - months % period_months
+    out = (start + months_ahead).astype("datetime64[M]").astype("datetime64[D]")
+    out = (out + np.timedelta64(days_ahead, "D")).astype("datetime64[ns]")
+    out[np.isnat(values)] = np.datetime64("NaT")
+
+    if isinstance(dates, pd.Series):
+        return pd.Series(out, index=dates.index, name=dates.name)
+    if isinstance(dates, pd.Index):
+        return pd.DatetimeIndex(out, name=dates.name)
+    return out
+
+
+def _shift_calendar_scalar(d, period_months, months_ahead, days_ahead):
+    """Scalar version of `_shift_calendar_array`, returning a datetime."""
+    months = d.year * 12 + d.month - 1
+    year, month = divmod(months - months % period_months + months_ahead, 12)
+    return datetime.datetime(year, month + 1, 1) + datetime.timedelta(days=days_ahead)
+
+
+def get_most_recent_quarter_end_array(dates):
+    """
+    Most recent quarter end before each date (Series, DatetimeIndex or array)
+
+    ```
+    >>> get_most_recent_quarter_end_array(pd.to_datetime(['2019-10-21', '2020-02-29']))
+    DatetimeIndex(['2019-09-30', '2019-12-31'], dtype='datetime64[ns]', freq=None)
+
+    ```
+    """
+    return _shift_calendar_array(dates, 3, 0, -1)
+
+
+def get_next_quarter_start_array(dates):
+    """
+    Start date of the next quarter of each date (Series, DatetimeIndex or array)
+
+    ```
+    >>> get_next_quarter_start_array(pd.to_datetime(['2019-10-21', '2020-02-29']))
+    DatetimeIndex(['2020-01-01', '2020-04-01'], dtype='datetime64[ns]', freq=None)
+
+    ```
+    """
+    return _shift_calendar_array(dates, 3, 3, 0)
+
+
+def get_end_of_current_month_array(dates):
+    """
+    Last date of the current month of each date, with the time reset to zero
+
+    ```
+    >>> get_end_of_current_month_array(pd.to_datetime(['2019-10-21 00:00', '2024-02-10 12:00']))
+    DatetimeIndex(['2019-10-31', '2024-02-29'], dtype='datetime64[ns]', freq=None)
+
+    ```
+    """
+    return _shift_calendar_array(dates, 1, 1, -1)
+
+
+def get_end_of_current_quarter_array(dates):
+    """
+    Last date of the current quarter of each date, with the time reset to zero
+
+    ```
+    >>> get_end_of_current_quarter_array(pd.to_datetime(['2019-10-21 00:00', '2023-03-31 12:00']))
+    DatetimeIndex(['2019-12-31', '2023-03-31'], dtype='datetime64[ns]', freq=None)
+
+    ```
+    """
+    return _shift_calendar_array(dates, 3, 3, -1)
+
+
 def get_most_recent_quarter_end(d):
     """
     Take a datetime and find the most recent quarter end date
@@ -668,9 +1078,7 @@ def get_most_recent_quarter_end(d):
 
     ```
     """
-    quarter_month = (d.month - 1) // 3 * 3 + 1
-    quarter_end = datetime.datetime(d.year, quarter_month, 1) - relativedelta(days=1)
-    return quarter_end
+    return _shift_calendar_scalar(d, 3, 0, -1)
 
 
 def get_next_quarter_start(d):
@@ -684,11 +1092,7 @@ def get_next_quarter_start(d):
 
     ```
     """
-    quarter_month = (d.month - 1) // 3 * 3 + 4
-    years_to_add = quarter_month // 12
-    quarter_month_mod = quarter_month % 12
-    quarter_start = datetime.datetime(d.year + years_to_add, quarter_month_mod, 1)
-    return quarter_start
+    return _shift_calendar_scalar(d, 3, 3, 0)
 
 
 def get_end_of_current_month(d):
@@ -706,17 +1110,8 @@ def get_end_of_current_month(d):
     Timestamp('2023-03-31 00:00:00')
 
     ```
-
-    From https://stackoverflow.com/a/13565185
     """
-    # Reset tiem part of datetime to zero: https://stackoverflow.com/a/26883852
-    d = pd.DatetimeIndex([d]).normalize()[0]
-
-    # The day 28 exists in every month. 4 days later, it's always next month
-    next_month = d.replace(day=28) + datetime.timedelta(days=4)
-    # subtracting the number of the current day brings us back one month
-    end_of_current_month = next_month - datetime.timedelta(days=next_month.day)
-    return end_of_current_month
+    return pd.Timestamp(_shift_calendar_scalar(d, 1, 1, -1))
 
 
 def get_end_of_current_quarter(d):
@@ -737,9 +1132,27 @@ def get_end_of_current_quarter(d):
 
     ```
     """
-    quarter_start = get_next_quarter_start(d)
-    quarter_end = quarter_start - datetime.timedelta(days=1)
-    return quarter_end
+    return _shift_calendar_scalar(d, 3, 3, -1)
+
+
+def quarter_line_dates(start_date, end_date, extend_to_nearest_quarter=True):
+    """
+    Quarter-end dates between `start_date` and `end_date`, where
+    `add_vertical_lines_to_plot` draws its lines
+
+    ```
+    >>> quarter_line_dates('2019-10-21', '2020-05-02')
+    DatetimeIndex(['2019-09-30', '2019-12-31', '2020-03-31', '2020-06-30'], dtype='datetime64[ns]', freq='QE-DEC')
+
+    ```
+    """
+    start_date = pd.to_datetime(start_date)
+    end_date = pd.to_datetime(end_date)
+    if extend_to_nearest_quarter:
+        start_date = get_most_recent_quarter_end(start_date)
+        end_date = get_next_quarter_start(end_date)
+    dates = pd.date_range(start_date, end_date + pd.offsets.QuarterBegin(1), freq="QE")
+    return dates[(dates >= start_date) & (dates <= end_date)]
 
 
 def add_vertical_lines_to_plot(
@@ -751,27 +1164,134 @@ def add_vertical_lines_to_plot(
     alpha=0.1,
     extend_to_nearest_quarter=True,
 ):
-    # start_date = '2019-09-10'
-    # end_date = '2022-09-01'
-    if extend_to_nearest_quarter:
-        start_date = get_most_recent_quarter_end(start_date)
-        end_date = get_next_quarter_start(end_date)
-    if freq == "Q":
-        dates = pd.date_range(
-            pd.to_datetime(start_date),
-            pd.to_datetime(end_date) + pd.offsets.QuarterBegin(1),
-            freq="Q",
+    """
+    Shade quarter ends with vertical lines and put the ticks on quarter starts.
+
+    All lines are drawn as a single LineCollection spanning the full height
+    of the axes, rather than one artist per quarter.
+
+    Returns:
+        matplotlib.collections.LineCollection or None if no lines are drawn
+    """
+    from matplotlib import pyplot as plt
+    import matplotlib.dates as mdates
+
+    if freq != "Q":
+        raise ValueError
+    if ax is None:
+        ax = plt.gca()
+
+    dates = quarter_line_dates(
+        start_date, end_date, extend_to_nearest_quarter=extend_to_nearest_quarter
+    )
+    lines = None
+    if adjust_ticks:
+        lines = ax.vlines(
+            dates, 0, 1, transform=ax.get_xaxis_transform(), colors="k", alpha=alpha
+        )
+        ax.xaxis.set_major_locator(mdates.MonthLocator((1, 4, 7, 10)))
+    ax.xaxis.set_tick_params(rotation=90)
+    return lines
+
+
+def compute_weighted_median_bands(
+    data,
+    variable_name,
+    date_col="date",
+    weight_col=None,
+    percentile_bars=True,
+    percentiles=[0.25, 0.75],
+    rolling_window=1,
+    rolling=False,
+    rolling_min_periods=None,
+):
+    """
+    Weighted median (and percentile bands) of a variable per date, the data
+    behind `plot_weighted_median_with_distribution_bars`.
+
+    Compute this once and pass it to `plot_weighted_median_bands` to draw
+    the same series on several figures without repeating the aggregation.
+
+    Returns:
+        pd.DataFrame: Indexed by date, with columns "median" and, if
+        `percentile_bars`, "lower" and "upper" for the two `percentiles`
+
+    Raises:
+        ValueError: If `percentile_bars` and `percentiles` is not a
+        (lower, upper) pair
+
+    ```
+    >>> df = pd.DataFrame({
+    ...     'date': pd.to_datetime(['2020-01-01'] * 3 + ['2020-01-02'] * 2),
+    ...     'x': [1, 2, 3, 10, 20],
+    ... })
+    >>> compute_weighted_median_bands(df, 'x')  # doctest: +NORMALIZE_WHITESPACE
+                median  lower  upper
+    date
+    2020-01-01     2.0   1.25   2.75
+    2020-01-02    15.0  10.00  20.00
+
+    ```
+    """
+    if percentile_bars and len(percentiles) != 2:
+        raise ValueError(
+            f"percentiles must be a (lower, upper) pair, got {list(percentiles)}"
+        )
+    quantiles = [0.5] + list(percentiles) if percentile_bars else [0.5]
+    bands = weighted_stats.groupby_weighted_quantile(
+        data, variable_name, quantiles, weight_col=weight_col, by_col=date_col
+    )
+    bands.columns = ["median", "lower", "upper"] if percentile_bars else ["median"]
+    if rolling:
+        bands = bands.rolling(rolling_window, min_periods=rolling_min_periods).mean()
+    return bands
+
+
+def plot_weighted_median_bands(
+    bands,
+    rescale_factor=1,
+    ax=None,
+    add_quarter_lines=True,
+    ylabel=None,
+    xlabel=None,
+    label=None,
+):
+    """Plot weighted median bands from `compute_weighted_median_bands`.
+
+    The bands are not recomputed, so the same frame can be rendered on as
+    many axes as needed. The "lower"/"upper" columns are shaded if present.
+    """
+    from matplotlib import pyplot as plt
+
+    if ax is None:
+        plt.clf()
+        _, ax = plt.subplots()
+
+    median = bands["median"]
+    (median * rescale_factor).plot(ax=ax, label=label)
+
+    if "lower" in bands and "upper" in bands:
+        lower = bands["lower"].to_numpy() * rescale_factor
+        upper = bands["upper"].to_numpy() * rescale_factor
+        ax.plot(median.index, lower, color="tab:blue", alpha=0.1)
+        ax.plot(median.index, upper, color="tab:blue", alpha=0.1)
+        ax.fill_between(median.index, lower, upper, alpha=0.2)
+
+    if add_quarter_lines and len(bands) > 0:
+        add_vertical_lines_to_plot(
+            bands.index.min(), bands.index.max(), ax=ax, freq="Q", adjust_ticks=True, alpha=0.05
         )
-        mask = (dates >= start_date) & (dates <= end_date)
-        dates = dates[mask]
-        months = mdates.MonthLocator((1, 4, 7, 10))
-        if adjust_ticks:
-            for d in dates:
-                plt.axvline(d, color="k", alpha=alpha)
-            ax.xaxis.set_major_locator(months)
         ax.xaxis.set_tick_params(rotation=90)
-    else:
-        raise ValueError
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+
+    if ylabel is not None:
+        ax.set_ylabel(ylabel)
+    if xlabel is not None:
+        ax.set_xlabel(xlabel)
+
+    plt.tight_layout()
+    return ax
 
 
 def plot_weighted_median_with_distribution_bars(
@@ -841,69 +1361,39 @@ def plot_weighted_median_with_distribution_bars(
     -----
     rolling_window=1 means that there is no rolling aggregation applied.
 
+    To draw the same series on several figures, call
+    `compute_weighted_median_bands` once and `plot_weighted_median_bands`
+    for each figure.
 
-    """
-    if ax is None:
-        plt.clf()
-        _, ax = plt.subplots()
 
-    median_series = data.groupby(date_col).apply(
-        lambda x: weighted_quantile(x[variable_name], 0.5, sample_weight=x[weight_col])
+    """
+    bands = compute_weighted_median_bands(
+        data,
+        variable_name,
+        date_col=date_col,
+        weight_col=weight_col,
+        percentile_bars=percentile_bars,
+        percentiles=percentiles,
+        rolling_window=rolling_window,
+        rolling=rolling,
+        rolling_min_periods=rolling_min_periods,
     )
-    if rolling:
-        wavrs = median_series.rolling(
-            rolling_window, min_periods=rolling_min_periods
-        ).mean()
-    else:
-        wavrs = median_series
-    (wavrs * rescale_factor).plot(ax=ax, label=label)
-
-    if percentile_bars:
-        lower = data.groupby(date_col).apply(
-            lambda x: weighted_quantile(
-                x[variable_name], percentiles[0], sample_weight=x[weight_col]
-            )
-        )
-        upper = data.groupby(date_col).apply(
-            lambda x: weighted_quantile(
-                x[variable_name], percentiles[1], sample_weight=x[weight_col]
-            )
-        )
-        if rolling:
-            lower = lower.rolling(
-                rolling_window, min_periods=rolling_min_periods
-            ).mean()
-            upper = upper.rolling(
-                rolling_window, min_periods=rolling_min_periods
-            ).mean()
-        ax.plot(wavrs.index, lower * rescale_factor, color="tab:blue", alpha=0.1)
-        ax.plot(wavrs.index, upper * rescale_factor, color="tab:blue", alpha=0.1)
-        ax.fill_between(
-            wavrs.index, lower * rescale_factor, upper * rescale_factor, alpha=0.2
-        )
-
-    if add_quarter_lines:
-        start_date = data[date_col].min()
-        end_date = data[date_col].max()
-        add_vertical_lines_to_plot(
-            start_date, end_date, ax=ax, freq="Q", adjust_ticks=True, alpha=0.05
-        )
-        ax.xaxis.set_tick_params(rotation=90)
-        ax.spines["top"].set_visible(False)
-        ax.spines["right"].set_visible(False)
 
     if ylabel is None:
         if rolling_window > 1:
             ylabel = f"{variable_name} ({rolling_window}-day ave.)"
         else:
             ylabel = f"{variable_name}"
-    ax.set_ylabel(ylabel)
-
-    if xlabel is not None:
-        ax.set_xlabel(xlabel)
 
-    plt.tight_layout()
-    return ax
+    return plot_weighted_median_bands(
+        bands,
+        rescale_factor=rescale_factor,
+        ax=ax,
+        add_quarter_lines=add_quarter_lines,
+        ylabel=ylabel,
+        xlabel=xlabel,
+        label=label,
+    )
 
 
 if __name__ == "__main__":
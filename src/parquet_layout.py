@@ -0,0 +1,279 @@
+"""
+Parquet layout for the date-indexed panels of the pipeline.
+
+`write_parquet` replaces `DataFrame.to_parquet` (one row group, dictionary
+encoding attempted on every column, snappy) with a layout tuned for how the
+panels are read:
+
+- rows are sorted by date and row groups start on calendar-year boundaries,
+  so the min/max statistics of the date column let a date-range filter
+  (`pd.read_parquet(path, filters=[("date", ">=", start)])`) skip whole
+  row groups. Consecutive years are merged until a row group holds at least
+  `MIN_ROW_GROUP_ROWS` rows: a row group per year of business days (about
+  260 rows) makes full reads several times slower than the pruning saves;
+- column statistics and the page index are written;
+- every column gets the encoding and codec of its dtype in `PINNED_CODECS`
+  (`pinned_codecs`), and dictionary encoding if it has low cardinality.
+  The same frame is always written to the same bytes, so doit and byte-level
+  diffs see no spurious changes and a write runs no benchmark.
+
+`PINNED_CODECS` was picked offline with `choose_codecs` (see
+bench_parquet_layout.py), which `write_parquet(codecs="auto")` also runs as
+an opt-in: each applicable candidate in `CANDIDATE_CODECS` is written and
+read back on a sample of every column, and the smallest one whose read time
+is within `MAX_READ_SLOWDOWN` of the fastest candidate wins. Byte-stream-split
+is tried on floats, delta encoding on integers and dates, and dictionary
+encoding is used for low-cardinality columns only. Its choice depends on
+measured read times, so it can change from one run to the next.
+
+The file is ordinary parquet: `pd.read_parquet` returns the same frame that
+`write_parquet` returns (the input sorted by date). `layout_report` compares
+file size and read latency of several layouts on common query patterns; see
+bench_parquet_layout.py.
+"""
+
+import io
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+# Encodings/codecs tried for every column
+CANDIDATE_CODECS = [
+    {"encoding": "PLAIN", "compression": "snappy"},
+    {"encoding": "PLAIN", "compression": "zstd", "compression_level": 3},
+    {"encoding": "BYTE_STREAM_SPLIT", "compression": "lz4"},
+    {"encoding": "BYTE_STREAM_SPLIT", "compression": "zstd", "compression_level": 3},
+    {"encoding": "BYTE_STREAM_SPLIT", "compression": "zstd", "compression_level": 9},
+    {"encoding": "DELTA_BINARY_PACKED", "compression": "zstd", "compression_level": 3},
+]
+MAX_READ_SLOWDOWN = 1.5
+# Encoding and codec of each kind of column, chosen by `choose_codecs` on the
+# panel of bench_parquet_layout.py stored as float64, float32 and scaled int32
+# (bps with 4 decimals do not byte-stream-split well as float64)
+PINNED_CODECS = {
+    "float64": {"encoding": "PLAIN", "compression": "zstd", "compression_level": 3},
+    "float32": {"encoding": "BYTE_STREAM_SPLIT", "compression": "zstd", "compression_level": 3},
+    "integer": {"encoding": "DELTA_BINARY_PACKED", "compression": "zstd", "compression_level": 3},
+    "other": {"encoding": "PLAIN", "compression": "zstd", "compression_level": 3},
+}
+SAMPLE_ROWS = 200_000
+MIN_ROW_GROUP_ROWS = 16_384
+# Columns with at most this share of distinct values are dictionary encoded
+DICTIONARY_MAX_DISTINCT = 0.1
+
+
+def _applicable(codec, series, use_dictionary):
+    encoding = codec["encoding"]
+    if use_dictionary or encoding == "PLAIN":
+        # Dictionary-encoded columns only choose a codec
+        return encoding == "PLAIN"
+    if encoding == "BYTE_STREAM_SPLIT":
+        return pd.api.types.is_float_dtype(series.dtype)
+    return pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_datetime64_dtype(
+        series.dtype
+    )
+
+
+def _use_dictionary(series):
+    n = len(series)
+    return n > 0 and series.nunique(dropna=False) <= DICTIONARY_MAX_DISTINCT * n
+
+
+def _encode_column(table, col, codec, use_dictionary):
+    import pyarrow.parquet as pq
+
+    buf = io.BytesIO()
+    pq.write_table(
+        table.select([col]),
+        buf,
+        compression=codec["compression"],
+        compression_level=codec.get("compression_level"),
+        use_dictionary=use_dictionary,
+        column_encoding=None if use_dictionary else {col: codec["encoding"]},
+    )
+    return buf.getvalue()
+
+
+def _read_time(data, repeat=3):
+    import pyarrow.parquet as pq
+
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pq.read_table(io.BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def choose_codecs(df, candidates=CANDIDATE_CODECS, max_read_slowdown=MAX_READ_SLOWDOWN,
+                  sample_rows=SAMPLE_ROWS):
+    """
+    Pick the encoding and codec of every column by writing a sample.
+
+    Returns:
+        dict: column -> {"encoding", "compression", "compression_level",
+        "use_dictionary", "size", "read_time"}
+    """
+    import pyarrow as pa
+
+    sample = df.iloc[:sample_rows]
+    table = pa.Table.from_pandas(sample, preserve_index=False)
+    plan = {}
+    for col in sample.columns:
+        use_dictionary = _use_dictionary(sample[col])
+        results = []
+        for codec in candidates:
+            if not _applicable(codec, sample[col], use_dictionary):
+                continue
+            data = _encode_column(table, col, codec, use_dictionary)
+            results.append((codec, len(data), _read_time(data)))
+        fastest = min(read_time for _, _, read_time in results)
+        allowed = [r for r in results if r[2] <= max_read_slowdown * fastest]
+        codec, size, read_time = min(allowed, key=lambda r: r[1])
+        plan[col] = {
+            "encoding": None if use_dictionary else codec["encoding"],
+            "compression": codec["compression"],
+            "compression_level": codec.get("compression_level"),
+            "use_dictionary": use_dictionary,
+            "size": size,
+            "read_time": read_time,
+        }
+    return plan
+
+
+def _column_kind(dtype):
+    if pd.api.types.is_float_dtype(dtype):
+        return "float32" if dtype.itemsize == 4 else "float64"
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_datetime64_dtype(dtype):
+        return "integer"
+    return "other"
+
+
+def pinned_codecs(df, codecs=PINNED_CODECS):
+    """
+    Plan of `write_parquet` (as returned by `choose_codecs`, without size
+    and read time) giving every column the codec of its dtype in `codecs`.
+    """
+    plan = {}
+    for col in df.columns:
+        codec = codecs[_column_kind(df[col].dtype)]
+        use_dictionary = _use_dictionary(df[col])
+        plan[col] = {
+            "encoding": None if use_dictionary else codec["encoding"],
+            "compression": codec["compression"],
+            "compression_level": codec.get("compression_level"),
+            "use_dictionary": use_dictionary,
+        }
+    return plan
+
+
+def _row_group_bounds(dates, freq, min_rows):
+    """
+    Row group boundaries of sorted dates: each row group starts at a `freq`
+    period and spans whole periods until it holds at least `min_rows` rows.
+    """
+    periods = pd.DatetimeIndex(dates).to_period(freq).asi8
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    bounds = [0]
+    for start in starts[1:]:
+        if start - bounds[-1] >= min_rows:
+            bounds.append(start)
+    if len(bounds) > 1 and len(dates) - bounds[-1] < min_rows:
+        # Fold a short tail into the previous row group
+        bounds.pop()
+    return np.r_[bounds, len(dates)]
+
+
+def write_parquet(df, path, sort_by="date", row_group_freq="Y",
+                  min_row_group_rows=MIN_ROW_GROUP_ROWS, codecs="pinned",
+                  write_statistics=True, write_page_index=True):
+    """
+    Write `df` to parquet sorted by `sort_by`, with row groups starting on
+    `row_group_freq` periods of that column, and per-column codecs.
+
+    Parameters:
+        df (pd.DataFrame): Frame with a datetime `sort_by` column
+        path: Output path or file object
+        sort_by (str): Date column to sort by and to size row groups on
+        row_group_freq (str): Period row groups start on ("Y", "Q", "M");
+            None for a single row group
+        min_row_group_rows (int): Smallest row group, except when the
+            whole frame is smaller (0 for one row group per period)
+        codecs: "pinned" for `pinned_codecs(df)`, "auto" to benchmark
+            codecs on `df` with `choose_codecs` (not reproducible), a plan
+            from either, or None for the `DataFrame.to_parquet` defaults
+
+    Returns:
+        pd.DataFrame: The frame as written (and as `pd.read_parquet` reads it)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if sort_by is not None and not df[sort_by].is_monotonic_increasing:
+        df = df.sort_values(sort_by, kind="stable", ignore_index=True)
+    if codecs == "pinned":
+        codecs = pinned_codecs(df)
+    elif codecs == "auto":
+        codecs = choose_codecs(df)
+
+    table = pa.Table.from_pandas(df)
+    if df.attrs:
+        # Where DataFrame.to_parquet keeps `df.attrs`, for pd.read_parquet
+        metadata = {**table.schema.metadata, b"PANDAS_ATTRS": json.dumps(df.attrs)}
+        table = table.replace_schema_metadata(metadata)
+    options = {"write_statistics": write_statistics, "write_page_index": write_page_index}
+    if codecs is None:
+        options["compression"] = "snappy"
+    else:
+        options["compression"] = {col: c["compression"] for col, c in codecs.items()}
+        options["compression_level"] = {
+            col: c["compression_level"] for col, c in codecs.items()
+            if c["compression_level"] is not None
+        } or None
+        options["use_dictionary"] = [col for col, c in codecs.items() if c["use_dictionary"]]
+        options["column_encoding"] = {
+            col: c["encoding"] for col, c in codecs.items() if not c["use_dictionary"]
+        } or None
+
+    if sort_by is None or row_group_freq is None:
+        bounds = np.array([0, len(df)])
+    else:
+        bounds = _row_group_bounds(df[sort_by], row_group_freq, min_row_group_rows)
+
+    with pq.ParquetWriter(path, table.schema, **options) as writer:
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            writer.write_table(table.slice(start, stop - start), row_group_size=stop - start)
+    return df
+
+
+def layout_report(df, layouts, queries, directory, repeat=5):
+    """
+    File size and read latency of several layouts for several queries.
+
+    Parameters:
+        layouts (dict): name -> keyword arguments of `write_parquet`
+        queries (dict): name -> keyword arguments of `pd.read_parquet`
+            (e.g. `columns=...`, `filters=...`)
+        directory (Path): Where to write the files
+
+    Returns:
+        pd.DataFrame: One row per layout with "size_kb", "write_s" and one
+        column of read seconds (best of `repeat`) per query
+    """
+    rows = {}
+    for name, options in layouts.items():
+        path = directory / f"{name}.parquet"
+        start = time.perf_counter()
+        write_parquet(df, path, **options)
+        row = {"size_kb": path.stat().st_size / 1024, "write_s": time.perf_counter() - start}
+        for query, read_options in queries.items():
+            best = np.inf
+            for _ in range(repeat):
+                start = time.perf_counter()
+                pd.read_parquet(path, **read_options)
+                best = min(best, time.perf_counter() - start)
+            row[query] = best
+        rows[name] = row
+    return pd.DataFrame.from_dict(rows, orient="index")
@@ -0,0 +1,155 @@
+"""
+In-memory cache of the DataFrames that pipeline stages hand to each other.
+
+Stages read and write their artifacts through `read_parquet`, `read_csv` and
+`to_parquet` instead of calling pandas directly. The files on disk are
+exactly the same, but when several stages run in one long-lived process (see
+`run_pipeline.py` and `PIPELINE_IN_PROCESS` in settings.py) a frame written
+by one stage is served from memory to the next instead of being re-read and
+re-parsed.
+
+A cached entry is only used while the file it came from is unchanged (same
+size and modification time), and callers always receive a copy, so stages
+can modify what they read. When the cache grows past
+`PIPELINE_CACHE_MAX_MB`, the least recently used entries are spilled: frames
+read from parquet are simply dropped (the parquet file is the spill), other
+frames (e.g. parsed CSV files) are written to a parquet file in a spill
+directory, which is much faster to reload than re-parsing the source.
+"""
+
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from settings import config
+
+PIPELINE_CACHE_MAX_MB = config("PIPELINE_CACHE_MAX_MB")
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class DataCache:
+    """LRU cache of DataFrames keyed by source file and read options."""
+
+    def __init__(self, max_bytes, spill_dir=None):
+        self.max_bytes = max_bytes
+        self._spill_dir = Path(spill_dir) if spill_dir is not None else None
+        # key -> {"stamp", "frame", "nbytes", "spill_path"}
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nbytes(self):
+        return sum(e["nbytes"] for e in self._entries.values() if e["frame"] is not None)
+
+    def _spill_path(self, key):
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="pipeline_cache_"))
+        return self._spill_dir / f"{abs(hash(key))}.parquet"
+
+    def get(self, key, path):
+        """Return a copy of the cached frame for `key`, or None."""
+        entry = self._entries.get(key)
+        if entry is None or not os.path.exists(path) or entry["stamp"] != _file_stamp(path):
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        if entry["frame"] is None:
+            # Spilled to disk: reload from the spill file
+            if entry["spill_path"] is None or not entry["spill_path"].exists():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            entry["frame"] = pd.read_parquet(entry["spill_path"])
+
+        frame = entry["frame"]
+        self._entries.move_to_end(key)
+        self._spill_to_budget()
+        self.hits += 1
+        return frame.copy()
+
+    def put(self, key, path, df, spill_to_source=False):
+        """
+        Cache `df` as the content of `path` under `key`.
+
+        If `spill_to_source` is True the file at `path` can be re-read to
+        recover the frame, so spilling just drops it from memory.
+        """
+        self._entries[key] = {
+            "stamp": _file_stamp(path),
+            "frame": df.copy(),
+            "nbytes": _frame_nbytes(df),
+            "spill_path": Path(path) if spill_to_source else None,
+            "spill_to_source": spill_to_source,
+        }
+        self._entries.move_to_end(key)
+        self._spill_to_budget()
+
+    def _spill_to_budget(self):
+        for key in list(self._entries):
+            if self.nbytes <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry["frame"] is None:
+                continue
+            if not entry["spill_to_source"]:
+                spill_path = self._spill_path(key)
+                entry["frame"].to_parquet(spill_path)
+                entry["spill_path"] = spill_path
+            entry["frame"] = None
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+CACHE = DataCache(max_bytes=PIPELINE_CACHE_MAX_MB * 1024**2)
+
+
+def _key(kind, path, kwargs):
+    return (kind, str(Path(path).resolve()), repr(sorted(kwargs.items())))
+
+
+def read_parquet(path, **kwargs):
+    """`pd.read_parquet` served from the cache when the file is unchanged."""
+    key = _key("parquet", path, kwargs)
+    df = CACHE.get(key, path)
+    if df is None:
+        df = pd.read_parquet(path, **kwargs)
+        CACHE.put(key, path, df, spill_to_source=not kwargs)
+    return df
+
+
+def read_csv(path, **kwargs):
+    """`pd.read_csv` served from the cache when the file is unchanged."""
+    key = _key("csv", path, kwargs)
+    df = CACHE.get(key, path)
+    if df is None:
+        df = pd.read_csv(path, **kwargs)
+        CACHE.put(key, path, df)
+    return df
+
+
+def to_parquet(df, path, writer=None, **kwargs):
+    """
+    Write `df` with `DataFrame.to_parquet` (or `writer(df, path, **kwargs)`,
+    which returns the frame as written) and keep it in the cache.
+    """
+    if writer is None:
+        df.to_parquet(path, **kwargs)
+    else:
+        df = writer(df, path, **kwargs)
+    CACHE.put(_key("parquet", path, {}), path, df, spill_to_source=True)
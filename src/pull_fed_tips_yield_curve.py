@@ -3,9 +3,15 @@ import requests
 from io import BytesIO
 from pathlib import Path
 
+import pipeline_cache
+from compact_storage import compact_frame, expand_frame, rate_units
+from day_index import with_day_column
 from settings import config
 DATA_DIR = config('DATA_DIR')
 
+# Yield, forward and breakeven columns, in percent
+RATE_PREFIXES = ("TIPSY", "TIPSPY", "TIPSF", "TIPS1F", "TIPS5F", "BKEVEN")
+
 # Define the URL for the TIPS yield data
 TIPS_URL = "https://www.federalreserve.gov/data/yield-curve-tables/feds200805.csv"
 
@@ -54,10 +60,11 @@ def pull_fed_tips_yield_curve():
 
 def save_tips_yield_curve(df, data_dir):
     """
-    Save the TIPS yield curve DataFrame to a parquet file.
+    Save the TIPS yield curve DataFrame to a parquet file, with the rates
+    stored compact if the COMPACT_STORAGE setting asks for it.
     """
     path = Path(data_dir) / "fed_tips_yield_curve.parquet"
-    df.to_parquet(path)
+    pipeline_cache.to_parquet(compact_frame(df, rate_units(df, RATE_PREFIXES)), path)
 
 def load_tips_yield_curve(data_dir):
     """
@@ -68,13 +75,16 @@ def load_tips_yield_curve(data_dir):
     Target columns: ['TIPS_Treasury_02Y', 'TIPS_Treasury_05Y', 'TIPS_Treasury_10Y', 'TIPS_Treasury_20Y']
     
     Note: TIPSY30 is ignored since only four target columns are provided.
+
+    The frame starts with the "date" and "day" columns (see day_index.py).
     """
     path = Path(data_dir) / "fed_tips_yield_curve.parquet"
     df = pd.read_parquet(path)
     
     # Select only the required columns (ignoring TIPSY30)
     selected_cols = ['TIPSY02', 'TIPSY05', 'TIPSY10', 'TIPSY20']
-    df = df[selected_cols]
+    df = expand_frame(df[['Date'] + selected_cols]).rename(columns={'Date': 'date'})
+    df = with_day_column(df, format="%Y-%m-%d")
     
     # Rename the selected columns as specified.
     rename_mapping = {
@@ -87,9 +97,13 @@ def load_tips_yield_curve(data_dir):
     
     return df
 
-# Example usage
-if __name__ == "__main__":
+def main():
     tips_df = pull_fed_tips_yield_curve()
     save_tips_yield_curve(tips_df, DATA_DIR)
+
+
+# Example usage
+if __name__ == "__main__":
+    main()
     # To load the data later
     #loaded_tips_df = load_tips_yield_curve(DATA_DIR)
\ No newline at end of file
@@ -3,9 +3,14 @@ import requests
 from io import BytesIO
 from pathlib import Path
 
+import pipeline_cache
+from compact_storage import compact_frame, expand_frame, rate_units
 from settings import config
 DATA_DIR = config('DATA_DIR')
 
+# Yield and forward columns, in percent (the betas and taus are kept float64)
+RATE_PREFIXES = ("SVENY", "SVENPY", "SVENF", "SVEN1F")
+
 
 def pull_fed_yield_curve():
     """
@@ -38,7 +43,7 @@ def load_fed_yield_curve_all(data_dir=DATA_DIR):
     # Select the specific columns. Note: SVENY03 is included so that
     # we can rename to "Treasury_SF_03Y" as requested.
     selected_cols = ['SVENY02', 'SVENY03', 'SVENY05', 'SVENY10', 'SVENY20', 'SVENY30']
-    _df = _df[selected_cols]
+    _df = expand_frame(_df[selected_cols])
     
     # Rename the columns to the desired names.
     rename_mapping = {
@@ -56,15 +61,20 @@ def load_fed_yield_curve_all(data_dir=DATA_DIR):
 def load_fed_yield_curve(data_dir=DATA_DIR):
     path = data_dir / "fed_yield_curve.parquet"
     _df = pd.read_parquet(path)
-    return _df
+    return expand_frame(_df)
 
 def _demo():
     _df = pull_fed_yield_curve(data_dir=DATA_DIR)
     
 
-if __name__ == "__main__":
+def main():
     df_all, df = pull_fed_yield_curve()
+    # Rates as float32/scaled int32 with the COMPACT_STORAGE setting
     path = Path(DATA_DIR) / "fed_yield_curve_all.parquet"
-    df_all.to_parquet(path)
+    pipeline_cache.to_parquet(compact_frame(df_all, rate_units(df_all, RATE_PREFIXES)), path)
     path = Path(DATA_DIR) / "fed_yield_curve.parquet"
-    df.to_parquet(path)
\ No newline at end of file
+    pipeline_cache.to_parquet(compact_frame(df, rate_units(df, RATE_PREFIXES)), path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Local mirror of the reference Stata datasets.
+
+The combined arbitrage spreads of Siriwardane et al. (`arbitrage_spread_wide`
+and `arbitrage_spread_panel`) are published as Stata files on Dropbox. They
+are downloaded once into `DATA_DIR / "reference"`, checked against a
+SHA-256 checksum and converted to parquet with proper dtypes (`full_trade` as
+a categorical), so every later load is a local columnar read instead of a
+download plus a Stata parse.
+
+Checksums are kept in `manifest.json` in the mirror directory. A file whose
+`sha256` is pinned in `REFERENCE_FILES` must match it; otherwise the checksum
+of the first download is recorded and every re-download must match it, so a
+silently changed upstream file is caught rather than mixed into the tests.
+
+Local Stata files (e.g. `Final_Spreads.dta`) go through `read_stata_cached`,
+which converts them to parquet the first time and re-converts only when the
+Stata file changes.
+
+    python ./src/pull_reference_spreads.py      # mirror all reference files
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import pipeline_cache
+from settings import config
+
+DATA_DIR = config("DATA_DIR")
+MIRROR_DIR = Path(DATA_DIR) / "reference"
+MANIFEST_NAME = "manifest.json"
+
+CATEGORICAL_COLUMNS = ["full_trade"]
+
+REFERENCE_FILES = {
+    "arbitrage_spread_wide": {
+        "url": "https://www.dropbox.com/scl/fi/81jm3dbe856i7p17rjy87/arbitrage_spread_wide.dta?rlkey=ke78u464vucmn43zt27nzkxya&st=59g2n7dt&dl=1",
+        "sha256": None,
+    },
+    "arbitrage_spread_panel": {
+        "url": "https://www.dropbox.com/scl/fi/mv2oodkibhzli5ywdgxv7/arbitrage_spread_panel.dta?rlkey=ctzelvfie1nztlp7o24gvnzff&st=nnzdxv78&dl=1",
+        "sha256": None,
+    },
+}
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(mirror_dir=MIRROR_DIR):
+    path = Path(mirror_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _write_manifest(manifest, mirror_dir=MIRROR_DIR):
+    path = Path(mirror_dir) / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def _download(url, dest):
+    import requests
+
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(dest, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                f.write(chunk)
+
+
+def convert_stata_to_parquet(dta_path, parquet_path, categorical=CATEGORICAL_COLUMNS):
+    """Read a Stata file once and write it to parquet with typed columns."""
+    df = pd.read_stata(dta_path)
+    for col in categorical:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    df.to_parquet(parquet_path, index=False)
+    return df
+
+
+def pull_reference_file(name, mirror_dir=MIRROR_DIR, force=False):
+    """
+    Download reference file `name`, verify its checksum and convert it to
+    parquet. Does nothing if the mirror already has it, unless `force`.
+
+    Returns:
+        Path: the parquet file
+    """
+    mirror_dir = Path(mirror_dir)
+    mirror_dir.mkdir(parents=True, exist_ok=True)
+    parquet_path = mirror_dir / f"{name}.parquet"
+    manifest = read_manifest(mirror_dir)
+    if parquet_path.exists() and name in manifest and not force:
+        return parquet_path
+
+    spec = REFERENCE_FILES[name]
+    dta_path = mirror_dir / f"{name}.dta"
+    tmp_path = dta_path.with_suffix(".dta.part")
+    _download(spec["url"], tmp_path)
+    sha256 = _sha256(tmp_path)
+    expected = spec["sha256"] or manifest.get(name, {}).get("sha256")
+    if expected is not None and sha256 != expected:
+        tmp_path.unlink()
+        raise ValueError(
+            f"Checksum mismatch for {name}: expected {expected}, got {sha256}. "
+            f"Delete {name} from {mirror_dir / MANIFEST_NAME} to accept the new file."
+        )
+    os.replace(tmp_path, dta_path)
+
+    convert_stata_to_parquet(dta_path, parquet_path)
+    manifest[name] = {"url": spec["url"], "sha256": sha256, "parquet": parquet_path.name}
+    _write_manifest(manifest, mirror_dir)
+    return parquet_path
+
+
+def load_reference_spreads(name, mirror_dir=MIRROR_DIR):
+    """Reference dataset `name` from the local mirror, pulling it if needed."""
+    return pipeline_cache.read_parquet(pull_reference_file(name, mirror_dir=mirror_dir))
+
+
+def read_stata_cached(filepath, mirror_dir=MIRROR_DIR, categorical=CATEGORICAL_COLUMNS):
+    """
+    `pd.read_stata(filepath)`, served from a parquet copy in the mirror.
+
+    The copy is made on the first call and remade whenever the size or
+    modification time of the Stata file changes.
+    """
+    filepath = Path(filepath).resolve()
+    mirror_dir = Path(mirror_dir)
+    mirror_dir.mkdir(parents=True, exist_ok=True)
+    key = f"local:{filepath}"
+    path_hash = hashlib.sha256(str(filepath).encode()).hexdigest()[:12]
+    parquet_path = mirror_dir / f"{filepath.stem}-{path_hash}.parquet"
+
+    stat = os.stat(filepath)
+    stamp = [stat.st_size, stat.st_mtime_ns]
+    manifest = read_manifest(mirror_dir)
+    entry = manifest.get(key)
+    if entry is not None and entry["stamp"] == stamp and parquet_path.exists():
+        return pipeline_cache.read_parquet(parquet_path)
+
+    df = convert_stata_to_parquet(filepath, parquet_path, categorical=categorical)
+    manifest[key] = {"stamp": stamp, "sha256": _sha256(filepath), "parquet": parquet_path.name}
+    _write_manifest(manifest, mirror_dir)
+    return df
+
+
+def main():
+    for name in REFERENCE_FILES:
+        pull_reference_file(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Replication check of the TIPS-Treasury spreads against Siriwardane et al.
+
+Computes our TIPS-Treasury arbitrage panel (`arb_{t}` of
+compute_tips_treasury.py, in basis points) and compares every tenor with the
+published `raw_tips_treas_{t}` series of `arbitrage_spread_wide`, read from
+the local mirror (see pull_reference_spreads.py). For each tenor it reports
+tracking statistics on the common dates and fails when the series drift
+apart by more than the tolerances, so every change to
+compute_tips_treasury.py can be checked in well under a second once the
+inputs are cached.
+
+    python ./src/replicate_tips_treasury.py      # exits with 1 on drift
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+import compute_tips_treasury
+from pull_reference_spreads import MIRROR_DIR, load_reference_spreads
+
+TENORS = [2, 5, 10, 20]
+
+# Tolerances of the check, per tenor, in basis points
+MAX_RMSE_BPS = 15.0
+MIN_CORR = 0.9
+
+
+def load_reference_tips_treasury(mirror_dir=MIRROR_DIR, tenors=TENORS):
+    """Published TIPS-Treasury spreads, indexed by date, as `arb_{t}` columns."""
+    wide = load_reference_spreads("arbitrage_spread_wide", mirror_dir=mirror_dir)
+    columns = {f"raw_tips_treas_{t}": f"arb_{t}" for t in tenors}
+    return wide.set_index("date")[list(columns)].rename(columns=columns)
+
+
+def tracking_stats(computed, reference, tenors=TENORS,
+                   max_rmse_bps=MAX_RMSE_BPS, min_corr=MIN_CORR):
+    """
+    How closely `computed` tracks `reference`, one row per tenor.
+
+    Parameters:
+        computed, reference (pd.DataFrame): Indexed by date with `arb_{t}`
+            columns in basis points
+        tenors (list): Tenors to compare
+        max_rmse_bps (float): Largest root mean squared difference that passes
+        min_corr (float): Smallest correlation that passes
+
+    Returns:
+        pd.DataFrame: n_obs, corr, mean_diff, tracking_error (std of the
+        difference), rmse, max_abs_diff, worst_date and passed per tenor
+    """
+    common_dates = computed.index.intersection(reference.index)
+    rows = {}
+    for t in tenors:
+        ours = computed[f"arb_{t}"].reindex(common_dates).to_numpy(dtype=np.float64)
+        theirs = reference[f"arb_{t}"].reindex(common_dates).to_numpy(dtype=np.float64)
+        both = ~np.isnan(ours) & ~np.isnan(theirs)
+        diff = ours[both] - theirs[both]
+        n_obs = int(both.sum())
+        if n_obs == 0:
+            rows[t] = {"n_obs": 0, "corr": np.nan, "mean_diff": np.nan,
+                       "tracking_error": np.nan, "rmse": np.nan, "max_abs_diff": np.nan,
+                       "worst_date": pd.NaT, "passed": False}
+            continue
+        rmse = float(np.sqrt(np.mean(diff ** 2)))
+        corr = float(np.corrcoef(ours[both], theirs[both])[0, 1]) if n_obs > 1 else np.nan
+        rows[t] = {
+            "n_obs": n_obs,
+            "corr": corr,
+            "mean_diff": float(diff.mean()),
+            "tracking_error": float(diff.std(ddof=1)) if n_obs > 1 else np.nan,
+            "rmse": rmse,
+            "max_abs_diff": float(np.abs(diff).max()),
+            "worst_date": common_dates[both][np.abs(diff).argmax()],
+            "passed": bool(rmse <= max_rmse_bps and corr >= min_corr),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis("tenor")
+
+
+def check_replication(computed=None, reference=None, max_rmse_bps=MAX_RMSE_BPS,
+                      min_corr=MIN_CORR):
+    """
+    Tracking statistics of our TIPS-Treasury spreads against the reference.
+
+    By default computes the panel with compute_tips_treasury.py (without
+    saving it) and reads the reference from the local mirror.
+
+    Returns:
+        pd.DataFrame: see `tracking_stats`; `report["passed"].all()` is the check
+    """
+    if computed is None:
+        computed = compute_tips_treasury.compute_tips_treasury_panel().set_index("date")
+    if reference is None:
+        reference = load_reference_tips_treasury()
+    return tracking_stats(
+        computed, reference, max_rmse_bps=max_rmse_bps, min_corr=min_corr
+    )
+
+
+def main():
+    report = check_replication()
+    print(report.to_string())
+    if not report["passed"].all():
+        failed = ", ".join(f"{t}y" for t in report.index[~report["passed"]])
+        print(f"Replication drift beyond tolerance for tenors: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
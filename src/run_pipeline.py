@@ -0,0 +1,56 @@
+"""
+Run pipeline stages inside one Python process.
+
+Each stage is the `main()` (or equivalent) function of a src script. Running
+them in one long-lived process, rather than one interpreter per doit action,
+pays the numpy/pandas import cost once and lets a stage read the frames that
+the previous stage just wrote from the in-memory cache in pipeline_cache.py.
+
+dodo.py uses `run_stage` as a Python action when PIPELINE_IN_PROCESS is set.
+The stages can also be run directly, in order:
+
+    python ./src/run_pipeline.py                   # all stages
+    python ./src/run_pipeline.py compute_tips_treasury generate_figures
+"""
+
+import importlib
+import sys
+import time
+
+import pipeline_cache
+
+# Stage name -> (module, function), in pipeline order
+STAGES = {
+    "pull_fed_yield_curve": ("pull_fed_yield_curve", "main"),
+    "pull_fed_tips_yield_curve": ("pull_fed_tips_yield_curve", "main"),
+    "pull_reference_spreads": ("pull_reference_spreads", "main"),
+    "compute_tips_treasury": ("compute_tips_treasury", "compute_tips_treasury"),
+    "spread_engine": ("spread_engine", "main"),
+    "generate_figures": ("generate_figures", "main"),
+    "generate_latex_table": ("generate_latex_table", "main"),
+    "generate_chartbook_figures": ("generate_chartbook_figures", "main"),
+    "generate_html_chart": ("generate_html_chart", "main"),
+}
+
+
+def run_stage(name):
+    """Run one stage in the current process and report its wall time."""
+    module_name, func_name = STAGES[name]
+    start = time.perf_counter()
+    func = getattr(importlib.import_module(module_name), func_name)
+    func()
+    cache = pipeline_cache.CACHE
+    print(
+        f"{name}: {time.perf_counter() - start:.2f}s "
+        f"(cache: {cache.hits} hits, {cache.misses} misses, {cache.nbytes / 1024**2:.1f} MB)"
+    )
+
+
+def run_pipeline(stages=None):
+    """Run `stages` (default: all of STAGES) in order in this process."""
+    for name in stages or STAGES:
+        run_stage(name)
+
+
+if __name__ == "__main__":
+    run_pipeline(sys.argv[1:])
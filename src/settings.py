@@ -74,6 +74,13 @@ d["START_DATE"] = _config("START_DATE", default="1913-01-01", cast=to_datetime)
 d["END_DATE"] = _config("END_DATE", default="2024-01-01", cast=to_datetime)
 d["PIPELINE_DEV_MODE"] = _config("PIPELINE_DEV_MODE", default=True, cast=bool)
 d["PIPELINE_THEME"] = _config("PIPELINE_THEME", default="pipeline")
+# Run the doit stages as Python callables in the doit process, sharing the
+# in-memory frame cache of pipeline_cache.py, instead of one interpreter each
+d["PIPELINE_IN_PROCESS"] = _config("PIPELINE_IN_PROCESS", default=False, cast=bool)
+d["PIPELINE_CACHE_MAX_MB"] = _config("PIPELINE_CACHE_MAX_MB", default=2048, cast=int)
+# Store rate columns as "float32" or "scaled_int32" (see compact_storage.py);
+# empty keeps float64
+d["COMPACT_STORAGE"] = _config("COMPACT_STORAGE", default="")
 
 ## Paths
 d["DATA_DIR"] = if_relative_make_abs(_config('DATA_DIR', default=Path('_data'), cast=Path))
@@ -0,0 +1,152 @@
+"""
+Declarative engine for arbitrage spreads.
+
+Every basis is declared as a spec (a dict) instead of a hand-written script:
+
+    {
+        "family": "Treasury_Swap",
+        "inputs": ["swap_rates", "treasury_yields"],
+        "tenors": [2, 5, 10, 20],
+        "implied_rf": lambda df, t: ...,   # implied risk-free rate, bps
+        "benchmark": lambda df, t: ...,    # benchmark leg, bps
+        "name": "Treasury_Swap_{tenor:02}Y",
+    }
+
+The spread of each tenor is `implied_rf - benchmark`, named like the columns
+of the combined reference panel (`test_load_bases_data.name_map`).
+`implied_rf` and `benchmark` get the spec's inputs aligned on the
+business-day calendar (`calendar_alignment.align_sources`), indexed by day
+number, and return whole columns, so each spread is one vectorized
+expression. A spec may instead combine its inputs with its own `"merge"`
+function (dict of input frames -> frame with a "day" column): TIPS-Treasury
+uses `compute_tips_treasury.tips_treasury_panel`, so its spreads are the
+"arb_" columns of the TIPS-Treasury panel, computed by the same code.
+
+`compute_spreads` loads every input named by any spec once (loaders are
+registered in `INPUT_LOADERS`), merges each distinct combination of inputs
+once, evaluates all specs and returns one wide panel (dates by spreads);
+`spreads_to_long` turns it into the long (date, full_trade, spread) panel.
+
+Only TIPS-Treasury has its inputs in this project. Another family is added
+by registering loaders for its inputs and appending its spec to
+`default_spread_specs`; e.g. Treasury-swap is
+`implied_rf = swap rate`, `benchmark = Treasury yield` on the swap tenors.
+
+    python ./src/spread_engine.py     # writes arbitrage_spreads_{wide,long}.parquet
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+import compute_tips_treasury
+import pipeline_cache
+from calendar_alignment import align_sources
+from day_index import DAY_COLUMN, to_timestamps, with_day_column
+from settings import config
+
+DATA_DIR = config("DATA_DIR")
+
+# Input name -> function returning a frame with a "date" column
+INPUT_LOADERS = {
+    "tips_yields": compute_tips_treasury.import_tips_yields,
+    "treasury_yields": compute_tips_treasury.import_treasury_yields,
+    "inflation_swaps": compute_tips_treasury.import_inflation_swap_data,
+}
+
+
+def align_inputs(inputs):
+    """Inputs aligned on the business days on which any of them printed."""
+    return align_sources(inputs)[0]
+
+
+def _tips_treasury_panel(inputs):
+    return compute_tips_treasury.tips_treasury_panel(inputs)[0]
+
+
+def default_spread_specs():
+    """Spreads with inputs available in this project."""
+    return [
+        {
+            "family": "TIPS_Treasury",
+            "inputs": ["tips_yields", "treasury_yields", "inflation_swaps"],
+            "tenors": [2, 5, 10, 20],
+            "merge": _tips_treasury_panel,
+            "implied_rf": lambda df, t: df[f"tips_treas_{t}_rf"],
+            "benchmark": lambda df, t: df[f"nom_zc{t}"],
+            "name": "TIPS_Treasury_{tenor:02}Y",
+        },
+    ]
+
+
+def load_inputs(names, loaders=INPUT_LOADERS):
+    """Load each named input once, with its "date" and "day" columns."""
+    return {name: with_day_column(loaders[name]()) for name in dict.fromkeys(names)}
+
+
+def _merge_inputs(inputs, names, merge):
+    merged = merge({name: inputs[name] for name in names})
+    return merged.drop(columns="date").set_index(DAY_COLUMN)
+
+
+def evaluate_spec(spec, df):
+    """Spreads of one spec on its merged inputs, as a dict name -> Series."""
+    return {
+        spec["name"].format(tenor=t): spec["implied_rf"](df, t) - spec["benchmark"](df, t)
+        for t in spec["tenors"]
+    }
+
+
+def compute_spreads(specs=None, inputs=None, loaders=INPUT_LOADERS):
+    """
+    Evaluate all spread specs on shared inputs.
+
+    Parameters:
+        specs (list): Spread specs (default: `default_spread_specs()`)
+        inputs (dict): Already loaded inputs, name -> frame with a "date"
+            column; missing ones are loaded with `loaders`
+
+    Returns:
+        pd.DataFrame: Wide panel indexed by date, one column per spread,
+        sorted by name; dates where every spread is missing are dropped
+    """
+    specs = default_spread_specs() if specs is None else specs
+    inputs = dict(inputs or {})
+    needed = [n for spec in specs for n in spec["inputs"] if n not in inputs]
+    inputs.update(load_inputs(needed, loaders))
+
+    # Specs sharing the same inputs share one merge
+    merged = {}
+    columns = {}
+    for spec in specs:
+        merge = spec.get("merge", align_inputs)
+        key = (tuple(spec["inputs"]), merge)
+        if key not in merged:
+            merged[key] = _merge_inputs(inputs, list(key[0]), merge)
+        columns.update(evaluate_spec(spec, merged[key]))
+
+    wide = pd.concat(columns, axis=1).sort_index()
+    wide = wide.dropna(how="all")
+    wide.index = to_timestamps(wide.index)
+    return wide.reindex(sorted(wide.columns), axis=1)
+
+
+def spreads_to_long(wide):
+    """Long panel (date, full_trade, spread) of a wide spread panel."""
+    long = wide.rename_axis(columns="full_trade").stack(future_stack=True)
+    long = long.rename("spread").reset_index().dropna(subset=["spread"])
+    long["full_trade"] = long["full_trade"].astype(
+        pd.CategoricalDtype(sorted(wide.columns))
+    )
+    return long.reset_index(drop=True)
+
+
+def main():
+    wide = compute_spreads()
+    data_dir = Path(DATA_DIR)
+    pipeline_cache.to_parquet(wide, data_dir / "arbitrage_spreads_wide.parquet")
+    pipeline_cache.to_parquet(spreads_to_long(wide), data_dir / "arbitrage_spreads_long.parquet")
+
+
+if __name__ == "__main__":
+    main()
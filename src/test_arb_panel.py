@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from arb_panel import ArbPanel
+from compact_storage import compact_frame
+from generate_figures import generate_summary_statistics, load_tips_treasury_data
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"date": pd.bdate_range("2009-06-01", periods=600)})
+    for t in [2, 5, 10, 20]:
+        df[f"real_cc{t}"] = rng.normal(0.01, 0.005, 600)
+        df[f"nom_zc{t}"] = rng.normal(300, 50, 600)
+        df[f"tips_treas_{t}_rf"] = rng.normal(320, 50, 600)
+        df[f"arb_{t}"] = rng.normal(20, 10, 600)
+    df.loc[5, "arb_10"] = np.nan
+    return df
+
+
+def test_panel_views():
+    df = _frame()
+    panel = ArbPanel.from_frame(df.iloc[::-1])
+    assert panel.measures == ("real", "nom", "tips", "arb")
+    assert len(panel) == 600
+
+    arb = panel.to_pandas("arb")
+    pd.testing.assert_frame_equal(arb, df.set_index("date")[["arb_2", "arb_5", "arb_10", "arb_20"]])
+    # Zero copy: the frame and the series are views of the panel
+    assert np.shares_memory(arb.to_numpy(), panel.values)
+    np.testing.assert_array_equal(panel.series("nom", 5), df["nom_zc5"])
+    panel.series("nom", 5)[0] = -1.0
+    assert panel.measure("nom")[1, 0] == -1.0
+
+    window = panel.slice_dates("2010-01-01", "2010-03-31")
+    assert np.shares_memory(window.values, panel.values)
+    pd.testing.assert_frame_equal(window.to_pandas("tips"), panel.to_pandas("tips").loc["2010-01-01":"2010-03-31"])
+
+    with pytest.raises(ValueError, match="expected"):
+        ArbPanel(panel.days, panel.tenors, ["arb"], panel.values)
+
+
+def test_panel_save_load_and_compact_input(tmp_path):
+    df = _frame()
+    panel = ArbPanel.from_frame(compact_frame(df, {"arb_2": "bps"}, mode="float32"))
+    assert panel.values.dtype == np.float64
+    panel.save(tmp_path / "panel.arrow")
+    loaded = ArbPanel.load(tmp_path / "panel.arrow")
+    assert loaded.measures == panel.measures and loaded.tenors == panel.tenors
+    pd.testing.assert_frame_equal(loaded.to_frame(), panel.to_frame())
+    assert list(panel.to_frame().columns[:3]) == ["date", "day", "real_cc2"]
+
+
+def test_summary_statistics_of_panel(tmp_path):
+    pytest.importorskip("statsmodels")
+    df = _frame()
+    df.to_parquet(tmp_path / "panel.parquet")
+    arb = load_tips_treasury_data(file_path=tmp_path / "panel.parquet")
+    assert list(arb.columns) == ["arb_2", "arb_5", "arb_10", "arb_20"]
+    panel = ArbPanel.from_frame(df)
+    pd.testing.assert_frame_equal(
+        generate_summary_statistics(panel, "2010-01-01", "2010-12-31"),
+        generate_summary_statistics(arb, "2010-01-01", "2010-12-31"),
+    )
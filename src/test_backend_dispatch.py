@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from misc_tools import (
+    dataframe_set_difference,
+    freq_counts,
+    groupby_weighted_average,
+    groupby_weighted_std,
+    leave_one_out_aggregates,
+    weighted_average,
+)
+
+BACKENDS = {
+    "pandas": lambda df: df,
+    "polars": pl.from_pandas,
+    "polars-lazy": lambda df: pl.from_pandas(df).lazy(),
+}
+
+
+def _panel(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "g": rng.integers(0, 25, size=n),
+        "h": rng.choice(["a", "b", "c"], size=n),
+        "x": 100 + rng.normal(size=n),
+        "w": rng.uniform(0, 5, size=n),
+    })
+    df.loc[rng.choice(n, 40, replace=False), "x"] = np.nan
+    return df
+
+
+def _to_pandas(result):
+    """Polars results as pandas, pandas results as a flat frame."""
+    if isinstance(result, (pl.DataFrame, pl.Series)):
+        return result.to_pandas()
+    if isinstance(result, pd.Series) and result.index.names != [None]:
+        return result.rename(result.name or "value").reset_index()
+    return result
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_weighted_helpers(backend):
+    df = _panel()
+    data = BACKENDS[backend](df)
+
+    assert weighted_average("x", "w", data=data) == pytest.approx(
+        weighted_average("x", "w", data=df), rel=1e-12
+    )
+
+    for by_col in ["g", ["g", "h"]]:
+        by = [by_col] if isinstance(by_col, str) else by_col
+        expected = groupby_weighted_average("x", "w", by_col=by_col, data=df)
+        result = _to_pandas(groupby_weighted_average("x", "w", by_col=by_col, data=data))
+        np.testing.assert_allclose(result.iloc[:, -1], expected.to_numpy(), rtol=1e-12)
+        pd.testing.assert_frame_equal(
+            result[by], expected.index.to_frame(index=False), check_dtype=False
+        )
+
+        expected = groupby_weighted_std("x", "w", by_col=by_col, data=df, ddof=0)
+        result = _to_pandas(groupby_weighted_std("x", "w", by_col=by_col, data=data, ddof=0))
+        np.testing.assert_allclose(result.iloc[:, -1], expected.to_numpy(), rtol=1e-10)
+
+    expected = groupby_weighted_average("x", "w", by_col="g", data=df, transform=True,
+                                        new_column_name="wavg")
+    result = groupby_weighted_average("x", "w", by_col="g", data=data, transform=True,
+                                      new_column_name="wavg")
+    np.testing.assert_allclose(np.asarray(result), expected.to_numpy(), rtol=1e-12)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_freq_counts(backend):
+    df = _panel()
+    df.loc[:9, "h"] = None
+    expected = freq_counts(df, col="h").sort_values("h", na_position="first", ignore_index=True)
+    result = _to_pandas(freq_counts(BACKENDS[backend](df), col="h"))
+    # Ties may come out in either order
+    result = result.sort_values("h", na_position="first", ignore_index=True)
+    pd.testing.assert_frame_equal(
+        result.drop(columns="cum_freq"), expected.drop(columns="cum_freq"), check_dtype=False
+    )
+    assert result["cum_freq"].max() == pytest.approx(100)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_leave_one_out_aggregates(backend):
+    df = _panel()
+    expected = leave_one_out_aggregates(df, groupby=["g", "h"], columns=["x", "w"])
+    result = _to_pandas(
+        leave_one_out_aggregates(BACKENDS[backend](df), groupby=["g", "h"], columns=["x", "w"])
+    )
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dataframe_set_difference(backend):
+    df = _panel()
+    dff = pd.concat([df.iloc[100:], df.iloc[:5].assign(x=-1.0)], ignore_index=True)
+    expected_numbers, expected_rows = dataframe_set_difference(dff, df)
+    numbers, rows = dataframe_set_difference(BACKENDS[backend](dff), BACKENDS[backend](df))
+    assert numbers == expected_numbers == list(range(len(dff) - 5, len(dff)))
+    pd.testing.assert_frame_equal(
+        _to_pandas(rows).reset_index(drop=True), expected_rows.reset_index(drop=True),
+        check_dtype=False,
+    )
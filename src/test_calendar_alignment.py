@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from calendar_alignment import align_sources
+
+
+def _sources():
+    dates = pd.bdate_range("2024-01-01", periods=10)
+    # "fed" misses 2024-01-03 and 2024-01-04; "bbg" misses 2024-01-10 and
+    # has a Saturday print
+    fed = pd.DataFrame({"date": dates.delete([2, 3]), "nom": np.arange(8.0)})
+    bbg = pd.DataFrame({
+        "date": dates.delete(7).append(pd.DatetimeIndex(["2024-01-13"])),
+        "swap": np.arange(10.0),
+    })
+    return dates, fed, bbg
+
+
+def test_align_keeps_days_missing_in_one_source():
+    dates, fed, bbg = _sources()
+    aligned, coverage = align_sources({"fed": fed, "bbg": bbg.iloc[::-1]})
+    inner = fed.merge(bbg, on="date")
+
+    assert len(inner) == 7
+    # Every business day on which either source printed; not the Saturday
+    # print, which is only carried forward
+    pd.testing.assert_index_equal(pd.DatetimeIndex(aligned["date"]), dates, check_names=False)
+    assert list(aligned.columns) == ["date", "day", "nom", "swap"]
+    merged = aligned.merge(inner, on="date", suffixes=("", "_inner"))
+    np.testing.assert_array_equal(merged["nom"], merged["nom_inner"])
+    np.testing.assert_array_equal(merged["swap"], merged["swap_inner"])
+    assert aligned["nom"].isna().sum() == 2
+    assert aligned["swap"].isna().sum() == 1
+
+    assert coverage.loc["fed", "same_day"] == 8
+    assert coverage.loc["fed", "missing"] == 2
+    assert coverage.loc["bbg", "observations"] == 10
+
+
+def test_staleness_limits():
+    dates, fed, bbg = _sources()
+    aligned, coverage = align_sources({"fed": fed, "bbg": bbg}, max_staleness={"fed": 1})
+    by_date = aligned.set_index("date")
+    # 2024-01-03 carries 2024-01-02 forward; 2024-01-04 is two days stale
+    assert by_date.loc["2024-01-03", "nom"] == by_date.loc["2024-01-02", "nom"]
+    assert np.isnan(by_date.loc["2024-01-04", "nom"])
+    assert coverage.loc["fed", "stale"] == 1
+    assert coverage.loc["fed", "missing"] == 1
+    assert coverage.loc["bbg", "stale"] == 0
+
+    # Days on which no source printed are dropped even when a stale print
+    # (the Saturday one, on Monday 2024-01-15) is within the limit
+    calendar = pd.bdate_range("2024-01-01", "2024-01-15")
+    aligned, coverage = align_sources(
+        {"fed": fed, "bbg": bbg}, max_staleness={"bbg": 1}, calendar=calendar
+    )
+    assert aligned["date"].iloc[-1] == pd.Timestamp("2024-01-12")
+    assert aligned.set_index("date").loc["2024-01-10", "swap"] == 6.0
+    assert coverage.loc["bbg", "stale"] == 1
+
+
+def test_nan_rows_are_not_prints():
+    dates, fed, bbg = _sources()
+    # A holiday stored as a row of NaN instead of a missing date
+    fed_nan = pd.concat([fed, pd.DataFrame({"date": dates[[2]], "nom": [np.nan]})])
+    aligned, coverage = align_sources({"fed": fed_nan, "bbg": bbg}, max_staleness={"fed": 1})
+    by_date = aligned.set_index("date")
+    assert by_date.loc["2024-01-03", "nom"] == by_date.loc["2024-01-02", "nom"]
+    assert coverage.loc["fed", "observations"] == 8
+    assert coverage.loc["fed", "same_day"] == 8
+    assert coverage.loc["fed", "stale"] == 1
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from closeness import closeness_report, format_failures
+
+
+def _panels(n_dates=1000, n_cols=12, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2010-01-01", periods=n_dates)
+    expected = pd.DataFrame(
+        rng.normal(50, 10, size=(n_dates, n_cols)),
+        index=dates,
+        columns=[f"S{i:02}" for i in range(n_cols)],
+    )
+    expected.iloc[:20, 3] = np.nan
+    computed = expected * (1 + rng.uniform(-1e-5, 1e-5, size=expected.shape))
+    # computed has an extra date and an extra column that are not compared
+    computed.loc[dates[-1] + pd.offsets.BDay()] = 1.0
+    computed["extra"] = 0.0
+    return computed, expected
+
+
+def test_close_panels_pass():
+    computed, expected = _panels()
+    report = closeness_report(computed, expected, rtol=1e-3)
+    assert list(report.index) == list(expected.columns)
+    assert report["passed"].all()
+    assert (report["n_dates"] == len(expected)).all()
+    assert report.loc["S03", "coverage_right"] == 1 - 20 / len(expected)
+    assert report["max_rel_err"].max() < 2e-5
+    assert format_failures(report) == "All columns are close"
+
+
+def test_report_locates_errors_and_missing_values():
+    computed, expected = _panels()
+    bad_dates = expected.index[[10, 500, 900]]
+    computed.loc[bad_dates[0], "S05"] += 5.0
+    computed.loc[bad_dates[1], "S05"] += 1.0
+    computed.loc[bad_dates[2], "S05"] -= 3.0
+    computed.loc[expected.index[700], "S07"] = np.nan
+    # Strings are coerced to numbers per column
+    computed["S08"] = computed["S08"].astype(str)
+
+    for chunk_size, max_workers in [(64, 1), (10_000, 4)]:
+        report = closeness_report(
+            computed, expected, rtol=1e-3, chunk_size=chunk_size, max_workers=max_workers
+        )
+        assert set(report.index[~report["passed"]]) == {"S05", "S07"}
+        assert report.loc["S05", "n_fail"] == 3
+        assert report.loc["S05", "worst_dates"][:3] == list(bad_dates[[0, 2, 1]])
+        np.testing.assert_allclose(report.loc["S05", "max_abs_err"], 5.0, rtol=1e-4)
+        assert report.loc["S07", "n_fail"] == 1
+        # A value missing on one side is reported among the worst dates
+        assert report.loc["S07", "worst_dates"][0] == expected.index[700]
+        assert report.loc["S07", "n_both"] == len(expected) - 1
+        assert report.loc["S08", "passed"]
+
+    message = format_failures(report)
+    assert message.startswith("2 of 12 columns are not close")
+    assert str(bad_dates[0]) in message
+
+
+def test_duplicated_dates_use_last_row():
+    computed, expected = _panels(n_dates=50)
+    # A date published twice: the first row is stale, the last one is right
+    stale = computed.iloc[[10]] + 100.0
+    computed = pd.concat([computed.iloc[:10], stale, computed.iloc[10:]])
+    assert not computed.index.is_unique
+    report = closeness_report(computed, expected, rtol=1e-3)
+    assert report["passed"].all()
+    assert (report["n_dates"] == len(expected)).all()
+
+    report = closeness_report(expected, computed, rtol=1e-3)
+    assert report["passed"].all()
+
+
+def test_misaligned_panels_fail():
+    computed, expected = _panels(n_dates=50)
+    shifted = computed.set_axis(computed.index + pd.DateOffset(years=10))
+    report = closeness_report(shifted, expected)
+    assert (report["n_dates"] == 0).all()
+    assert not report["passed"].any()
+    assert "S00: no common dates" in format_failures(report)
+
+    with pytest.raises(ValueError, match="no common columns"):
+        closeness_report(computed.add_prefix("X"), expected)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compact_storage import column_float64, compact_frame, expand_frame, rate_units
+from parquet_layout import write_parquet
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"date": pd.bdate_range("2020-01-01", periods=500)})
+    df["SVENY02"] = np.round(rng.normal(3, 1, 500), 4)  # percent, 4 decimals
+    df["arb_2"] = rng.normal(-20, 10, 500)               # bps
+    df["real_cc2"] = rng.normal(0.01, 0.005, 500)        # decimal
+    df["BETA0"] = rng.normal(size=500)
+    df.loc[[3, 10], "arb_2"] = np.nan
+    return df
+
+
+UNITS = {"SVENY02": "percent", "arb_2": "bps", "real_cc2": "decimal"}
+BPS_PER_UNIT = {"bps": 1.0, "percent": 100.0, "decimal": 1e4}
+
+
+@pytest.mark.parametrize("mode", ["float32", "scaled_int32"])
+def test_compact_round_trip(mode, tmp_path):
+    df = _panel()
+    compact = compact_frame(df, UNITS, mode=mode)
+    assert compact.memory_usage(deep=True)[list(UNITS)].sum() < 0.7 * df[list(UNITS)].memory_usage().sum()
+    assert compact["BETA0"].dtype == np.float64
+    for col, unit in UNITS.items():
+        spec = compact.attrs["compact"][col]
+        assert spec["mode"] == mode and spec["unit"] == unit
+        assert spec["max_error_bps"] <= 1e-3
+        # Within the stated bound of 0.001 bps
+        np.testing.assert_allclose(
+            column_float64(compact, col), df[col], rtol=0, atol=1e-3 / BPS_PER_UNIT[unit]
+        )
+    assert column_float64(compact, "arb_2").isna().sum() == 2
+    if mode == "scaled_int32":
+        assert compact["arb_2"].dtype == "Int32"
+        # Published decimals read back exactly
+        np.testing.assert_array_equal(column_float64(compact, "SVENY02"), df["SVENY02"])
+
+    # The encoding survives parquet; only the requested columns are upcast
+    path = tmp_path / "panel.parquet"
+    write_parquet(compact, path)
+    read = pd.read_parquet(path)
+    assert read.attrs == compact.attrs
+    assert read["arb_2"].dtype == compact["arb_2"].dtype
+    partly = expand_frame(read, ["arb_2"])
+    assert partly["arb_2"].dtype == np.float64
+    assert list(partly.attrs["compact"]) == ["SVENY02", "real_cc2"]
+    pd.testing.assert_frame_equal(expand_frame(read), df, rtol=0, atol=1e-3)
+
+
+def test_compact_bounds():
+    df = _panel()
+    assert compact_frame(df, UNITS, mode="") is df
+    with pytest.raises(ValueError, match="reads back off"):
+        compact_frame(df, {"arb_2": "bps"}, mode="float32", max_error_bps=1e-9)
+    with pytest.raises(ValueError, match="does not fit in int32"):
+        compact_frame(df.assign(arb_2=1e6), {"arb_2": "bps"}, mode="scaled_int32")
+    with pytest.raises(ValueError, match="Unknown compact storage mode"):
+        compact_frame(df, UNITS, mode="float16")
+    assert rate_units(df, ("SVEN",)) == {"SVENY02": "percent"}
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import compute_tips_treasury
+from compute_tips_treasury import compute_tips_treasury_panel, write_sinks
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"date": pd.bdate_range("2020-01-01", periods=50)})
+    for t in [2, 5, 10, 20]:
+        df[f"tips_treas_{t}_rf"] = rng.normal(200, 20, 50)
+        df[f"arb_{t}"] = rng.normal(0, 20, 50)
+    return df
+
+
+def test_write_sinks(tmp_path):
+    df = _panel()
+    paths = write_sinks(df, ["parquet", "stata", "arrow"], data_dir=tmp_path, stem="panel")
+    assert [p.name for p in paths] == ["panel.parquet", "panel.dta", "panel.arrow"]
+
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "panel.parquet"), df)
+    pd.testing.assert_frame_equal(pd.read_feather(tmp_path / "panel.arrow"), df)
+    stata = pd.read_stata(tmp_path / "panel.dta")
+    assert "arb2" in stata.columns and "arb_2" not in stata.columns
+    np.testing.assert_allclose(stata["arb10"], df["arb_10"])
+
+    # Explicit paths
+    write_sinks(df, {"parquet": tmp_path / "sub" / "other.parquet"})
+    assert (tmp_path / "sub" / "other.parquet").exists()
+
+    with pytest.raises(ValueError, match="Unknown sinks"):
+        write_sinks(df, ["csv"], data_dir=tmp_path)
+
+
+def test_excel_sink(tmp_path):
+    pytest.importorskip("openpyxl")
+    df = _panel()
+    (path,) = write_sinks(df, ["excel"], data_dir=tmp_path)
+    pd.testing.assert_frame_equal(pd.read_excel(path, sheet_name="Data"), df)
+
+
+@pytest.mark.parametrize("holiday_as", ["missing_date", "nan_row"])
+def test_panel_keeps_fed_holidays(monkeypatch, holiday_as):
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range("2020-10-01", "2020-10-30")
+    # Columbus Day: no Fed curves, but Bloomberg quotes the swaps
+    fed_days = days[days != "2020-10-12"] if holiday_as == "missing_date" else days
+    sources = {
+        "import_tips_yields": pd.DataFrame(
+            {"date": fed_days, **{f"real_cc{t}": rng.normal(0.01, 0.002, len(fed_days))
+                                  for t in [2, 5, 10, 20]}}
+        ),
+        "import_treasury_yields": pd.DataFrame(
+            {"date": fed_days, **{f"nom_zc{t}": rng.normal(100, 10, len(fed_days))
+                                  for t in [2, 5, 10, 20]}}
+        ),
+        "import_inflation_swap_data": pd.DataFrame(
+            {"date": days, **{f"inf_swap_{t}y": rng.normal(0.02, 0.002, len(days))
+                              for t in [2, 5, 10, 20]}}
+        ),
+    }
+    if holiday_as == "nan_row":
+        for name in ["import_tips_yields", "import_treasury_yields"]:
+            df = sources[name]
+            df.loc[df["date"] == "2020-10-12", df.columns != "date"] = np.nan
+    for name, df in sources.items():
+        monkeypatch.setattr(compute_tips_treasury, name, lambda df=df: df.copy())
+
+    panel, coverage = compute_tips_treasury_panel(return_coverage=True)
+    holiday = panel.set_index("date").loc["2020-10-12"]
+    assert np.isfinite(holiday[[f"arb_{t}" for t in [2, 5, 10, 20]]].to_numpy(float)).all()
+    # The Fed curves of the Friday before are carried forward
+    friday = sources["import_tips_yields"].set_index("date").loc["2020-10-09"]
+    assert holiday["real_cc2"] == friday["real_cc2"]
+    assert coverage.loc["tips_yields", "stale"] == 1
+    assert coverage.loc["inflation_swaps", "stale"] == 0
+
+    same_day = {name: 0 for name in compute_tips_treasury.MAX_STALENESS}
+    panel = compute_tips_treasury_panel(max_staleness=same_day)
+    assert pd.Timestamp("2020-10-12") not in set(panel["date"])
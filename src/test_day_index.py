@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from day_index import business_days, slice_days, to_days, to_timestamps, with_day_column
+
+
+def test_day_numbers_round_trip():
+    dates = pd.Series(pd.to_datetime(["1969-12-31 00:00", "1970-01-01 00:00", "2024-02-29 15:30"]))
+    days = to_days(dates)
+    assert days.dtype == np.int32
+    np.testing.assert_array_equal(days, [-1, 0, 19782])
+    # Strings, other resolutions and scalars give the same numbers
+    np.testing.assert_array_equal(to_days(["02/29/2024"], format="%m/%d/%Y"), [19782])
+    np.testing.assert_array_equal(to_days(dates.astype("datetime64[s]")), days)
+    assert to_days("2024-02-29") == 19782
+    pd.testing.assert_index_equal(
+        to_timestamps(days), pd.DatetimeIndex(dates.dt.normalize(), name="date")
+    )
+    with pytest.raises(ValueError, match="Missing dates"):
+        to_days(pd.Series([pd.NaT]))
+
+
+def test_with_day_column_and_slices():
+    df = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=40), "x": np.arange(40)})
+    df = with_day_column(df)
+    assert list(df.columns) == ["date", "day", "x"]
+    assert with_day_column(df) is df
+
+    expected = df.set_index("date").loc["2024-01-10":"2024-01-20"]
+    np.testing.assert_array_equal(slice_days(df, "2024-01-10", "2024-01-20")["x"], expected["x"])
+    assert len(slice_days(df, end=pd.Timestamp("2024-01-05"))) == 5
+
+    weekdays = business_days(to_days("2024-01-01"), to_days("2024-02-09"))
+    pd.testing.assert_index_equal(
+        to_timestamps(weekdays), pd.bdate_range("2024-01-01", "2024-02-09", name="date")
+    )
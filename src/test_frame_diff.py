@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+import frame_diff
+from misc_tools import dataframe_set_difference
+
+
+def _frames(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    old = pd.DataFrame({
+        "date": pd.date_range("2000-01-01", periods=n),
+        "id": rng.choice(["a", "b", "c"], size=n),
+        "x": rng.normal(size=n),
+        "k": rng.integers(0, 100, size=n),
+    })
+    old.loc[rng.random(n) < 0.05, "x"] = np.nan
+    new = old.drop(index=[3, 10, 11]).copy()
+    new.loc[[20, 21], "x"] = 0.5
+    new = pd.concat([new, old.iloc[[0, 1]].assign(k=-1)], ignore_index=True)
+    return old, new
+
+
+def _reference_only_in_left(left, right):
+    merged = left.reset_index(drop=True).reset_index().merge(
+        right.drop_duplicates(), how="left", indicator=True, on=list(left.columns)
+    )
+    return np.sort(merged.loc[merged["_merge"] == "left_only", "index"].to_numpy())
+
+
+def test_frame_diff_matches_merge(tmp_path):
+    old, new = _frames()
+    expected_left = _reference_only_in_left(old, new)
+    expected_right = _reference_only_in_left(new, old)
+
+    diff = frame_diff.frame_diff(old, new)
+    np.testing.assert_array_equal(diff["only_in_left"], expected_left)
+    np.testing.assert_array_equal(diff["only_in_right"], expected_right)
+    assert diff["n_symmetric_difference"] == len(expected_left) + len(expected_right)
+    pd.testing.assert_frame_equal(diff["rows_only_in_left"], old.iloc[expected_left])
+
+    # Streamed from parquet in small batches
+    old.to_parquet(tmp_path / "old.parquet")
+    new.to_parquet(tmp_path / "new.parquet")
+    streamed = frame_diff.frame_diff(tmp_path / "old.parquet", tmp_path / "new.parquet", batch_size=700)
+    np.testing.assert_array_equal(streamed["only_in_left"], expected_left)
+    np.testing.assert_array_equal(streamed["only_in_right"], expected_right)
+    pd.testing.assert_frame_equal(
+        streamed["rows_only_in_right"], new.iloc[expected_right].reset_index(drop=True)
+    )
+
+
+def test_secondary_hash_catches_primary_collisions():
+    primary = np.array([1, 2, 3], dtype=np.uint64)
+    secondary = np.array([10, 20, 30], dtype=np.uint64)
+    other_primary = np.array([1, 2, 2, 3], dtype=np.uint64)
+    other_secondary = np.array([10, 99, 20, 31], dtype=np.uint64)
+    member = frame_diff._is_member(primary, secondary, other_primary, other_secondary)
+    np.testing.assert_array_equal(member, [True, True, False])
+
+
+def test_secondary_hash_is_independent_on_numeric_frames(monkeypatch):
+    rng = np.random.default_rng(0)
+    left = pd.DataFrame({"x": rng.normal(size=1000), "k": rng.integers(0, 5, size=1000)})
+    right = left.copy()
+    right.loc[[5, 500], "x"] += 1.0
+    primary, secondary = frame_diff.row_fingerprints(left)
+    assert not (primary == secondary).any()
+
+    # Every row collides on the first hash: the second hash alone tells rows apart
+    monkeypatch.setattr(
+        frame_diff, "_primary_hash", lambda chunk: np.zeros(len(chunk), dtype=np.uint64)
+    )
+    np.testing.assert_array_equal(frame_diff.set_difference(left, right), [5, 500])
+
+
+def test_dataframe_set_difference_positions_with_custom_index():
+    old, new = _frames()
+    old.index = old.index * 10 + 7
+    row_numbers, rows = dataframe_set_difference(old, new)
+    expected = _reference_only_in_left(old, new)
+    assert row_numbers == expected.tolist()
+    pd.testing.assert_frame_equal(rows, old.iloc[expected])
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from generate_chartbook_figures import render_figures
+
+
+def test_render_figures_skips_unchanged(tmp_path):
+    rng = np.random.default_rng(0)
+    index = pd.DatetimeIndex(pd.bdate_range("2010-01-01", "2012-12-31").asi8, name="date")
+    df = pd.DataFrame(
+        {f"arb_{t}": rng.normal(size=len(index)) for t in [2, 5]}, index=index
+    )
+    specs = [
+        {"name": "heatmap_all", "kind": "heatmap", "columns": ["arb_2", "arb_5"]},
+        {"name": "spreads_2y", "kind": "spreads", "columns": ["arb_2"],
+         "start_date": "2011-01-01", "end_date": "2011-12-31"},
+    ]
+
+    status = render_figures(df, specs, output_dir=tmp_path, max_workers=1)
+    assert status == {"heatmap_all": "rendered", "spreads_2y": "rendered"}
+    assert (tmp_path / "spreads_2y.png").exists()
+
+    status = render_figures(df, specs, output_dir=tmp_path, max_workers=1)
+    assert status == {"heatmap_all": "skipped", "spreads_2y": "skipped"}
+
+    specs[1]["end_date"] = "2012-06-30"
+    status = render_figures(df, specs, output_dir=tmp_path, max_workers=1)
+    assert status == {"heatmap_all": "skipped", "spreads_2y": "rendered"}
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from generate_figures import (
+    decimate_for_plot,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def _random_walk_frame(n=50_000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2000-01-01", periods=n, freq="h")
+    df = pd.DataFrame(
+        {f"arb_{t}": np.cumsum(rng.normal(size=n)) for t in [2, 5, 10, 20]},
+        index=index,
+    )
+    df.iloc[1000:1500, 1] = np.nan
+    return df
+
+
+def test_minmax_indices_keep_extremes_and_gaps():
+    df = _random_walk_frame()
+    x = df.index.asi8
+    y = df["arb_5"].to_numpy()
+    rows = minmax_indices(x, y, n_buckets=200)
+
+    assert len(rows) <= 3 * 200 + 2
+    assert np.nanargmax(y) in rows
+    assert np.nanargmin(y) in rows
+    assert np.isnan(y[rows]).any()
+
+
+def test_lttb_indices_keep_endpoints():
+    df = _random_walk_frame()
+    x = df.index.asi8
+    y = df["arb_2"].to_numpy()
+    rows = lttb_indices(x, y, n_out=500)
+
+    assert len(rows) == 500
+    assert rows[0] == 0
+    assert rows[-1] == len(y) - 1
+
+
+def test_decimate_for_plot_small_frame_unchanged():
+    df = _random_walk_frame(n=100)
+    result = decimate_for_plot(df, n_buckets=3600)
+    pd.testing.assert_frame_equal(result, df)
+
+
+def test_decimate_for_plot_preserves_column_ranges():
+    df = _random_walk_frame()
+    result = decimate_for_plot(df, n_buckets=300)
+    assert len(result) < len(df) // 10
+    pd.testing.assert_series_equal(result.max(), df.max())
+    pd.testing.assert_series_equal(result.min(), df.min())
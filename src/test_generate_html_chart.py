@@ -0,0 +1,31 @@
+import json
+
+import numpy as np
+import pandas as pd
+from generate_html_chart import aggregate_level, export_tiles
+
+
+def test_export_tiles_levels_and_aggregates(tmp_path):
+    index = pd.DatetimeIndex(pd.bdate_range("2018-01-01", "2020-12-31").asi8, name="date")
+    df = pd.DataFrame({"arb_2": np.arange(len(index), dtype=float)}, index=index)
+    df.iloc[5, 0] = np.nan
+
+    result = export_tiles(df, tmp_path)
+
+    levels = {level["name"]: level for level in result["levels"]}
+    assert [c["path"] for c in levels["daily"]["chunks"]] == [
+        "daily/2018.json", "daily/2019.json", "daily/2020.json"
+    ]
+    assert len(levels["monthly"]["chunks"]) == 1
+
+    monthly = aggregate_level(df, "ME")
+    with open(tmp_path / "monthly" / "all.json") as f:
+        tile = json.load(f)
+    assert len(tile["dates"]) == len(monthly) == 36
+    np.testing.assert_allclose(tile["series"]["arb_2"]["mean"], monthly["arb_2_mean"], atol=1e-4)
+    assert tile["series"]["arb_2"]["max"][0] == df.loc["2018-01", "arb_2"].max()
+
+    with open(tmp_path / "daily" / "2018.json") as f:
+        tile = json.load(f)
+    assert "2018-01-08" not in tile["dates"]
+    assert len(tile["dates"]) == df.loc["2018", "arb_2"].count()
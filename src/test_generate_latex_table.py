@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from generate_latex_table import (
+    bootstrap_mean_ci,
+    render_latex_tables,
+    write_tex_if_changed,
+)
+
+
+def _arb_data():
+    rng = np.random.default_rng(0)
+    index = pd.DatetimeIndex(pd.bdate_range("2008-01-01", "2012-12-31"), name="date")
+    return pd.DataFrame(
+        {f"arb_{t}": 20 + rng.normal(size=len(index)).cumsum() for t in [2, 5]},
+        index=index,
+    )
+
+
+def test_write_tex_if_changed(tmp_path):
+    path = tmp_path / "table.tex"
+    assert write_tex_if_changed(path, "a")
+    mtime = path.stat().st_mtime_ns
+    assert not write_tex_if_changed(path, "a")
+    assert path.stat().st_mtime_ns == mtime
+    assert write_tex_if_changed(path, "b")
+    assert path.read_text() == "b"
+
+
+def test_bootstrap_mean_ci_brackets_mean():
+    ci = bootstrap_mean_ci(_arb_data(), "2010-01-01", "2012-12-31", n_boot=200)
+    assert list(ci.columns) == ["Mean", "CI Low", "CI High"]
+    assert (ci["CI Low"] <= ci["Mean"]).all()
+    assert (ci["Mean"] <= ci["CI High"]).all()
+
+
+def test_render_latex_tables(tmp_path):
+    specs = [
+        {"name": "summary_2010", "kind": "summary", "columns": ["arb_2", "arb_5"],
+         "start_date": "2010-01-01", "end_date": "2010-12-31"},
+        {"name": "bootstrap_all", "kind": "bootstrap", "columns": ["arb_2"]},
+        {"name": "empty", "kind": "summary", "columns": ["arb_2"],
+         "start_date": "2020-01-01", "end_date": None},
+    ]
+    written = render_latex_tables(_arb_data(), specs, output_dir=tmp_path)
+    assert written == {"summary_2010": True, "bootstrap_all": True, "empty": True}
+    assert "TIPS-Treasury 5Y" in (tmp_path / "summary_2010.tex").read_text()
+    # Every spec has its .tex file, the empty window a placeholder table
+    assert "No data from 2020-01-01 to end" in (tmp_path / "empty.tex").read_text()
+
+    written = render_latex_tables(_arb_data(), specs, output_dir=tmp_path)
+    assert written == {"summary_2010": False, "bootstrap_all": False, "empty": False}
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).absolute().parent
+HEAVY_MODULES = ["matplotlib", "seaborn", "statsmodels", "polars"]
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["misc_tools", "generate_figures", "generate_latex_table", "compute_tips_treasury"],
+)
+def test_import_does_not_load_heavy_dependencies(module):
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SRC_DIR,
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
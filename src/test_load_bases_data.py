@@ -28,6 +28,9 @@ import pandas as pd
 from pathlib import Path
 import compute_tips_treasury
 import unittest
+from closeness import closeness_report, format_failures
+from pull_reference_spreads import load_reference_spreads, read_stata_cached
+import replicate_tips_treasury
 from settings import config
 
 # config.switch_to_alt() # Use data stored on local VDI
@@ -86,7 +89,7 @@ def read_interest_swap_spread_bases(dirpath=DATA_DIR):
 
 def read_adrien_bases_replication(dirpath=DATA_DIR):
     """Load bases data replicated by Adrien"""
-    df = pd.read_stata(dirpath  / "Final_Spreads.dta")
+    df = read_stata_cached(Path(dirpath) / "Final_Spreads.dta", mirror_dir=Path(dirpath) / "reference")
     df = df.rename(columns={"data": "date"}).set_index("date")
 
     sa_ordering = [  # Missing Treasury SF bases
@@ -249,7 +252,7 @@ def load_box(
     filepath = (
         data_dir  / "box" / "box_spreads.dta"
     )
-    df_box = pd.read_stata(filepath).set_index("date")
+    df_box = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
     df = pd.concat([df_box, df_ois], axis=1)
     df = df.dropna(subset=df_box.columns, how="all")
 
@@ -287,7 +290,7 @@ def load_cds_bond(
         / "cds-bond"
         / "cds_bond_implied_rf.dta"
     )
-    df = pd.read_stata(filepath).set_index("date")
+    df = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
     # (10000 * df["cds_bond_hy"]).plot()
     # (df["cds_bond_hy_treas"] - df["cds_bond_hy_rf"]).plot()
     # (df["cds_bond_hy_treas"] - df["cds_bond_hy_rf"]).equals(10000 * df["cds_bond_hy"])
@@ -322,7 +325,7 @@ def load_CIP(
     filepath = (
         data_dir  / "cip" / "cip_implied_rf.dta"
     )
-    df_cip = pd.read_stata(filepath).set_index("date")
+    df_cip = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
 
     ds = load_datastream.load_selected(data_dir=data_dir)
     ds = 100 * ds[["USD_3m_OIS"]]
@@ -381,7 +384,7 @@ def load_equity_sf(
         / "equity-sf"
         / "equity_sf_implied_rf.dta"
     )
-    df_equity = pd.read_stata(filepath).set_index("date")
+    df_equity = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
 
     ds = load_datastream.load_selected(data_dir=data_dir)
     ds = 100 * ds[["USD_3m_OIS"]]
@@ -405,33 +408,26 @@ def load_tips_treasury(
     data_dir=DATA_DIR,
     raw=False,
 ):
-    """Box Implied Rf - OIS, for 6m, 12m, and 18m
-    Reported in basis points
+    """TIPS-implied Rf - maturity-matched nominal Treasury zero-coupon yield,
+    for 2, 5, 10 and 20 years. Reported in basis points.
+
+    Our own series are compared with the published ones (`raw_tips_treas_*`
+    of the combined wide file) in replicate_tips_treasury.py.
     """
-    raise NotImplementedError(
-        "This isn't working right yet. Doesn't match plots from paper."
-    )
     filepath = (
-        data_dir
-        
+        Path(data_dir)
         / "from_siriwardane_et_al"
         / "tip-treasury"
         / "tips_treasury_implied_rf.dta"
     )
-    df_tips = pd.read_stata(filepath).set_index("date")
-    # df_tips[['tips_treas_2_rf', 'tips_treas_5_rf','tips_treas_10_rf', 'tips_treas_20_rf']].plot()
-    df_tips.columns
+    df_tips = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
 
     if raw:
         ret = df_tips
     else:
-        ret = pd.DataFrame(index=df.index)
-        ret["TIPS_Treasury_02y"] = df_tips["tips_treas_2_rf"] - df_tips["nom_zc2"]
-        ret["TIPS_Treasury_05y"] = df_tips["tips_treas_5_rf"] - df_tips["nom_zc5"]
-        ret["TIPS_Treasury_10y"] = df_tips["tips_treas_10_rf"] - df_tips["nom_zc10"]
-        ret["TIPS_Treasury_20y"] = df_tips["tips_treas_20_rf"] - df_tips["nom_zc20"]
-        # ret.plot()
-        ret["2010":"2020"].plot()
+        ret = pd.DataFrame(index=df_tips.index)
+        for t in [2, 5, 10, 20]:
+            ret[f"TIPS_Treasury_{t:02}Y"] = df_tips[f"tips_treas_{t}_rf"] - df_tips[f"nom_zc{t}"]
     return ret
 
 
@@ -450,7 +446,7 @@ def load_treasury_sf(
         / "treasury-sf"
         / "treasury_sf_implied_rf.dta"
     )
-    df = pd.read_stata(filepath).set_index("date")
+    df = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
     if raw:
         ret = df
     else:
@@ -476,7 +472,7 @@ def load_treasury_swap():
         / "treasury-swap"
         / "tswap_implied_rf.dta"
     )
-    df = pd.read_stata(filepath).set_index("date")
+    df = read_stata_cached(filepath, mirror_dir=Path(data_dir) / "reference").set_index("date")
     df.info()
 
 
@@ -522,12 +518,9 @@ def load_combined_spreads_wide(data_dir=DATA_DIR, raw=False, rename=True):
     In the raw data, variables labeled "raw" are the raw spreads.
     Without raw means the absolute value has been applied.
     """
-    data_dir = Path(data_dir)
-    # filepath = (
-    #     data_dir / "arbitrage_spread_wide.dta"
-    # )
-    filepath = "https://www.dropbox.com/scl/fi/81jm3dbe856i7p17rjy87/arbitrage_spread_wide.dta?rlkey=ke78u464vucmn43zt27nzkxya&st=59g2n7dt&dl=1"
-    df = pd.read_stata(filepath).set_index("date")
+    df = load_reference_spreads(
+        "arbitrage_spread_wide", mirror_dir=Path(data_dir) / "reference"
+    ).set_index("date")
     if raw:
         ret = df.copy()
     else:
@@ -544,17 +537,15 @@ def load_combined_spreads_long(data_dir=DATA_DIR, rename=True):
     In the raw data, variables labeled "raw" are the raw spreads.
     Without raw means the absolute value has been applied.
     """
-    #data_dir = Path(data_dir)
-    # filepath = (
-    #     data_dir
-    #     / "arbitrage_spread_panel.dta"
-    # )
-    filepath = "https://www.dropbox.com/scl/fi/mv2oodkibhzli5ywdgxv7/arbitrage_spread_panel.dta?rlkey=ctzelvfie1nztlp7o24gvnzff&st=nnzdxv78&dl=1"
-    df = pd.read_stata(filepath)
-    df = df.rename()
+    df = load_reference_spreads(
+        "arbitrage_spread_panel", mirror_dir=Path(data_dir) / "reference"
+    )
     if rename:
         non_raw_name_map = {key.split("raw_")[1]:value for key, value in name_map.items()}
-        df["full_trade"] = df["full_trade"].replace(non_raw_name_map)
+        # full_trade is categorical: rename the categories, not every row
+        df["full_trade"] = df["full_trade"].cat.rename_categories(
+            lambda trade: non_raw_name_map.get(trade, trade)
+        )
     return df
 
 
@@ -578,6 +569,7 @@ class TestDataCloseness(unittest.TestCase):
         # For demonstration, we'll assume df_bloomberg should be very close to df_expected.
         # In a real test, df_bloomberg would be produced by the code under test.
         df_bloomberg = compute_tips_treasury.import_inflation_swap_data()
+        df_bloomberg = df_bloomberg.set_index("date").drop(columns="day")
 
         #Data cleaning
         df_expected = df_expected[[
@@ -599,33 +591,22 @@ class TestDataCloseness(unittest.TestCase):
             "inf_swap_30y": "Treasury_Swap_30Y",
         })
 
-        # Align the two DataFrames on their common dates
-        common_dates = df_bloomberg.index.intersection(df_expected.index)
-        df_bloomberg_aligned = df_bloomberg.loc[common_dates]
-        df_expected_aligned = df_expected.loc[common_dates]
-
-        # Convert all columns to numeric (non-convertible entries become NaN)
-        df_bloomberg_aligned = df_bloomberg_aligned.apply(pd.to_numeric, errors='coerce')
-        df_expected_aligned = df_expected_aligned.apply(pd.to_numeric, errors='coerce')
-
-        # Select only numeric columns
-        df_bloomberg_numeric = df_bloomberg_aligned.select_dtypes(include=[np.number])
-        df_expected_numeric = df_expected_aligned.select_dtypes(include=[np.number])
-
-        # Restrict to the common columns across both DataFrames
-        common_cols = df_bloomberg_numeric.columns.intersection(df_expected_numeric.columns)
-        df_bloomberg_numeric = df_bloomberg_numeric[common_cols]
-        df_expected_numeric = df_expected_numeric[common_cols]
-
-        # Test equality with a 0.1% tolerance
-        are_equal = np.allclose(
-            df_bloomberg_numeric.values,
-            df_expected_numeric.values,
-            rtol=0.001,
-            equal_nan=True
-        )
+        # Compare column by column on the common dates, with a 0.1% tolerance
+        report = closeness_report(df_bloomberg, df_expected, rtol=0.001)
+        self.assertGreater(report["n_dates"].min(), 0)
+        self.assertTrue(report["passed"].all(), format_failures(report))
+
+
+@unittest.skipUnless(
+    (Path(DATA_DIR) / "reference" / "arbitrage_spread_wide.parquet").exists(),
+    "Reference data not mirrored; run `doit pull_reference_spreads`",
+)
+class TestTipsTreasuryReplication(unittest.TestCase):
+
+    def test_tips_treasury_tracks_reference(self):
+        report = replicate_tips_treasury.check_replication()
+        self.assertTrue(report["passed"].all(), "\n" + report.to_string())
 
-        self.assertTrue(are_equal, "DataFrames are not equal within 2% tolerance")
 
 if __name__ == "__main__":
     unittest.main()
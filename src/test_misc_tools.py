@@ -1,6 +1,31 @@
+import numpy as np
 import pandas as pd
+import polars as pl
+import pytest
 from misc_tools import (
+    _alphabet,
+    add_vertical_lines_to_plot,
+    calc_check_digit,
+    compute_weighted_median_bands,
+    get_end_of_current_month,
+    get_end_of_current_month_array,
+    get_end_of_current_quarter,
+    get_end_of_current_quarter_array,
+    get_most_recent_quarter_end,
+    get_most_recent_quarter_end_array,
+    get_next_quarter_start,
+    get_next_quarter_start_array,
+    convert_cusips_from_8_to_9_digit,
+    leave_one_out_aggregates,
+    leave_one_out_sums,
+    pl_calc_check_digit,
+    pl_leave_one_out_aggregates,
+    plot_weighted_median_bands,
+    plot_weighted_median_with_distribution_bars,
+    quarter_line_dates,
+    with_lagged_columns,
     weighted_average,
+    weighted_quantile,
     groupby_weighted_average,
     groupby_weighted_std,
     get_most_recent_quarter_end,
@@ -80,3 +105,215 @@ def test_get_next_quarter_start():
     result = get_next_quarter_start(d)
     expected = pd.Timestamp("2020-01-01")
     assert result == expected
+
+
+def _reference_check_digit(number):
+    """Previous per-string implementation of calc_check_digit."""
+    number = "".join(
+        str((1, 2)[i % 2] * _alphabet.index(n)) for i, n in enumerate(number)
+    )
+    return str((10 - sum(int(n) for n in number)) % 10)
+
+
+def test_calc_check_digit_matches_reference():
+    rng = np.random.default_rng(0)
+    chars = np.array(list(_alphabet))
+    cusips = pd.Series(["".join(c) for c in chars[rng.integers(0, len(chars), (5000, 8))]])
+    cusips[:3] = ["03783310", "17275R10", "38259P50"]
+    expected = np.array([_reference_check_digit(c) for c in cusips])
+
+    np.testing.assert_array_equal(calc_check_digit(cusips), expected)
+    assert list(expected[:3]) == ["0", "2", "8"]
+
+    result = pl.DataFrame({"cusip": cusips}).select(pl_calc_check_digit("cusip"))
+    np.testing.assert_array_equal(result.to_series().to_numpy(), expected)
+
+    pd.testing.assert_series_equal(
+        convert_cusips_from_8_to_9_digit(cusips), cusips + pd.Series(expected)
+    )
+
+
+@pytest.mark.parametrize("cusip", ["0378331", "037833100", ""])
+def test_calc_check_digit_rejects_wrong_length(cusip):
+    with pytest.raises(ValueError):
+        calc_check_digit(["17275R10", cusip])
+
+
+def _reference_lagged_column(df, column_to_lag, id_column, lags, date_col, prefix, freq):
+    """Previous pivot/resample/stack/merge implementation of with_lagged_columns."""
+    df_wide = df.pivot(index=date_col, columns=id_column, values=column_to_lag)
+    new_col = f"{prefix}{lags}_{column_to_lag}"
+    df_lagged = df_wide.resample(freq).last().shift(lags)
+    df_lagged = df_lagged.stack(dropna=False).reset_index(name=new_col)
+    df_lagged = df.merge(df_lagged, on=[date_col, id_column], how="right")
+    df_lagged = df_lagged.dropna(subset=[column_to_lag, new_col], how="all")
+    return df_lagged.sort_values(by=[id_column, date_col])
+
+
+def _sparse_panel(dates, n_ids=15, fill=0.4, seed=0):
+    rng = np.random.default_rng(seed)
+    keep = rng.random((n_ids, len(dates))) < fill
+    ids, date_pos = np.nonzero(keep)
+    df = pd.DataFrame({
+        "id": [f"id{i:02d}" for i in ids],
+        "date": dates[date_pos],
+        "value": rng.normal(size=len(ids)),
+        "other": rng.integers(0, 10, size=len(ids)),
+    })
+    df.loc[rng.random(len(df)) < 0.1, "value"] = np.nan
+    return df
+
+
+def test_with_lagged_columns_matches_wide_resample():
+    monthly = _sparse_panel(pd.date_range("2000-01-01", periods=30, freq="MS"))
+    daily = _sparse_panel(pd.bdate_range("2000-01-03", periods=120), fill=0.3)
+    for df, freq in [(monthly, "MS"), (monthly, "ME"), (daily, "W"), (daily, "ME")]:
+        for lag in [1, 2, -1]:
+            result = with_lagged_columns(
+                df=df, column_to_lag="value", id_column="id", lags=lag, freq=freq
+            )
+            expected = _reference_lagged_column(df, "value", "id", lag, "date", "L", freq)
+            pd.testing.assert_frame_equal(result, expected)
+
+
+def test_with_lagged_columns_multiple_columns_and_lags():
+    df = _sparse_panel(pd.date_range("2000-01-01", periods=30, freq="MS"))
+    result = with_lagged_columns(
+        df=df, column_to_lag=["value", "other"], id_column="id", lags=[1, 3], freq="MS"
+    )
+    for col in ["value", "other"]:
+        for lag in [1, 3]:
+            single = with_lagged_columns(
+                df=df, column_to_lag=col, id_column="id", lags=lag, freq="MS"
+            )
+            new_col = f"L{lag}_{col}"
+            common = single.index.intersection(result.index)
+            pd.testing.assert_series_equal(result.loc[common, new_col], single.loc[common, new_col])
+            assert result[new_col].notna().sum() == single[new_col].notna().sum()
+
+    no_resample = with_lagged_columns(
+        df=df, column_to_lag="value", id_column="id", lags=[1, 2], resample=False
+    )
+    expected = df.groupby("id")["value"].shift(2)
+    pd.testing.assert_series_equal(no_resample["L2_value"], expected, check_names=False)
+
+
+def test_leave_one_out_aggregates():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "g": rng.integers(0, 20, size=500),
+        "h": rng.choice(["a", "b", None], size=500),
+        "x": rng.normal(size=500),
+        "y": rng.integers(0, 5, size=500).astype(float),
+    })
+    df.loc[rng.random(500) < 0.1, "x"] = np.nan
+
+    result = leave_one_out_aggregates(df, groupby=["g", "h"], columns=["x", "y"])
+    grouped = df.groupby(["g", "h"])
+    for col in ["x", "y"]:
+        others_sum = grouped[col].transform("sum") - df[col].fillna(0)
+        others_count = grouped[col].transform("count") - df[col].notna()
+        pd.testing.assert_series_equal(
+            result[f"LOO_Sum_{col}"], others_sum.astype(float), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            result[f"LOO_Count_{col}"], others_count.astype(float), check_names=False
+        )
+        pd.testing.assert_series_equal(
+            result[f"LOO_Mean_{col}"],
+            (others_sum / others_count.where(others_count > 0)).astype(float),
+            check_names=False,
+        )
+
+    expected = df.groupby("g")["y"].transform(lambda x: x.sum() - x)
+    pd.testing.assert_series_equal(leave_one_out_sums(df, groupby=["g"], summed_col="y"), expected)
+    # Rows with a missing value of their own stay NaN
+    pd.testing.assert_series_equal(
+        leave_one_out_sums(df, groupby=["g"], summed_col="x"),
+        df.groupby("g")["x"].transform(lambda x: x.sum() - x),
+    )
+
+    # Integer column with a missing group key
+    missing_key = pd.DataFrame({"g": ["a", "a", None, "b"], "y": [1, 2, 3, 4]})
+    pd.testing.assert_series_equal(
+        leave_one_out_sums(missing_key, groupby=["g"], summed_col="y"),
+        missing_key.groupby("g")["y"].transform(lambda x: x.sum() - x),
+    )
+
+    pl_result = pl_leave_one_out_aggregates(pl.from_pandas(df), groupby=["g", "h"], columns=["x", "y"])
+    pd.testing.assert_frame_equal(
+        pl_result.select(result.columns.tolist()).to_pandas(), result, check_dtype=False
+    )
+
+
+def test_calendar_arrays_match_scalar_helpers():
+    dates = pd.Series(
+        pd.date_range("1999-11-15", "2025-03-31 12:00", periods=997).tolist() + [pd.NaT],
+        name="date",
+    )
+    helpers = [
+        (get_most_recent_quarter_end, get_most_recent_quarter_end_array),
+        (get_next_quarter_start, get_next_quarter_start_array),
+        (get_end_of_current_month, get_end_of_current_month_array),
+        (get_end_of_current_quarter, get_end_of_current_quarter_array),
+    ]
+    for scalar, array in helpers:
+        expected = pd.to_datetime(dates.dropna().apply(scalar)).reindex(dates.index)
+        result = array(dates)
+        pd.testing.assert_series_equal(result, expected)
+
+        index_result = array(pd.DatetimeIndex(dates))
+        assert isinstance(index_result, pd.DatetimeIndex)
+        np.testing.assert_array_equal(index_result.to_numpy(), expected.to_numpy())
+        np.testing.assert_array_equal(array(dates.to_numpy()), expected.to_numpy())
+
+
+def test_weighted_median_bands_compute_once_render_many():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", "2020-12-31")
+    df = pd.DataFrame({
+        "date": np.repeat(dates, 5),
+        "x": rng.normal(size=5 * len(dates)),
+        "w": rng.uniform(0, 1, size=5 * len(dates)),
+    })
+    bands = compute_weighted_median_bands(
+        df, "x", weight_col="w", rolling=True, rolling_window=5
+    )
+    assert list(bands.columns) == ["median", "lower", "upper"]
+    expected_median = (
+        df.groupby("date")
+        .apply(lambda g: weighted_quantile(g["x"], 0.5, sample_weight=g["w"]), include_groups=False)
+        .rolling(5)
+        .mean()
+    )
+    np.testing.assert_allclose(bands["median"], expected_median)
+
+    for _ in range(2):
+        fig, ax = plt.subplots()
+        plot_weighted_median_bands(bands, ax=ax, rescale_factor=100)
+        line_collections = [c for c in ax.collections if isinstance(c, LineCollection)]
+        assert len(line_collections) == 1
+        assert len(line_collections[0].get_segments()) == len(quarter_line_dates(dates[0], dates[-1]))
+        np.testing.assert_allclose(ax.lines[0].get_ydata(), bands["median"] * 100)
+        plt.close(fig)
+
+    fig, ax = plt.subplots()
+    plot_weighted_median_with_distribution_bars(
+        df, "x", weight_col="w", rolling=True, rolling_window=5, ax=ax
+    )
+    np.testing.assert_allclose(ax.lines[0].get_ydata(), bands["median"])
+    assert ax.get_ylabel() == "x (5-day ave.)"
+    plt.close(fig)
+
+    fig, ax = plt.subplots()
+    assert add_vertical_lines_to_plot("2020-01-15", "2020-02-15", ax=ax, adjust_ticks=False) is None
+    plt.close(fig)
+
+    with pytest.raises(ValueError):
+        compute_weighted_median_bands(df, "x", percentiles=[0.1, 0.5, 0.9])
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from parquet_layout import choose_codecs, layout_report, pinned_codecs, write_parquet
+
+
+def _panel():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", "2019-12-31")
+    df = pd.DataFrame({"date": dates[::-1], "tenor": rng.choice([2, 5, 10, 20], len(dates))})
+    df["spread"] = rng.normal(0, 20, len(df))
+    df["rate"] = np.round(rng.normal(200, 20, len(df)), 2)
+    return df
+
+
+def test_write_parquet_layout(tmp_path):
+    df = _panel()
+    path = tmp_path / "panel.parquet"
+    written = write_parquet(df, path, min_row_group_rows=0)
+
+    # Round trip of the date-sorted frame
+    assert written["date"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(pd.read_parquet(path), written)
+    pd.testing.assert_frame_equal(
+        written, df.sort_values("date", ignore_index=True)
+    )
+
+    # One row group per year, with date statistics for pruning
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_row_groups == 5
+    date_col = meta.schema.names.index("date")
+    years = [meta.row_group(i).column(date_col).statistics.min.year for i in range(5)]
+    assert years == [2015, 2016, 2017, 2018, 2019]
+    assert all(meta.row_group(i).column(date_col).statistics.has_min_max for i in range(5))
+
+    filtered = pd.read_parquet(path, filters=[("date", ">=", pd.Timestamp("2019-01-01"))])
+    assert len(filtered) == (written["date"].dt.year == 2019).sum()
+
+    # Short years are merged into row groups of at least min_row_group_rows
+    write_parquet(df, path, min_row_group_rows=500)
+    meta = pq.ParquetFile(path).metadata
+    sizes = [meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+    assert sizes == [522, 782]  # 2015-16, and 2017-19 with the short tail folded in
+
+
+def test_choose_codecs():
+    plan = choose_codecs(_panel())
+    assert plan["tenor"]["use_dictionary"]
+    assert plan["tenor"]["encoding"] is None
+    assert not plan["spread"]["use_dictionary"]
+    assert plan["spread"]["encoding"] in {"PLAIN", "BYTE_STREAM_SPLIT"}
+    assert plan["date"]["encoding"] in {"PLAIN", "DELTA_BINARY_PACKED"}
+    assert all(c["compression"] in {"snappy", "lz4", "zstd"} for c in plan.values())
+
+
+def test_pinned_codecs_are_reproducible(tmp_path):
+    df = _panel()
+    df["rate32"] = df["rate"].astype("float32")
+    plan = pinned_codecs(df)
+    assert plan["tenor"]["use_dictionary"]
+    assert plan["date"]["encoding"] == "DELTA_BINARY_PACKED"
+    assert plan["spread"]["encoding"] == "PLAIN"
+    assert plan["rate32"]["encoding"] == "BYTE_STREAM_SPLIT"
+
+    # The same frame is written to the same bytes
+    write_parquet(df, tmp_path / "a.parquet")
+    write_parquet(df, tmp_path / "b.parquet")
+    assert (tmp_path / "a.parquet").read_bytes() == (tmp_path / "b.parquet").read_bytes()
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(tmp_path / "a.parquet"), df.sort_values("date", ignore_index=True)
+    )
+
+
+def test_layout_report(tmp_path):
+    report = layout_report(
+        _panel(),
+        {"default": {"row_group_freq": None, "codecs": None}, "tuned": {"codecs": "auto"}},
+        {"full": {}, "one_year": {"filters": [("date", ">=", pd.Timestamp("2019-01-01"))]}},
+        tmp_path,
+        repeat=1,
+    )
+    assert list(report.index) == ["default", "tuned"]
+    assert list(report.columns) == ["size_kb", "write_s", "full", "one_year"]
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+import pipeline_cache
+from pipeline_cache import DataCache
+
+
+def _frame(n=100, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"date": pd.date_range("2020-01-01", periods=n), "x": rng.normal(size=n)})
+
+
+def test_write_then_read_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_cache, "CACHE", DataCache(max_bytes=10 * 1024**2))
+    path = tmp_path / "frame.parquet"
+    df = _frame()
+    pipeline_cache.to_parquet(df, path)
+
+    out = pipeline_cache.read_parquet(path)
+    pd.testing.assert_frame_equal(out, df)
+    pd.testing.assert_frame_equal(pd.read_parquet(path), df)
+    assert pipeline_cache.CACHE.hits == 1
+
+    # Callers get a copy: mutating it does not leak into the next read
+    out.loc[0, "x"] = 1e9
+    pd.testing.assert_frame_equal(pipeline_cache.read_parquet(path), df)
+
+
+def test_changed_file_invalidates_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_cache, "CACHE", DataCache(max_bytes=10 * 1024**2))
+    path = tmp_path / "frame.csv"
+    _frame(seed=0).to_csv(path, index=False)
+    first = pipeline_cache.read_csv(path, parse_dates=["date"])
+
+    _frame(n=50, seed=1).to_csv(path, index=False)
+    second = pipeline_cache.read_csv(path, parse_dates=["date"])
+    assert len(first) == 100
+    pd.testing.assert_frame_equal(second, pd.read_csv(path, parse_dates=["date"]))
+
+
+def test_spills_least_recently_used_over_budget(tmp_path, monkeypatch):
+    budget = int(_frame().memory_usage(index=True, deep=True).sum() * 1.5)
+    cache = DataCache(max_bytes=budget, spill_dir=tmp_path / "spill")
+    (tmp_path / "spill").mkdir()
+    monkeypatch.setattr(pipeline_cache, "CACHE", cache)
+
+    frames = {name: _frame(seed=i) for i, name in enumerate(["a", "b"])}
+    for name, df in frames.items():
+        df.to_csv(tmp_path / f"{name}.csv", index=False)
+        pipeline_cache.read_csv(tmp_path / f"{name}.csv", parse_dates=["date"])
+
+    assert cache.nbytes <= budget
+    assert len(list((tmp_path / "spill").iterdir())) == 1
+
+    # The spilled frame is reloaded from the spill file, not the CSV
+    out = pipeline_cache.read_csv(tmp_path / "a.csv", parse_dates=["date"])
+    pd.testing.assert_frame_equal(out, frames["a"])
+    assert cache.hits == 1
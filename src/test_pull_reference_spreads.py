@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pull_reference_spreads
+from pull_reference_spreads import (
+    load_reference_spreads,
+    pull_reference_file,
+    read_manifest,
+    read_stata_cached,
+)
+
+
+def _panel():
+    dates = pd.date_range("2020-01-01", periods=6)
+    return pd.DataFrame({
+        "date": np.tile(dates, 2),
+        "full_trade": ["box_6m"] * 6 + ["cip_jpy"] * 6,
+        "spread": np.arange(12, dtype=float),
+    })
+
+
+@pytest.fixture
+def fake_download(tmp_path, monkeypatch):
+    """Serve the reference files from a local Stata file instead of Dropbox."""
+    source = tmp_path / "source.dta"
+    _panel().to_stata(source, write_index=False)
+    calls = []
+
+    def download(url, dest):
+        calls.append(url)
+        dest.write_bytes(source.read_bytes())
+
+    monkeypatch.setattr(pull_reference_spreads, "_download", download)
+    return source, calls
+
+
+def test_pull_once_then_served_from_parquet(tmp_path, fake_download, monkeypatch):
+    source, calls = fake_download
+    mirror = tmp_path / "mirror"
+
+    df = load_reference_spreads("arbitrage_spread_panel", mirror_dir=mirror)
+    assert isinstance(df["full_trade"].dtype, pd.CategoricalDtype)
+    assert df["date"].dtype == "datetime64[ns]"
+    pd.testing.assert_frame_equal(
+        df.astype({"full_trade": object}), pd.read_stata(source), check_dtype=False
+    )
+    assert len(calls) == 1
+    assert read_manifest(mirror)["arbitrage_spread_panel"]["sha256"]
+
+    # Later loads neither download nor parse Stata
+    monkeypatch.setattr(pd, "read_stata", None)
+    pd.testing.assert_frame_equal(
+        load_reference_spreads("arbitrage_spread_panel", mirror_dir=mirror), df
+    )
+    assert len(calls) == 1
+
+
+def test_checksum_mismatch_is_rejected(tmp_path, fake_download):
+    source, calls = fake_download
+    mirror = tmp_path / "mirror"
+    pull_reference_file("arbitrage_spread_panel", mirror_dir=mirror)
+
+    # Upstream file changes: re-downloading must not silently accept it
+    _panel().assign(spread=-1.0).to_stata(source, write_index=False)
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        pull_reference_file("arbitrage_spread_panel", mirror_dir=mirror, force=True)
+    assert not (mirror / "arbitrage_spread_panel.dta.part").exists()
+
+
+def test_read_stata_cached_reconverts_when_source_changes(tmp_path):
+    mirror = tmp_path / "mirror"
+    path = tmp_path / "Final_Spreads.dta"
+    _panel().to_stata(path, write_index=False)
+
+    first = read_stata_cached(path, mirror_dir=mirror)
+    pd.testing.assert_frame_equal(read_stata_cached(path, mirror_dir=mirror), first)
+
+    _panel().assign(spread=7.0).to_stata(path, write_index=False)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert (read_stata_cached(path, mirror_dir=mirror)["spread"] == 7.0).all()
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from replicate_tips_treasury import TENORS, tracking_stats
+
+
+def _spreads(seed=0, n=500):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2010-01-01", periods=n)
+    return pd.DataFrame(
+        {f"arb_{t}": 50 + np.cumsum(rng.normal(size=n)) for t in TENORS}, index=dates
+    )
+
+
+def test_tracking_stats_flags_drift():
+    reference = _spreads()
+    computed = reference + np.random.default_rng(1).normal(0, 1, size=reference.shape)
+    computed = computed.iloc[10:]
+    computed.iloc[:5, 0] = np.nan
+    # The 20y series drifts away from the reference halfway through
+    computed.loc[computed.index[250]:, "arb_20"] += 40
+
+    report = tracking_stats(computed, reference)
+    assert list(report.index) == TENORS
+    assert report.loc[2, "n_obs"] == len(reference) - 15
+    assert report.loc[5, "n_obs"] == len(reference) - 10
+    assert report.loc[[2, 5, 10], "passed"].all()
+    assert not report.loc[20, "passed"]
+    assert report.loc[20, "rmse"] > 20
+    assert report.loc[20, "worst_date"] >= computed.index[250]
+    np.testing.assert_allclose(report.loc[[2, 5, 10], "rmse"], 1, atol=0.15)
+    np.testing.assert_allclose(report.loc[[2, 5, 10], "mean_diff"], 0, atol=0.15)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from compute_tips_treasury import tips_treasury_panel
+from spread_engine import compute_spreads, default_spread_specs, spreads_to_long
+
+
+def _loaders(calls):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    frames = {
+        "tips_yields": pd.DataFrame(
+            {"date": dates, **{f"real_cc{t}": rng.normal(0.01, 0.005, 300) for t in [2, 5, 10, 20]}}
+        ),
+        "treasury_yields": pd.DataFrame(
+            {"date": dates[5:], **{f"nom_zc{t}": rng.normal(200, 20, 295) for t in [2, 5, 10, 20]}}
+        ),
+        "inflation_swaps": pd.DataFrame(
+            {"date": dates, **{f"inf_swap_{t}y": rng.normal(0.02, 0.003, 300) for t in [2, 5, 10, 20]}}
+        ),
+        "swap_rates": pd.DataFrame({"date": dates, "swap_2": rng.normal(210, 20, 300)}),
+    }
+
+    def loader(name):
+        def load():
+            calls.append(name)
+            return frames[name].copy()
+        return load
+
+    return {name: loader(name) for name in frames}, frames
+
+
+def test_specs_share_inputs_and_match_formulas():
+    calls = []
+    loaders, frames = _loaders(calls)
+    specs = default_spread_specs() + [{
+        "family": "Treasury_Swap",
+        "inputs": ["swap_rates", "treasury_yields"],
+        "tenors": [2],
+        "implied_rf": lambda df, t: df[f"swap_{t}"],
+        "benchmark": lambda df, t: df[f"nom_zc{t}"],
+        "name": "Treasury_Swap_{tenor:02}Y",
+    }]
+    wide = compute_spreads(specs, loaders=loaders)
+
+    # treasury_yields is used by both families but loaded once
+    assert sorted(calls) == sorted(set(calls)) == sorted(frames)
+    assert list(wide.columns) == [
+        "TIPS_Treasury_02Y", "TIPS_Treasury_05Y", "TIPS_Treasury_10Y",
+        "TIPS_Treasury_20Y", "Treasury_Swap_02Y",
+    ]
+    # Days on which some spread is defined: treasury_yields starts 5 days late
+    assert wide.index.equals(pd.DatetimeIndex(frames["treasury_yields"]["date"], name="date"))
+
+    real = frames["tips_yields"].set_index("date")
+    nom = frames["treasury_yields"].set_index("date")
+    swaps = frames["inflation_swaps"].set_index("date")
+    expected = (
+        1e4 * (np.exp(real["real_cc5"] + np.log(1 + swaps["inf_swap_5y"])) - 1) - nom["nom_zc5"]
+    ).reindex(wide.index)
+    np.testing.assert_allclose(wide["TIPS_Treasury_05Y"], expected)
+    # TIPS-Treasury spreads are the arb columns of the TIPS-Treasury panel
+    panel = tips_treasury_panel(
+        {name: frames[name] for name in ["tips_yields", "treasury_yields", "inflation_swaps"]}
+    )[0].set_index("date")
+    for t in [2, 5, 10, 20]:
+        pd.testing.assert_series_equal(
+            wide[f"TIPS_Treasury_{t:02}Y"], panel[f"arb_{t}"].reindex(wide.index),
+            check_names=False,
+        )
+    np.testing.assert_allclose(
+        wide["Treasury_Swap_02Y"],
+        (frames["swap_rates"].set_index("date")["swap_2"] - nom["nom_zc2"]).reindex(wide.index),
+    )
+
+    long = spreads_to_long(wide)
+    assert len(long) == wide.notna().sum().sum()
+    assert list(long["full_trade"].cat.categories) == list(wide.columns)
+    pivoted = long.astype({"full_trade": str}).pivot(
+        index="date", columns="full_trade", values="spread"
+    )
+    pd.testing.assert_frame_equal(pivoted.rename_axis(columns=None), wide)
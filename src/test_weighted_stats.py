@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from misc_tools import weighted_quantile
+from weighted_stats import (
+    groupby_weighted_quantile,
+    groupby_weighted_stats,
+    pl_groupby_weighted_stats,
+)
+
+
+def _panel(n=2000, n_groups=37, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "g": rng.integers(0, n_groups, size=n),
+        "h": rng.choice(["a", "b"], size=n),
+        "x": 100 + rng.normal(size=n),
+        "w": rng.uniform(0, 5, size=n),
+    })
+    df.loc[rng.choice(n, 50, replace=False), "x"] = np.nan
+    df.loc[rng.choice(n, 50, replace=False), "w"] = np.nan
+    return df
+
+
+def _reference(df, by_col, ddof):
+    def stats(g):
+        g = g.dropna(subset=["x", "w"])
+        mean = np.average(g["x"], weights=g["w"])
+        n = len(g)
+        var = np.sum(g["w"] * (g["x"] - mean) ** 2) / (((n - ddof) / n) * g["w"].sum())
+        return pd.Series({"count": float(n), "sum_weights": g["w"].sum(), "mean": mean,
+                          "var": var, "std": np.sqrt(var)})
+
+    return df.groupby(by_col).apply(stats, include_groups=False)
+
+
+def test_matches_groupby_apply_reference():
+    df = _panel()
+    before = df.copy()
+    for by_col in ["g", ["g", "h"]]:
+        for ddof in [0, 1]:
+            result = groupby_weighted_stats(df, "x", "w", by_col=by_col, ddof=ddof)
+            pd.testing.assert_frame_equal(result, _reference(df, by_col, ddof))
+    # Input is left untouched
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_polars_matches_pandas():
+    df = _panel()
+    expected = groupby_weighted_stats(df, "x", "w", by_col=["g", "h"]).reset_index()
+    result = pl_groupby_weighted_stats(pl.from_pandas(df), "x", "w", by_col=["g", "h"]).to_pandas()
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_grouped_quantile_matches_scalar_weighted_quantile():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "g": rng.integers(0, 40, size=3000),
+        "x": rng.normal(size=3000),
+        "w": rng.uniform(0, 3, size=3000),
+    })
+    quantiles = [0, 0.1, 0.25, 0.5, 0.75, 1]
+    for old_style in [False, True]:
+        expected = df.groupby("g").apply(
+            lambda x: pd.Series(
+                weighted_quantile(x["x"], quantiles, sample_weight=x["w"], old_style=old_style),
+                index=quantiles,
+            ),
+            include_groups=False,
+        )
+        result = groupby_weighted_quantile(
+            df, "x", quantiles, weight_col="w", by_col="g", old_style=old_style
+        )
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=0, atol=1e-10)
+        pd.testing.assert_index_equal(result.index, expected.index)
+
+    median = groupby_weighted_quantile(df, "x", 0.5, by_col="g")
+    np.testing.assert_allclose(
+        median.to_numpy(),
+        df.groupby("g")["x"].apply(lambda x: weighted_quantile(x, 0.5)).to_numpy(),
+    )
+
+
+def test_grouped_quantile_zero_weight_groups():
+    # Groups whose weights sum to zero must not disturb the other groups
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        "g": np.repeat(np.arange(200), 10),
+        "x": rng.normal(size=2000),
+        "w": rng.uniform(0, 3, size=2000),
+    })
+    zero = rng.choice(200, 29, replace=False)
+    df.loc[df["g"].isin(zero), "w"] = 0.0
+    quantiles = [0.1, 0.5, 0.9]
+    for old_style in [False, True]:
+        expected = np.vstack([
+            weighted_quantile(g["x"], quantiles, sample_weight=g["w"], old_style=old_style)
+            for _, g in df.groupby("g")
+        ])
+        result = groupby_weighted_quantile(
+            df, "x", quantiles, weight_col="w", by_col="g", old_style=old_style
+        ).to_numpy()
+        assert np.isnan(result[zero]).all()
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-10)
+
+
+def test_grouped_quantile_ties_with_unequal_weights():
+    # Tied values take their weights in row order in both implementations
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "g": rng.integers(0, 300, size=6000),
+        "x": rng.integers(0, 5, size=6000).astype(float),
+        "w": rng.uniform(0.1, 3, size=6000),
+    })
+    quantiles = [0.1, 0.25, 0.5, 0.9]
+    for old_style in [False, True]:
+        expected = np.vstack([
+            weighted_quantile(g["x"], quantiles, sample_weight=g["w"], old_style=old_style)
+            for _, g in df.groupby("g")
+        ])
+        result = groupby_weighted_quantile(
+            df, "x", quantiles, weight_col="w", by_col="g", old_style=old_style
+        ).to_numpy()
+        np.testing.assert_allclose(result, expected, rtol=0, atol=1e-10)
@@ -0,0 +1,280 @@
+"""Vectorized grouped weighted statistics.
+
+The kernels factorize the group keys once into integer codes and then reduce
+every statistic with `np.bincount`, so there is no Python call per group and
+the input frame is never modified. The weighted variance takes a second
+bincount pass over the deviations from the group means rather than using
+`sum(w * x**2) - sum(w * x)**2 / sum(w)`, which loses precision when the
+mean is large relative to the spread (e.g. rates in levels).
+
+Rows where the value or the weight is missing are ignored.
+
+`groupby_weighted_stats` works on pandas frames and `pl_groupby_weighted_stats`
+on polars frames. The weighted helpers in misc_tools.py are thin wrappers
+around these kernels.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def group_codes(data, by_col=None):
+    """
+    Integer group code of every row and the index of the groups.
+
+    Groups are sorted like `DataFrame.groupby`. Rows with a missing key get
+    code -1. With `by_col=None` all rows form a single group.
+
+    Returns:
+        tuple: (np.ndarray of int64 codes, pd.Index of the groups)
+    """
+    if by_col is None:
+        return np.zeros(len(data), dtype=np.int64), pd.RangeIndex(1)
+    grouped = data.groupby(by_col, sort=True, observed=True)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    return codes, grouped.size().index
+
+
+def _valid_rows(codes, values, weights):
+    valid = (codes >= 0) & ~np.isnan(values) & ~np.isnan(weights)
+    if valid.all():
+        return codes, values, weights
+    return codes[valid], values[valid], weights[valid]
+
+
+def weighted_stats_from_codes(codes, n_groups, values, weights, ddof=1):
+    """
+    Weighted count, sum of weights, mean, variance and std per group code.
+
+    The variance follows `misc_tools.groupby_weighted_std`:
+    `sum(w * (x - mean)**2) / (((n - ddof) / n) * sum(w))`, where `n` is the
+    number of observations in the group.
+
+    Returns:
+        dict: statistic name -> np.ndarray of length `n_groups`
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    codes, values, weights = _valid_rows(np.asarray(codes), values, weights)
+
+    count = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    sum_weights = np.bincount(codes, weights=weights, minlength=n_groups)
+    sum_wx = np.bincount(codes, weights=weights * values, minlength=n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sum_wx / sum_weights
+        dev = values - mean[codes]
+        sum_wdev2 = np.bincount(codes, weights=weights * dev * dev, minlength=n_groups)
+        var = sum_wdev2 / (((count - ddof) / count) * sum_weights)
+
+    return {
+        "count": count,
+        "sum_weights": sum_weights,
+        "mean": mean,
+        "var": var,
+        "std": np.sqrt(var),
+    }
+
+
+def groupby_weighted_stats(data, data_col, weight_col, by_col=None, ddof=1):
+    """
+    Grouped weighted count, sum of weights, mean, variance and std.
+
+    Parameters:
+        data (pd.DataFrame): Input frame, left unchanged
+        data_col (str): Column to summarize
+        weight_col (str): Column of weights
+        by_col (str or list): Grouping column(s); None for one overall group
+        ddof (int): Delta degrees of freedom of the variance
+
+    Returns:
+        pd.DataFrame: One row per group, columns count, sum_weights, mean,
+        var and std
+
+    Examples
+    --------
+    ```
+    >>> df = pd.DataFrame({
+    ...     'side': ['R', 'R', 'D', 'D'],
+    ...     'rate': [2, 3, 2, 4],
+    ...     'amount': [100, 300, 100, 100]},
+    ... )
+    >>> stats = groupby_weighted_stats(df, 'rate', 'amount', by_col='side')
+    >>> stats[['count', 'mean']]  # doctest: +NORMALIZE_WHITESPACE
+          count  mean
+    side
+    D       2.0  3.00
+    R       2.0  2.75
+
+    ```
+    """
+    codes, index = group_codes(data, by_col)
+    stats = weighted_stats_from_codes(
+        codes,
+        len(index),
+        data[data_col].to_numpy(dtype=np.float64, na_value=np.nan),
+        data[weight_col].to_numpy(dtype=np.float64, na_value=np.nan),
+        ddof=ddof,
+    )
+    return pd.DataFrame(stats, index=index)
+
+
+def pl_groupby_weighted_stats(data, data_col, weight_col, by_col=None, ddof=1):
+    """
+    Polars version of `groupby_weighted_stats`.
+
+    Parameters:
+        data (pl.DataFrame or pl.LazyFrame): Input frame
+        data_col (str): Column to summarize
+        weight_col (str): Column of weights
+        by_col (str or list): Grouping column(s); None for one overall group
+        ddof (int): Delta degrees of freedom of the variance
+
+    Returns:
+        pl.DataFrame: One row per group, sorted by the group keys, with
+        columns count, sum_weights, mean, var and std
+    """
+    import polars as pl
+
+    by_col = [] if by_col is None else [by_col] if isinstance(by_col, str) else list(by_col)
+    x = pl.col(data_col).cast(pl.Float64)
+    w = pl.col(weight_col).cast(pl.Float64)
+    n = pl.len().cast(pl.Float64)
+    mean = (w * x).sum() / w.sum()
+    var = (w * (x - mean) ** 2).sum() / (((n - ddof) / n) * w.sum())
+    aggs = [n.alias("count"), w.sum().alias("sum_weights"), mean.alias("mean"), var.alias("var")]
+
+    valid = data.lazy().filter(
+        x.is_not_null() & x.is_not_nan() & w.is_not_null() & w.is_not_nan()
+        & pl.all_horizontal(pl.lit(True), *[pl.col(c).is_not_null() for c in by_col])
+    )
+    if by_col:
+        out = valid.group_by(by_col).agg(aggs).sort(by_col)
+    else:
+        out = valid.select(aggs)
+    return out.with_columns(pl.col("var").sqrt().alias("std")).collect()
+
+
+def weighted_quantiles_from_codes(codes, n_groups, values, weights, quantiles,
+                                  old_style=False):
+    """
+    Weighted quantiles of `values` per group code, for all groups at once.
+
+    Equivalent to calling `misc_tools.weighted_quantile` on every group: one
+    sort by (group, value), segment cumulative sums of the weights, and
+    one searchsorted on the fused (group, cumulative weight) key to find the
+    interpolation points of every quantile in every group.
+
+    Returns:
+        np.ndarray: (n_groups, len(quantiles)) array, NaN for empty groups
+        and groups whose weights do not sum to a positive number
+    """
+    quantiles = np.atleast_1d(np.asarray(quantiles, dtype=np.float64))
+    assert np.all(quantiles >= 0) and np.all(quantiles <= 1), "quantiles should be in [0, 1]"
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    codes, values, weights = _valid_rows(np.asarray(codes), values, weights)
+    if len(values) == 0:
+        return np.full((n_groups, len(quantiles)), np.nan)
+
+    # Same order as np.lexsort((values, codes)), but sorting the values once
+    # and then stable-sorting the narrowest integer codes (radix sort for up
+    # to 65536 groups) is several times faster. Both sorts are stable, so tied
+    # values keep their input order, as in misc_tools.weighted_quantile
+    order = np.argsort(values, kind="stable")
+    code_dtype = np.min_scalar_type(max(n_groups - 1, 0))
+    order = order[np.argsort(codes[order].astype(code_dtype), kind="stable")]
+    codes, values, weights = codes[order], values[order], weights[order]
+
+    count = np.bincount(codes, minlength=n_groups)
+    ends = np.cumsum(count)
+    starts = ends - count
+
+    # Cumulative weight within each group, centred on each observation
+    cum = np.cumsum(weights)
+    cum -= np.concatenate([[0.0], cum])[starts][codes]
+    wq = cum - 0.5 * weights
+    total = np.bincount(codes, weights=weights, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if old_style:
+            # To be convenient with numpy.percentile
+            wq -= wq[starts[codes]]
+            wq /= wq[ends[codes] - 1]
+            # Single-observation groups: the quantile is the observation
+            wq[(count == 1)[codes]] = 0.0
+        else:
+            wq /= total[codes]
+    # Groups without positive total weight have no quantiles; a finite key
+    # keeps the fused key sorted for the other groups
+    undefined = ~(total > 0)
+    undefined |= np.bincount(codes, weights=~np.isfinite(wq), minlength=n_groups) > 0
+    wq[undefined[codes]] = 0.0
+
+    # Groups occupy disjoint intervals [2g, 2g + 1] of the fused key
+    key = 2.0 * codes + wq
+    targets = 2.0 * np.arange(n_groups)[:, None] + quantiles[None, :]
+    pos = np.searchsorted(key, targets.ravel(), side="right").reshape(targets.shape)
+
+    lo_bound = starts[:, None]
+    hi_bound = np.maximum(ends - 1, starts)[:, None]
+    # Empty groups are clipped to a valid position and set to NaN below
+    hi = np.minimum(np.clip(pos, lo_bound, hi_bound), len(values) - 1)
+    lo = np.minimum(np.clip(pos - 1, lo_bound, hi_bound), len(values) - 1)
+
+    x0, x1 = wq[lo], wq[hi]
+    y0, y1 = values[lo], values[hi]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where(hi > lo, (quantiles[None, :] - x0) / (x1 - x0), 0.0)
+    out = y0 + frac * (y1 - y0)
+    out[(count == 0) | undefined] = np.nan
+    return out
+
+
+def groupby_weighted_quantile(data, data_col, quantiles, weight_col=None, by_col=None,
+                              old_style=False):
+    """
+    Grouped weighted quantiles, vectorized across groups and quantiles.
+
+    Matches `data.groupby(by_col).apply(lambda x: weighted_quantile(
+    x[data_col], quantiles, sample_weight=x[weight_col], old_style=old_style))`
+    on groups without missing values, without a Python call per group. Tied
+    values with unequal weights are taken in row order by both.
+
+    Parameters:
+        data (pd.DataFrame): Input frame, left unchanged
+        data_col (str): Column to take quantiles of
+        quantiles (float or array-like): Quantile(s) in [0, 1]
+        weight_col (str): Column of weights; None for equal weights
+        by_col (str or list): Grouping column(s); None for one overall group
+        old_style (bool): If True, match numpy.percentile, see
+            misc_tools.weighted_quantile
+
+    Returns:
+        pd.Series if `quantiles` is a scalar, else pd.DataFrame with one
+        column per quantile
+
+    Examples
+    --------
+    ```
+    >>> df = pd.DataFrame({'g': [1, 1, 1, 2, 2], 'x': [1, 2, 3, 10, 20]})
+    >>> groupby_weighted_quantile(df, 'x', 0.5, by_col='g')
+    g
+    1     2.0
+    2    15.0
+    dtype: float64
+
+    ```
+    """
+    codes, index = group_codes(data, by_col)
+    values = data[data_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    if weight_col is None:
+        weights = np.ones(len(values))
+    else:
+        weights = data[weight_col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    out = weighted_quantiles_from_codes(
+        codes, len(index), values, weights, quantiles, old_style=old_style
+    )
+    if np.ndim(quantiles) == 0:
+        return pd.Series(out[:, 0], index=index)
+    return pd.DataFrame(out, index=index, columns=list(quantiles))